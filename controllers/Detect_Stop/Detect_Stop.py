@@ -1,5 +1,11 @@
 """Detect obstacle and stop controller."""
-from controller import Robot, DistanceSensor
+from controller import Robot
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "libraries", "python"))
+from epuck_behaviors import detect_stop_table
+from wheel_fsm import WheelFSM
 
 # Create the robot object.
 robot = Robot()
@@ -7,40 +13,17 @@ robot = Robot()
 # Get the simulation time step.
 timestep = int(robot.getBasicTimeStep())
 
-# Get the two wheel motors by name.
-left_motor = robot.getDevice("left wheel motor")
-right_motor = robot.getDevice("right wheel motor")
-
-# Switch motors to velocity control mode.
-left_motor.setPosition(float("inf"))
-right_motor.setPosition(float("inf"))
-
 # Set wheel speeds (rad/s).
 speed_left = 6.0
 speed_right = 6.0
 
-# Get proximity sensors (e-puck has 8: ps0..ps7).
-sensor_names = ["ps0", "ps1", "ps2", "ps3", "ps4", "ps5", "ps6", "ps7"]
-proximity_sensors = []
-for name in sensor_names:
-    sensor = robot.getDevice(name)
-    sensor.enable(timestep)
-    proximity_sensors.append(sensor)
-
-# If any sensor reads above this value, stop.
+# If any proximity sensor (ps0..ps7) reads above this value, stop.
 obstacle_threshold = 80.0
 
+# React in the same step the obstacle is seen.
+fsm = WheelFSM(robot, detect_stop_table(obstacle_threshold, speed_left, speed_right), timestep,
+               write_after=True)
+
 # Run every simulation step.
 while robot.step(timestep) != -1:
-    obstacle_detected = False
-    for sensor in proximity_sensors:
-        if sensor.getValue() > obstacle_threshold:
-            obstacle_detected = True
-            break
-
-    if obstacle_detected:
-        left_motor.setVelocity(0.0)
-        right_motor.setVelocity(0.0)
-    else:
-        left_motor.setVelocity(speed_left)
-        right_motor.setVelocity(speed_right)
+    fsm.step()
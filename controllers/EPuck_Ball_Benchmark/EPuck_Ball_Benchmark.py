@@ -0,0 +1,111 @@
+"""
+Benchmark supervisor for EPuck_Red_Ball (run with worlds/balls_benchmark.wbt).
+
+Places the red ball and the e-puck at random, restarts the e-puck
+controller, and measures time-to-ball and path length per trial.
+"""
+
+from controller import Supervisor
+import math
+import random
+import statistics
+
+TRIALS = 20
+TRIAL_TIMEOUT = 60.0       # seconds of simulated time per trial
+ARENA_HALF_SIZE = 0.45     # placements stay inside the default 1 m x 1 m arena
+MIN_START_DISTANCE = 0.3   # meters between e-puck and ball at the start
+MIN_BALL_SEPARATION = 0.15 # keep the red ball away from the blue one
+EPUCK_RADIUS = 0.037
+REACH_MARGIN = 0.01        # ball reached when bodies are this close
+SEED = 1
+
+robot = Supervisor()
+timestep = int(robot.getBasicTimeStep())
+
+epuck = robot.getFromDef("EPUCK")
+red_ball = robot.getFromDef("RED_BALL")
+blue_ball = robot.getFromDef("BLUE_BALL")
+if epuck is None or red_ball is None:
+    print("Missing DEFs: ensure the e-puck is DEF EPUCK and the red ball is DEF RED_BALL.")
+
+epuck_translation = epuck.getField("translation")
+epuck_rotation = epuck.getField("rotation")
+ball_translation = red_ball.getField("translation")
+ball_radius = red_ball.getField("radius").getSFFloat()
+reach_distance = ball_radius + EPUCK_RADIUS + REACH_MARGIN
+
+
+def random_point(rng):
+    return rng.uniform(-ARENA_HALF_SIZE, ARENA_HALF_SIZE), rng.uniform(-ARENA_HALF_SIZE, ARENA_HALF_SIZE)
+
+
+def place_trial(rng):
+    """Random e-puck pose and ball position satisfying the spacing constraints."""
+    blue = blue_ball.getPosition()[:2] if blue_ball else None
+    while True:
+        ball = random_point(rng)
+        start = random_point(rng)
+        if math.dist(ball, start) < MIN_START_DISTANCE:
+            continue
+        if blue and (math.dist(ball, blue) < MIN_BALL_SEPARATION or math.dist(start, blue) < MIN_BALL_SEPARATION):
+            continue
+        return ball, start, rng.uniform(-math.pi, math.pi)
+
+
+def run_trial(ball, start, heading):
+    ball_translation.setSFVec3f([ball[0], ball[1], ball_radius])
+    epuck_translation.setSFVec3f([start[0], start[1], 0.0])
+    epuck_rotation.setSFRotation([0.0, 0.0, 1.0, heading])
+    red_ball.resetPhysics()
+    epuck.resetPhysics()
+    epuck.restartController()
+
+    start_time = robot.getTime()
+    path_length = 0.0
+    previous = start
+    while robot.step(timestep) != -1:
+        position = epuck.getPosition()[:2]
+        path_length += math.dist(position, previous)
+        previous = position
+        elapsed = robot.getTime() - start_time
+        if math.dist(position, red_ball.getPosition()[:2]) <= reach_distance:
+            return True, elapsed, path_length
+        if elapsed >= TRIAL_TIMEOUT:
+            return False, elapsed, path_length
+    return None
+
+
+def main():
+    rng = random.Random(SEED)
+    results = []
+    print(f"Benchmarking EPuck_Red_Ball over {TRIALS} random placements...")
+    for trial in range(TRIALS):
+        ball, start, heading = place_trial(rng)
+        outcome = run_trial(ball, start, heading)
+        if outcome is None:
+            break
+        reached, elapsed, path_length = outcome
+        straight = max(math.dist(ball, start) - reach_distance, 1e-6)
+        results.append((reached, elapsed, path_length, straight))
+        status = "reached" if reached else "TIMEOUT"
+        print(f"  Trial {trial + 1}: {status} time={elapsed:.1f}s path={path_length:.2f}m "
+              f"(straight {straight:.2f}m)")
+
+    reached = [r for r in results if r[0]]
+    if not results:
+        return
+    print(f"Success: {len(reached)}/{len(results)}")
+    if reached:
+        times = [r[1] for r in reached]
+        paths = [r[2] for r in reached]
+        efficiency = [r[3] / r[2] for r in reached if r[2] > 0]
+        print(f"Time-to-ball: mean={statistics.mean(times):.1f}s median={statistics.median(times):.1f}s "
+              f"max={max(times):.1f}s")
+        print(f"Path length: mean={statistics.mean(paths):.2f}m "
+              f"efficiency={statistics.mean(efficiency) if efficiency else 0.0:.2f}")
+
+    robot.simulationSetMode(Supervisor.SIMULATION_MODE_PAUSE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Thin e-puck relay for the single-process multiplexer
+(libraries/python/epuck_mux.py, run with tools/run_epuck_mux.py --relays).
+
+Each step it copies the camera image and the eight proximity readings into a
+shared-memory block, rings the multiplexer and sleeps until it answers with
+wheel speeds, then applies them. No vision or control runs here: besides
+Webots' `controller` module it imports only the standard library and the
+stdlib-only mux_protocol (no numpy), so each robot costs a small
+interpreter instead of a full EPuck_Red_Ball one.
+"""
+
+from controller import Robot
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "libraries", "python"))
+from mux_protocol import (HEADER, IMAGE_OFFSET, MUX_DOORBELL, MUX_SEQ_OFFSET, PS, PS_OFFSET, ROBOT_SEQ_OFFSET,
+                          SEQ, SPEED, SPEED_OFFSET, STOP, Doorbell, block_name, block_size)
+
+WAIT_NOTICE_S = 5.0  # remind on the console while no multiplexer answers
+
+robot = Robot()
+timestep = int(robot.getBasicTimeStep())
+
+left_motor = robot.getDevice("left wheel motor")
+right_motor = robot.getDevice("right wheel motor")
+left_motor.setPosition(float("inf"))
+right_motor.setPosition(float("inf"))
+left_motor.setVelocity(0.0)
+right_motor.setVelocity(0.0)
+
+camera = robot.getDevice("camera")
+camera.enable(timestep)
+width = camera.getWidth()
+height = camera.getHeight()
+
+sensors = [robot.getDevice(f"ps{i}") for i in range(8)]
+for sensor in sensors:
+    sensor.enable(timestep)
+
+name = block_name(robot.getName())
+size = block_size(width, height)
+try:
+    block = shared_memory.SharedMemory(name=name, create=True, size=size)
+except FileExistsError:
+    # Left over from a crashed run: reuse it if it is big enough for this camera
+    block = shared_memory.SharedMemory(name=name)
+    if block.size < size:
+        block.close()
+        block.unlink()
+        block = shared_memory.SharedMemory(name=name, create=True, size=size)
+buffer = block.buf
+HEADER.pack_into(buffer, 0, 0, 0, width, height)
+doorbell = Doorbell(name, listen=True)           # rung by the multiplexer after answering
+mux_doorbell = Doorbell(MUX_DOORBELL, listen=False)
+print(f"Relay {robot.getName()} waiting for the multiplexer on '{name}'")
+
+
+def wait_for_speeds(seq):
+    """Block until the multiplexer answers sample `seq`; returns (left, right) or None to stop."""
+    while True:
+        mux_seq = SEQ.unpack_from(buffer, MUX_SEQ_OFFSET)[0]
+        if mux_seq == seq:
+            return SPEED.unpack_from(buffer, SPEED_OFFSET)
+        if mux_seq == STOP:
+            return None
+        waited = time.monotonic()
+        doorbell.wait(WAIT_NOTICE_S)
+        if time.monotonic() - waited >= WAIT_NOTICE_S:
+            print(f"Relay {robot.getName()}: still waiting for the multiplexer...")
+
+
+seq = 0
+try:
+    while robot.step(timestep) != -1:
+        image = camera.getImage()
+        if image:
+            buffer[IMAGE_OFFSET:IMAGE_OFFSET + len(image)] = image
+        PS.pack_into(buffer, PS_OFFSET, *[sensor.getValue() for sensor in sensors])
+        seq += 1
+        SEQ.pack_into(buffer, ROBOT_SEQ_OFFSET, seq)
+        mux_doorbell.ring()
+        speeds = wait_for_speeds(seq)
+        if speeds is None:
+            left_motor.setVelocity(0.0)
+            right_motor.setVelocity(0.0)
+            break
+        left_motor.setVelocity(speeds[0])
+        right_motor.setVelocity(speeds[1])
+finally:
+    SEQ.pack_into(buffer, ROBOT_SEQ_OFFSET, STOP)
+    mux_doorbell.ring()
+    mux_doorbell.close()
+    doorbell.close()
+    buffer = None
+    block.close()
+    block.unlink()
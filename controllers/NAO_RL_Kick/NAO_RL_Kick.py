@@ -1,9 +1,32 @@
-from controller import Supervisor, Motion
+from controller import Keyboard, Supervisor, Motion
+import argparse
+import bisect
 import math
 import os
 import random
 import json
+import sys
 import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "libraries", "python"))
+from keyframe_motion import KeyframePlayer, load_keyframe_motion
+from nao_actions import ACTIONS, ARM_POSES, GAIT_FILES, GAIT_STEPS, resolve_motion_dir
+from distill import PolicyDistiller
+from learners import make_learner
+from lockstep import AgentChannel, ArenaSlot
+from planner import PrioritizedSweeping
+from sim_runtime import SimRuntime
+from sensor_hub import SensorHub
+from step_profiler import StepProfiler
+from transition_log import TransitionRecorder
+from camera_manager import ACTIVE, CameraManager
+from device_registry import DeviceRegistry
+from display_overlay import DisplayOverlay
+from episode_monitor import EpisodeMonitor
+from feedback_channel import DEFAULT_PORT, FeedbackChannel
+from reset_curriculum import ResetCurriculum, arena_from_world, cached_placements
+from training_mode import TrainingMode
 
 # =============================
 # RL CONFIG - MOTION-BASED
@@ -15,17 +38,100 @@ ALPHA = 0.15
 GAMMA = 0.95
 EPSILON = 0.2
 
-# Actions: motion files + bilateral arm control
-ACTIONS = [
-    "turn_left", 
-    "turn_right", 
-    "forward", 
-    "side_step_left",
-    "reach_forward_both",
-    "reach_down_both",
-    "close_hands",
-    "open_hands"
-]
+# Observations: "vision" (yellow percentage from the camera, what the robot
+# has when deployed), "privileged" (duck distance, bearing and height read
+# from the supervisor: no camera rendering at all) or "distill" (the
+# privileged Q-table acts for DISTILL_EPISODES while the vision state is
+# observed, and the vision Q-table is derived from it; see distill.py)
+OBSERVATION = "privileged"
+DISTILL_EPISODES = 20
+DISTANCE_EDGES = (0.2, 0.3, 0.45)        # m, NAO to duck on the ground plane
+BEARING_EDGES = (-0.6, -0.2, 0.2, 0.6)   # rad, duck off the NAO's heading (left positive)
+HEIGHT_EDGES = (0.01, 0.05, 0.15)        # m, duck above where it settled
+
+# Multi-arena training: worlds from tools/make_arena_world.py run this
+# controller on a bodiless supervisor with controllerArgs ["--arenas", "N"].
+# It then drives NAO_0..NAO_{N-1} (each running NAO_RL_Kick_Agent) in
+# lockstep: one action per arena per tick, and the tick's Q updates and
+# planning done together. Needs OBSERVATION = "privileged".
+ARENAS = 1
+ACTION_TIMEOUT_MS = 5000   # give up waiting for an agent's answer after this
+
+# Learner: "q" (one-step Q-learning), "q_lambda" (Watkins Q(lambda)) or
+# "sarsa_lambda". Trace learners spread delayed rewards back over the
+# recent reach/close actions instead of one state per episode.
+LEARNER = "q_lambda"
+LAMBDA = 0.8
+TRACE_THRESHOLD = 0.01    # drop traces below this eligibility
+MAX_TRACES = 64           # hard cap on traces touched per update
+
+# Prioritized sweeping: plan over a learned model between simulator steps
+USE_PLANNER = True
+PLANNING_BUDGET_MS = 5.0  # wall-clock planning time per real step
+PLANNING_THETA = 1e-3     # ignore TD errors below this
+
+FSR_SAMPLE_PERIOD = 64    # ms between foot force samples
+
+# Profiling: robot.step vs our own code (vision, policy, logging, saves, ...)
+PROFILE = True
+PROFILE_REPORT_PERIOD = 30.0  # s of wall time between p50/p95/p99 reports
+
+# Every (state, action, reward, next_state, done) goes to a binary log per run,
+# for offline batch Q-iteration (tools/train_offline_q.py)
+RECORD_TRANSITIONS = True
+
+# Human feedback: number keys in the Webots window, or scores sent to a local
+# UDP port from another terminal (tools/coach.py). Each score goes to the
+# action that was running FEEDBACK_LATENCY_MS before it arrived.
+FEEDBACK_PORT = DEFAULT_PORT  # None: keyboard only
+FEEDBACK_LATENCY_MS = 300.0
+
+# Early termination: end the episode (with a terminal reward) once the NAO has
+# fallen, or when neither it nor the duck has moved for STALL_WINDOW_MS
+TERMINATE_EARLY = True
+FALL_REWARD = -5.0
+STALL_REWARD = -1.0
+STALL_WINDOW_MS = 4000
+MONITOR_PERIOD_MS = 64
+MONITOR_USE_IMU = False   # tilt from the inertial unit instead of the supervisor pose
+
+# Randomized resets: each episode starts the NAO and the duck from a placement
+# drawn from a precomputed, collision-checked set (cached in PLACEMENTS_PATH).
+# The curriculum starts with the duck close and in front, and widens to
+# farther / off-heading placements once CURRICULUM_RAISE_AT of the last
+# CURRICULUM_WINDOW episodes lifted the duck CURRICULUM_SUCCESS_HEIGHT
+RANDOMIZE_RESETS = True
+RESET_WORLD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "worlds", "bobby.wbt")
+PLACEMENT_COUNT = 4096
+NAO_FOOTPRINT_RADIUS = 0.15   # m, arms and feet included
+DUCK_RADIUS = 0.05
+CURRICULUM_START = 0.2        # 0 = duck right in front, 1 = anywhere
+CURRICULUM_WINDOW = 10
+CURRICULUM_RAISE_AT = 0.6
+CURRICULUM_LOWER_AT = 0.2
+CURRICULUM_STEP = 0.1
+CURRICULUM_SUCCESS_HEIGHT = 0.03
+
+# Fast training: episodes run in SIMULATION_MODE_FAST with the overlay and
+# per-step console output off; every EVAL_EVERY episodes one greedy
+# evaluation episode runs in real time with everything on
+FAST_TRAINING = True
+EVAL_EVERY = 10
+
+# On-screen overlay: only changed fields are repainted, at most this often
+OVERLAY_PERIOD_MS = 200
+REWARD_HISTORY = 40       # episodes shown in the reward sparkline
+
+DEBUG_CAMERA_SAMPLE = False   # print a few pixels of the first observed frame
+
+# Motion playback: the keyframe player drives the joints directly so gait
+# speed can be traded for simulated-time throughput during training
+USE_KEYFRAME_PLAYER = True
+MOTION_SPEED = 1.0        # >1 plays the gait faster (fewer steps per action)
+MOTION_END_PHASE = 1.0    # <1 plays only the first part of each gait cycle (capped at GAIT_STEPS' worth)
+
+# Actions: motion files + bilateral arm control (ACTIONS, GAIT_FILES and
+# ARM_POSES in nao_actions, shared with NAO_RL_Kick_Agent)
 
 # =============================
 # WEBOTS SETUP
@@ -33,8 +139,40 @@ ACTIONS = [
 robot = Supervisor()
 timestep = int(robot.getBasicTimeStep())
 
-nao_node = robot.getSelf()
-duck_node = robot.getFromDef("DUCK")
+argument_parser = argparse.ArgumentParser()
+argument_parser.add_argument("--arenas", type=int, default=ARENAS)
+ARENAS = argument_parser.parse_known_args()[0].arenas
+if ARENAS > 1 and OBSERVATION != "privileged":
+    print(f"{ARENAS} arenas: the trainer has no camera, using privileged observations")
+    OBSERVATION = "privileged"
+
+profiler = StepProfiler(timestep, PROFILE_REPORT_PERIOD, enabled=PROFILE)
+profiler.attach(robot)
+log = profiler.timed("logging")(print)
+
+training = TrainingMode(robot, EVAL_EVERY, fast=FAST_TRAINING)
+
+
+def log_step(*args):
+    """Per-step detail, printed only in evaluation episodes (or when not training fast)."""
+    if training.verbose:
+        log(*args)
+
+# Devices are looked up on first use, so restarts (every world reload) only
+# pay for what an episode actually touches
+devices = DeviceRegistry(robot, timestep)
+
+# All stepping goes through the runtime so periodic tasks keep running
+# while an action coroutine waits on simulated time
+sim = SimRuntime(robot, timestep)
+
+if ARENAS > 1:
+    # The trainer is not a NAO; the single-arena globals refer to arena 0
+    nao_node = robot.getFromDef("NAO_0")
+    duck_node = robot.getFromDef("DUCK_0")
+else:
+    nao_node = robot.getSelf()
+    duck_node = robot.getFromDef("DUCK")
 
 if nao_node is None:
     nao_node = robot.getFromDef("NAO")
@@ -50,78 +188,61 @@ init_nao_rotation = list(nao_rotation_field.getSFRotation())
 init_duck_translation = list(duck_node.getField("translation").getSFVec3f())
 init_duck_rotation = list(duck_node.getField("rotation").getSFRotation())
 
-# Enable cameras for vision-based learning
-camera_top = robot.getDevice("CameraTop")
-camera_bottom = robot.getDevice("CameraBottom")
-if camera_top:
-    camera_top.enable(timestep)
-if camera_bottom:
-    camera_bottom.enable(timestep)
-
-# ===== HEAD MOTORS =====
-head_yaw = robot.getDevice("HeadYaw")
-head_pitch = robot.getDevice("HeadPitch")
-
-# ===== RIGHT ARM MOTORS =====
-r_shoulder_pitch = robot.getDevice("RShoulderPitch")
-r_shoulder_roll = robot.getDevice("RShoulderRoll")
-r_elbow_roll = robot.getDevice("RElbowRoll")
-r_elbow_yaw = robot.getDevice("RElbowYaw")
-r_wrist_yaw = robot.getDevice("RWristYaw")
-
-# ===== LEFT ARM MOTORS =====
-l_shoulder_pitch = robot.getDevice("LShoulderPitch")
-l_shoulder_roll = robot.getDevice("LShoulderRoll")
-l_elbow_roll = robot.getDevice("LElbowRoll")
-l_elbow_yaw = robot.getDevice("LElbowYaw")
-l_wrist_yaw = robot.getDevice("LWristYaw")
-
-# ===== LEG MOTORS =====
-l_hip_yaw_pitch = robot.getDevice("LHipYawPitch")
-l_hip_roll = robot.getDevice("LHipRoll")
-l_hip_pitch = robot.getDevice("LHipPitch")
-l_knee_pitch = robot.getDevice("LKneePitch")
-l_ankle_pitch = robot.getDevice("LAnklePitch")
-l_ankle_roll = robot.getDevice("LAnkleRoll")
-
-r_hip_yaw_pitch = robot.getDevice("RHipYawPitch")
-r_hip_roll = robot.getDevice("RHipRoll")
-r_hip_pitch = robot.getDevice("RHipPitch")
-r_knee_pitch = robot.getDevice("RKneePitch")
-r_ankle_pitch = robot.getDevice("RAnklePitch")
-r_ankle_roll = robot.getDevice("RAnkleRoll")
-
-# Enable keyboard input
-keyboard = robot.getDevice("keyboard")
-if keyboard:
-    keyboard.enable(timestep)
-else:
-    keyboard = None
-
-# Try to enable display overlay (for on-screen stats)
-display = None
+curriculum = None
+if RANDOMIZE_RESETS:
+    placements = cached_placements(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "placements.npz"),
+        arena_from_world(RESET_WORLD), count=PLACEMENT_COUNT,
+        robot_radius=NAO_FOOTPRINT_RADIUS, object_radius=DUCK_RADIUS,
+    )
+    curriculum = ResetCurriculum(
+        placements, level=CURRICULUM_START, window=CURRICULUM_WINDOW,
+        raise_at=CURRICULUM_RAISE_AT, lower_at=CURRICULUM_LOWER_AT, step=CURRICULUM_STEP,
+    )
+
+# Cameras for vision-based learning: only rendered while the policy observes,
+# not during the 400-640 ms of each action
+camera_top = devices["CameraTop"]
+camera_bottom = devices["CameraBottom"]
+cameras = CameraManager({"top": camera_top, "bottom": camera_bottom}, timestep)
+cameras.declare("act", {})
+cameras.declare("observe", {ACTIVE: 1})
+
+# Keyboard and coach socket for manual reward shaping
+keyboard = devices.sensor("keyboard")
 try:
-    display = robot.getDevice("Display")
-    if display:
-        print(f"✓ Display found! Dimensions: {display.getWidth()}x{display.getHeight()}")
-        display.setFont("Arial", 12, False)
-    else:
-        print("✗ Display device not found in world")
-except Exception as e:
-    print(f"✗ Display error: {e}")
+    feedback = FeedbackChannel(keyboard, Keyboard.SHIFT, FEEDBACK_PORT, latency_ms=FEEDBACK_LATENCY_MS)
+except OSError as e:
+    print(f"Feedback socket unavailable ({e}); keyboard only")
+    feedback = FeedbackChannel(keyboard, Keyboard.SHIFT, latency_ms=FEEDBACK_LATENCY_MS)
+
+# Proprioception, snapshotted once per step by the runtime (see sample_sensors)
+sensors = SensorHub(timestep)
+sensors.add_vector("imu", devices["inertial unit"], method="getRollPitchYaw")
+sensors.add_vector("lfsr", devices["LFsr"], period=FSR_SAMPLE_PERIOD)
+sensors.add_vector("rfsr", devices["RFsr"], period=FSR_SAMPLE_PERIOD)
+sensors.build()
+imu_baseline = None
+
+monitor = EpisodeMonitor(nao_node, [duck_node], imu=(lambda: sensors.get("imu")) if MONITOR_USE_IMU else None,
+                         stall_window_ms=STALL_WINDOW_MS)
+
+# Display overlay (for on-screen stats), if the world has one
+display = devices["Display"]
+if display:
+    display.setFont("Arial", 12, False)
+overlay = DisplayOverlay(display)
+overlay.add_field("progress", 10, 10, 200, "Ep {0[0]} | Step {0[1]}", 0xFFFF00)
+overlay.add_field("observed", 10, 25, 200, "Duck: {:.2f} m" if OBSERVATION == "privileged" else "Yellow: {:.1%}",
+                  0xFFFF00)
+overlay.add_field("action", 10, 40, 200, "Action: {}", 0xFFFF00)
+overlay.add_field("reward", 10, 60, 200, "REWARD: {:+.1f}", lambda r: 0x00FF00 if r >= 0 else 0xFF0000)
+overlay.add_label("[0-9=reward] [Shift+0-9=penalize]", 10, 80, 240)
+overlay.add_label("Episode rewards:", 10, 100, 200)
+overlay.add_sparkline("episodes", 10, 115, 200, 40, capacity=REWARD_HISTORY)
 
 # Load motion files
-WEBOTS_HOME = os.environ.get("WEBOTS_HOME", "/Applications/Webots.app/Contents")
-
-def resolve_motion_dir(webots_home):
-    if webots_home.endswith(".app"):
-        webots_home = os.path.join(webots_home, "Contents")
-    motion_dir = os.path.join(webots_home, "projects/robots/softbank/nao/motions")
-    if os.path.isdir(motion_dir):
-        return motion_dir
-    return motion_dir
-
-MOTION_DIR = resolve_motion_dir(WEBOTS_HOME)
+MOTION_DIR = resolve_motion_dir()
 
 def load_motion(name):
     path = os.path.join(MOTION_DIR, name)
@@ -134,102 +255,123 @@ def load_motion(name):
         print(f"Motion load error: {e}")
         return None
 
-forwards_motion = load_motion("Forwards50.motion")
-turn_left_motion = load_motion("TurnLeft60.motion")
-turn_right_motion = load_motion("TurnRight60.motion")
-side_step_left_motion = load_motion("SideStepLeft.motion")
+def load_player(name):
+    motion = load_keyframe_motion(MOTION_DIR, name)
+    if motion is None:
+        return None
+    player = KeyframePlayer(motion, devices, timestep, speed=MOTION_SPEED)
+    player.step = profiler.timed("actuation")(player.step)
+    return player
+
+
+# Gait players, loaded the first time each is played
+gaits = {}
+
+
+def gait(action):
+    """Motion (or keyframe player) for a gait action."""
+    if action not in gaits:
+        name = GAIT_FILES[action]
+        gaits[action] = load_player(name) if USE_KEYFRAME_PLAYER else load_motion(name)
+    return gaits[action]
+
+
+# Per-episode motion stats for comparing playback speeds
+motion_steps = 0
+max_torso_tilt = 0.0
 
-# Arm motors for reaching and grabbing
-r_shoulder_pitch = robot.getDevice("RShoulderPitch")
-r_shoulder_roll = robot.getDevice("RShoulderRoll")
-r_elbow_roll = robot.getDevice("RElbowRoll")
-r_elbow_yaw = robot.getDevice("RElbowYaw")
-r_wrist_yaw = robot.getDevice("RWristYaw")
 
+def set_joints(**targets):
+    """Set arm joint targets by device name; joints missing from the robot are skipped."""
+    for name, position in targets.items():
+        motor = devices[name]
+        if motor:
+            motor.setPosition(position)
 
-def step_for(ms):
-    """Step simulation for specified milliseconds."""
+
+async def step_for(ms):
+    """Wait for the specified milliseconds of simulated time."""
     steps = int(ms / timestep)
-    for _ in range(max(1, steps)):
-        if robot.step(timestep) == -1:
-            return False
-    return True
+    await sim.sleep(max(1, steps) * timestep)
+    return sim.running
+
+
+@profiler.timed("sensing")
+def sample_sensors():
+    """Periodic task: snapshot sensors and track torso tilt against the episode baseline."""
+    global max_torso_tilt, imu_baseline
+    sensors.sample(sim.time_ms)
+    roll, pitch, _ = sensors.get("imu")
+    if imu_baseline is None:
+        imu_baseline = (roll, pitch)
+    tilt = max(abs(roll - imu_baseline[0]), abs(pitch - imu_baseline[1]))
+    max_torso_tilt = max(max_torso_tilt, tilt)
+
+
+def episode_over():
+    """True once the monitor has flagged a fall or stall (gaits stop early)."""
+    return TERMINATE_EARLY and monitor.reason is not None
+
 
+def check_termination():
+    """Periodic task: fall/stall detection."""
+    monitor.check(sim.time_ms)
 
-def play_motion(motion, max_steps=40):
-    """Play a motion file."""
+
+async def play_motion(motion, max_steps=GAIT_STEPS):
+    """Play a motion file (or keyframe player) and count the steps it used."""
+    global motion_steps
     if motion is None:
-        return step_for(640)
-    motion.play()
-    for _ in range(max_steps):
-        if robot.step(timestep) == -1:
-            return False
-        if motion.isOver():
-            return True
-    motion.stop()
-    return True
-
-
-def reset_episode():
-    """Reset robot and duck to initial state."""
-    nao_translation_field.setSFVec3f(init_nao_translation)
-    nao_rotation_field.setSFRotation(init_nao_rotation)
-    duck_node.getField("translation").setSFVec3f(init_duck_translation)
-    duck_node.getField("rotation").setSFRotation(init_duck_rotation)
-    
+        return await step_for(640)
+    start_steps = sim.steps
+    if isinstance(motion, KeyframePlayer):
+        # Cover the same part of the gait the baseline got through in max_steps steps
+        # (faster speeds then take fewer steps), so actions keep the length Q was trained on
+        duration = motion.motion.duration_ms
+        end_phase = min(MOTION_END_PHASE, max_steps * timestep / duration) if duration > 0 else MOTION_END_PHASE
+        motion.play(speed=MOTION_SPEED, end_phase=end_phase)
+        while motion.step() and not episode_over():
+            await sim.next_step()
+    else:
+        motion.play()
+        finished = lambda: motion.isOver() or episode_over()
+        if not await sim.until(finished, timeout_ms=max_steps * timestep) or not motion.isOver():
+            motion.stop()
+    motion_steps += sim.steps - start_steps
+    return sim.running
+
+
+async def reset_episode():
+    """Reset robot and duck to the initial state, or to a curriculum placement."""
+    global duck_start_height
+    if curriculum:
+        (nao_x, nao_y, nao_yaw), (duck_x, duck_y, duck_yaw) = curriculum.sample()
+        nao_translation_field.setSFVec3f([nao_x, nao_y, init_nao_translation[2]])
+        nao_rotation_field.setSFRotation([0.0, 0.0, 1.0, nao_yaw])
+        duck_node.getField("translation").setSFVec3f([duck_x, duck_y, init_duck_translation[2]])
+        duck_node.getField("rotation").setSFRotation([0.0, 0.0, 1.0, duck_yaw])
+    else:
+        nao_translation_field.setSFVec3f(init_nao_translation)
+        nao_rotation_field.setSFRotation(init_nao_rotation)
+        duck_node.getField("translation").setSFVec3f(init_duck_translation)
+        duck_node.getField("rotation").setSFRotation(init_duck_rotation)
+
     robot.simulationResetPhysics()
-    step_for(128)
+    await step_for(128)
+    # World is z-up: duck height is measured from where it settled
+    duck_start_height = duck_node.getField("translation").getSFVec3f()[2]
 
 
-def execute_action(action):
+async def execute_action(action):
     """Execute motion-based action."""
-    if action == "turn_left":
-        play_motion(turn_left_motion)
-    elif action == "turn_right":
-        play_motion(turn_right_motion)
-    elif action == "forward":
-        play_motion(forwards_motion)
-    elif action == "side_step_left":
-        play_motion(side_step_left_motion)
-    
-    # Arm actions - direct motor control
-    # Bilateral arm actions (both arms together)
-    elif action == "reach_forward_both":
-        # Both arms forward to embrace duck
-        if r_shoulder_pitch:
-            r_shoulder_pitch.setPosition(0.5)
-        if l_shoulder_pitch:
-            l_shoulder_pitch.setPosition(0.5)
-        if r_elbow_roll:
-            r_elbow_roll.setPosition(0.8)
-        if l_elbow_roll:
-            l_elbow_roll.setPosition(-0.8)  # Mirror
-        step_for(500)
-    elif action == "reach_down_both":
-        # Both arms down to reach duck at feet
-        if r_shoulder_pitch:
-            r_shoulder_pitch.setPosition(1.5)
-        if l_shoulder_pitch:
-            l_shoulder_pitch.setPosition(1.5)
-        if r_elbow_roll:
-            r_elbow_roll.setPosition(0.1)
-        if l_elbow_roll:
-            l_elbow_roll.setPosition(-0.1)  # Mirror
-        step_for(500)
-    elif action == "close_hands":
-        # Both hands close for strong grip
-        if r_wrist_yaw:
-            r_wrist_yaw.setPosition(1.5)
-        if l_wrist_yaw:
-            l_wrist_yaw.setPosition(-1.5)  # Mirror
-        step_for(400)
-    elif action == "open_hands":
-        # Both hands open to release
-        if r_wrist_yaw:
-            r_wrist_yaw.setPosition(-1.5)
-        if l_wrist_yaw:
-            l_wrist_yaw.setPosition(1.5)  # Mirror
-        step_for(400)
+    if action in GAIT_FILES:
+        await play_motion(gait(action))
+
+    # Bilateral arm actions - direct motor control
+    elif action in ARM_POSES:
+        targets, duration_ms = ARM_POSES[action]
+        set_joints(**targets)
+        await step_for(duration_ms)
 
 
 # =============================
@@ -247,6 +389,7 @@ def get_active_camera():
     return camera_bottom
 
 
+@profiler.timed("vision")
 def get_yellow_percentage():
     """Return yellow pixel percentage in current camera image (0.0 to 1.0)."""
     camera = get_active_camera()
@@ -311,6 +454,29 @@ def debug_camera_sample():
         print(f"DEBUG: Camera sample error: {e}")
 
 
+camera_sampled = False
+
+
+async def observe():
+    """State for the policy; privileged observations need no camera and no extra step."""
+    if OBSERVATION == "privileged":
+        return get_privileged_state()
+    return await observe_vision()
+
+
+async def observe_vision():
+    """Render the active camera for one step and read the state from it."""
+    global camera_sampled
+    cameras.apply("observe", "top" if get_active_camera() is camera_top else "bottom")
+    await sim.next_step()
+    state = get_state()
+    if DEBUG_CAMERA_SAMPLE and not camera_sampled:
+        camera_sampled = True
+        debug_camera_sample()
+    cameras.apply("act")
+    return state
+
+
 def get_state():
     """Get state based on camera vision of yellow object."""
     yellow_pct = get_yellow_percentage()
@@ -332,6 +498,27 @@ def get_state():
     return (yellow_bin, angle_bin, yellow_pct)
 
 
+duck_start_height = init_duck_translation[2]
+
+
+def get_privileged_state():
+    """Duck distance, bearing and height bins from the supervisor, plus the raw distance."""
+    return privileged_state(nao_node, duck_node, duck_start_height)
+
+
+def privileged_state(nao_node, duck_node, duck_start_height):
+    nao = nao_node.getPosition()
+    duck = duck_node.getPosition()
+    orientation = nao_node.getOrientation()
+    heading = math.atan2(orientation[3], orientation[0])
+    dx, dy = duck[0] - nao[0], duck[1] - nao[1]
+    distance = math.hypot(dx, dy)
+    bearing = math.remainder(math.atan2(dy, dx) - heading, math.tau)
+    height = duck[2] - duck_start_height
+    return (bisect.bisect(DISTANCE_EDGES, distance), bisect.bisect(BEARING_EDGES, bearing),
+            bisect.bisect(HEIGHT_EDGES, height), distance)
+
+
 def reward_for(duck_height, time_on_ground, manual_bonus=0):
     """
     Calculate reward based on duck height and time on ground.
@@ -362,16 +549,24 @@ def reward_for(duck_height, time_on_ground, manual_bonus=0):
 
 Q_PATH = os.path.join(os.path.dirname(__file__), "q_table.json")
 EPISODE_PATH = os.path.join(os.path.dirname(__file__), "episode.json")
+TRANSITION_DIR = os.path.join(os.path.dirname(__file__), "transitions")
 Q_PATH_ALT = os.path.expanduser("~/Documents/Webot/controllers/NAO_RL_Kick/q_table.json")
+Q_PRIVILEGED_PATH = os.path.join(os.path.dirname(__file__), "q_table_privileged.json")
+Q_PRIVILEGED_PATH_ALT = os.path.expanduser("~/Documents/Webot/controllers/NAO_RL_Kick/q_table_privileged.json")
+DISTILL_PATH = os.path.join(os.path.dirname(__file__), "distill_counts.json")
+VISION_Q_PATHS = [Q_PATH, Q_PATH_ALT]
+PRIVILEGED_Q_PATHS = [Q_PRIVILEGED_PATH, Q_PRIVILEGED_PATH_ALT]
+# The table being trained; distillation writes the vision table from the privileged one
+TRAIN_Q_PATHS = PRIVILEGED_Q_PATHS if OBSERVATION == "privileged" else VISION_Q_PATHS
 EPISODE_PATH_ALT = os.path.expanduser("~/Documents/Webot/controllers/NAO_RL_Kick/episode.json")
 
-print(f"Q-table path: {Q_PATH}")
+print(f"Q-table path: {TRAIN_Q_PATHS[0]}")
 print(f"Episode path: {EPISODE_PATH}")
 print(f"Directory writable: {os.access(os.path.dirname(Q_PATH), os.W_OK)}")
 
 
-def load_q():
-    for path in [Q_PATH, Q_PATH_ALT]:
+def load_q(paths=TRAIN_Q_PATHS):
+    for path in paths:
         if os.path.isfile(path):
             try:
                 with open(path, "r", encoding="utf-8") as f:
@@ -384,14 +579,15 @@ def load_q():
     return {}
 
 
-def save_q(q_table):
-    for path in [Q_PATH, Q_PATH_ALT]:
+@profiler.timed("persistence")
+def save_q(q_table, paths=TRAIN_Q_PATHS):
+    for path in paths:
         try:
             os.makedirs(os.path.dirname(path), exist_ok=True)
-            serial = {f"{k[0]},{k[1]}": v for k, v in q_table.items()}
+            serial = {",".join(str(v) for v in k): q for k, q in q_table.items()}
             with open(path, "w", encoding="utf-8") as f:
                 json.dump(serial, f, indent=2)
-            print(f"✓ Saved Q-table with {len(q_table)} states")
+            log_step(f"✓ Saved Q-table with {len(q_table)} states")
             return
         except Exception as e:
             print(f"✗ Could not save to {path}: {e}")
@@ -406,6 +602,8 @@ def load_episode():
                 with open(path, "r", encoding="utf-8") as f:
                     data = json.load(f)
                 episode = data.get("episode", 0)
+                if curriculum:
+                    curriculum.load_state(data.get("curriculum"))
                 print(f"✓ Resuming from episode {episode + 1}")
                 return episode
             except:
@@ -414,13 +612,17 @@ def load_episode():
     return 0
 
 
+@profiler.timed("persistence")
 def save_episode(episode_num):
     """Save current episode counter."""
     for path in [EPISODE_PATH, EPISODE_PATH_ALT]:
         try:
             os.makedirs(os.path.dirname(path), exist_ok=True)
             with open(path, "w", encoding="utf-8") as f:
-                json.dump({"episode": episode_num}, f)
+                data = {"episode": episode_num}
+                if curriculum:
+                    data["curriculum"] = curriculum.state_dict()
+                json.dump(data, f)
             return
         except:
             pass
@@ -432,153 +634,409 @@ def q_values(q_table, state):
     return q_table[state]
 
 
-def check_manual_score():
-    """Check for number key presses: 0-9 adds points, Shift+0-9 subtracts."""
-    try:
-        key = keyboard.getKey()
-    except:
-        return 0.0
-    
-    if key < 0:
-        return 0.0
-    
-    # Check if shift is held
-    is_shift = (key & Keyboard.SHIFT) != 0
-    
-    # Extract the actual key code
-    base_key = key & 0xFF
-    
-    # Number keys: 0-9
-    if ord('0') <= base_key <= ord('9'):
-        value = float(chr(base_key))
-        score = -value if is_shift else value
-        print(f"🎹 KEYBOARD INPUT DETECTED: {chr(base_key)} (Shift={is_shift}) -> Score: {score:+.0f}")
-        return score
-    
-    return 0.0
+def greedy(qv):
+    return int(max(range(len(qv)), key=lambda i: qv[i]))
 
 
-def show_stats(episode_num, step_num, total_reward, current_action, yellow_pct):
-    """Display stats on screen and console."""
-    if display:
-        try:
-            display.fillRectangle(0, 0, display.getWidth(), 160)  # Clear top area
-            display.setColor(0xFFFF00)  # Yellow text
-            display.drawText(f"Ep {episode_num} | Step {step_num}", 10, 10)
-            display.drawText(f"Yellow: {yellow_pct:.1f}%", 10, 25)
-            display.drawText(f"Action: {current_action}", 10, 40)
-            display.setColor(0x00FF00 if total_reward >= 0 else 0xFF0000)  # Green if positive, red if negative
-            display.drawText(f"REWARD: {total_reward:+.1f}", 10, 60)
-            display.setColor(0xFFFFFF)  # White
-            display.drawText("[0-9=reward] [Shift+0-9=penalize]", 10, 80)
-        except Exception as e:
-            print(f"Display draw error: {e}")
+@profiler.timed("policy")
+def choose_action(state):
+    """Epsilon-greedy action index for a state key; greedy when evaluating."""
+    if not training.evaluating and random.random() < EPSILON:
+        return random.randrange(len(ACTIONS))
+    return greedy(q_values(q_table, state))
+
+
+@profiler.timed("input")
+def poll_feedback():
+    """Periodic task: drain key presses and coach messages every step, mid-action included."""
+    feedback.poll(sim.time_ms)
+
+
+def apply_late_feedback(transition, score):
+    """Feedback that arrived after its transition was learned from: one-step correction."""
+    episode, step, state, action_idx, record = transition
+    if training.is_eval(episode):
+        return   # evaluation transitions were never learned from
+    q_values(q_table, state)[action_idx] += ALPHA * score
+    if planner:
+        planner.adjust_reward(state, action_idx, score)
+    if recorder and record is not None:
+        recorder.amend_reward(record, score)
+    log_step(f"  Late feedback {score:+.0f} -> episode {episode + 1} step {step + 1} ({ACTIONS[action_idx]})")
 
 
 q_table = load_q()
 start_episode = load_episode()
-print(f"Starting training with {len(q_table)} existing states...")
-print(f"Display enabled: {display is not None}")
-print(f"Keyboard enabled: True")
-print(f"CameraTop: {camera_top}")
-print(f"CameraBottom: {camera_bottom}")
-if camera_top:
-    print(f"  CameraTop resolution: {camera_top.getWidth()}x{camera_top.getHeight()}")
-if camera_bottom:
-    print(f"  CameraBottom resolution: {camera_bottom.getWidth()}x{camera_bottom.getHeight()}")
-
-# Debug first frame
-print("Sampling camera pixels on startup...")
-debug_camera_sample()
+learner = make_learner(
+    LEARNER, q_table, len(ACTIONS), ALPHA, GAMMA, LAMBDA,
+    trace_threshold=TRACE_THRESHOLD, max_traces=MAX_TRACES,
+)
+recorder = None
+if RECORD_TRANSITIONS and OBSERVATION != "distill":
+    # Logs of the two state spaces cannot be mixed, so privileged runs get their own directory
+    recorder = TransitionRecorder(
+        os.path.join(TRANSITION_DIR, *(["privileged"] if OBSERVATION == "privileged" else []),
+                     datetime.now().strftime("run_%Y%m%d_%H%M%S.trl")),
+        state_dim=3 if OBSERVATION == "privileged" else 2, n_actions=len(ACTIONS),
+    )
+# One slot (nodes, episode bookkeeping, learner traces) per arena of a multi-arena world
+slots = []
+agents = None
+if ARENAS > 1:
+    slots = [
+        ArenaSlot(robot, i, make_learner(LEARNER, q_table, len(ACTIONS), ALPHA, GAMMA, LAMBDA,
+                                         trace_threshold=TRACE_THRESHOLD, max_traces=MAX_TRACES),
+                  lambda nao, duck: EpisodeMonitor(nao, [duck], stall_window_ms=STALL_WINDOW_MS))
+        for i in range(ARENAS)
+    ]
+    agents = AgentChannel(devices["emitter"], devices.sensor("receiver"), slots)
+planner = PrioritizedSweeping(q_table, len(ACTIONS), GAMMA, theta=PLANNING_THETA) if USE_PLANNER else None
+print(f"Observation: {OBSERVATION} | arenas: {ARENAS} | learner: {LEARNER} | display: {display is not None} | keyboard: {keyboard is not None} | "
+      f"cameras: top={camera_top is not None} bottom={camera_bottom is not None}")
 print(f"Starting training with {len(q_table)} existing states...\n")
 
-try:
-    for episode in range(start_episode, MAX_EPISODES):
-        print(f"\n=== Episode {episode + 1}/{MAX_EPISODES} ===")
-        reset_episode()
-        
-        duck_start_height = init_duck_translation[1]
-        total_reward = 0.0
-        time_on_ground = 0.0  # Track time duck is on ground
-        episode_start_time = robot.getTime()  # Track episode duration
-
-        for step in range(MAX_STEPS):
-            # Check time limit
-            elapsed_time = robot.getTime() - episode_start_time
-            time_remaining = MAX_TIME_PER_EPISODE - elapsed_time
-            
-            if elapsed_time >= MAX_TIME_PER_EPISODE:
-                print(f"  ⏱ TIME'S UP! (20 seconds elapsed)")
-                break
-            
-            state = get_state()
-            prev_yellow = state[2]
 
-            # Epsilon-greedy action selection
-            if random.random() < EPSILON:
-                action_idx = random.randrange(len(ACTIONS))
-            else:
-                qv = q_values(q_table, state[:2])
-                action_idx = int(max(range(len(qv)), key=lambda i: qv[i]))
+def report_startup():
+    """One-shot periodic task: how long the controller took to reach its first step."""
+    startup_task.enabled = False
+    print(devices.startup_report())
 
-            action = ACTIONS[action_idx]
+async def train():
+    """Run the training episodes as the runtime's main coroutine."""
+    global motion_steps, max_torso_tilt, imu_baseline
+    try:
+        for episode in range(start_episode, MAX_EPISODES):
+            evaluating = training.begin_episode(episode)
+            if overlay_task:
+                overlay_task.enabled = training.verbose
+            log_step(f"\n=== {'Evaluation episode' if evaluating else 'Episode'} {episode + 1}/{MAX_EPISODES} ===")
+            await reset_episode()
+            motion_steps = 0
+            max_torso_tilt = 0.0
+            imu_baseline = None
+        
+            max_duck_height = 0.0
+            outcome = "timeout"
+            total_reward = 0.0
+            time_on_ground = 0.0  # Track time duck is on ground
+            episode_start_time = robot.getTime()  # Track episode duration
+            learner.start_episode()
+            monitor.reset(sim.time_ms)
+            new_state = None
+            next_action_idx = None
+
+            for step in range(MAX_STEPS):
+                # Check time limit
+                elapsed_time = robot.getTime() - episode_start_time
+                time_remaining = MAX_TIME_PER_EPISODE - elapsed_time
             
-            # Show what robot is doing
-            print(f"  Step {step + 1} [{time_remaining:.1f}s left]: action={action}")
+                if elapsed_time >= MAX_TIME_PER_EPISODE:
+                    log_step(f"  ⏱ TIME'S UP! (20 seconds elapsed)")
+                    break
             
-            execute_action(action)
+                # Reuse the observation and action chosen at the end of the last step
+                state = new_state if new_state is not None else await observe()
 
-            # Get new state after action
-            new_state = get_state()
-            new_yellow = new_state[2]
+                # Epsilon-greedy action selection
+                if next_action_idx is None:
+                    next_action_idx = choose_action(state[:-1])
+                action_idx = next_action_idx
 
-            # Calculate duck height above ground
-            duck_now = list(duck_node.getField("translation").getSFVec3f())
-            duck_height = duck_now[1] - duck_start_height
+                action = ACTIONS[action_idx]
             
-            # Track time on ground
-            action_duration = robot.getTime() - (episode_start_time + elapsed_time)
-            if duck_height < 0.001:
-                time_on_ground += action_duration
-            else:
-                time_on_ground = 0  # Reset if lifted
+                # Show what robot is doing
+                log_step(f"  Step {step + 1} [{time_remaining:.1f}s left]: action={action}")
+                overlay.update(progress=(episode + 1, step + 1), action=action, observed=state[-1])
+
+                # Feedback is attributed to this transition until the next one begins
+                transition = (episode, step, state[:-1], action_idx, recorder.count if recorder else None)
+                feedback.begin(transition, sim.time_ms)
+                await execute_action(action)
+
+                # Get new state after action
+                new_state = await observe()
+
+                # Calculate duck height above ground
+                duck_now = list(duck_node.getField("translation").getSFVec3f())
+                duck_height = duck_now[2] - duck_start_height
+                max_duck_height = max(max_duck_height, duck_height)
             
-            # Check for manual score
-            manual_score = check_manual_score() if keyboard else 0.0
-
-            # Calculate reward based on HEIGHT and TIME
-            reward = reward_for(duck_height, time_on_ground, manual_score)
-            total_reward += reward
+                # Track time on ground
+                action_duration = robot.getTime() - (episode_start_time + elapsed_time)
+                if duck_height < 0.001:
+                    time_on_ground += action_duration
+                else:
+                    time_on_ground = 0  # Reset if lifted
             
-            print(f"    Duck height: {duck_height:.3f}m | Time on ground: {time_on_ground:.1f}s | Reward: {reward:+.2f}")
-
-            # Q-learning update
-            qv = q_values(q_table, state[:2])
-            qv_next = q_values(q_table, new_state[:2])
-            qv[action_idx] = qv[action_idx] + ALPHA * (
-                reward + GAMMA * max(qv_next) - qv[action_idx]
-            )
-
-            # Stop if duck lifted very high (success!)
-            if duck_height > 0.15:
-                print(f"  ✓ LIFTED DUCK HIGH! ({duck_height:.3f}m)")
-                break
+                # Manual score received during the action (and just after it)
+                manual_score = feedback.claim(transition)
+                if manual_score:
+                    log_step(f"    Manual feedback: {manual_score:+.0f}")
+
+                # Calculate reward based on HEIGHT and TIME
+                reward = reward_for(duck_height, time_on_ground, manual_score)
+                total_reward += reward
+                overlay.set("reward", total_reward)
+            
+                log_step(f"    Duck height: {duck_height:.3f}m | Time on ground: {time_on_ground:.1f}s | Reward: {reward:+.2f}")
+
+                # A fall or stall ends the episode with a terminal reward
+                terminated = monitor.reason if TERMINATE_EARLY else None
+                if terminated:
+                    penalty = FALL_REWARD if terminated == "fall" else STALL_REWARD
+                    reward += penalty
+                    total_reward += penalty
+                    overlay.set("reward", total_reward)
+
+                # Learner update (SARSA(lambda) needs the next action up front)
+                success = duck_height > 0.15
+                done = success or terminated is not None
+                next_action_idx = choose_action(new_state[:-1])
+                # Evaluation episodes measure the policy, so they neither learn nor log
+                if not evaluating:
+                    with profiler.region("policy"):
+                        learner.update(state[:-1], action_idx, reward, new_state[:-1], next_action_idx, done=done)
+                        if recorder:
+                            recorder.append(state[:-1], action_idx, reward, new_state[:-1], done)
+                        for late_transition, score in feedback.late():
+                            apply_late_feedback(late_transition, score)
+                        if planner:
+                            planner.observe(state[:-1], action_idx, reward, new_state[:-1], done=done)
+                            planner.plan(PLANNING_BUDGET_MS)
+
+                # Stop if duck lifted very high (success!)
+                if success:
+                    outcome = "lifted"
+                    log_step(f"  ✓ LIFTED DUCK HIGH! ({duck_height:.3f}m)")
+                    break
+                if terminated:
+                    outcome = terminated
+                    remaining = MAX_TIME_PER_EPISODE - (robot.getTime() - episode_start_time)
+                    monitor.terminate(remaining * 1000.0)
+                    log_step(f"  ✗ {terminated.upper()}: episode ended with {remaining:.1f}s left")
+                    break
         
-        print(f"Episode {episode + 1} total_reward={total_reward:.2f}")
+            log_step(f"Episode {episode + 1} total_reward={total_reward:.2f}")
+            overlay.push("episodes", total_reward)
+            log_step(f"  Motion: speed={MOTION_SPEED:.2f} steps={motion_steps} max_tilt={max_torso_tilt:.2f}rad")
+            log_step(f"  Cameras: {cameras.report()}")
+            if TERMINATE_EARLY:
+                log_step(f"  Run so far: {monitor.report()}")
+            if curriculum:
+                if not evaluating:
+                    curriculum.record(max_duck_height >= CURRICULUM_SUCCESS_HEIGHT)
+                log_step(f"  Resets: {curriculum.report()}")
+            cameras.reset_stats()
+            if planner:
+                log_step(f"  Planner: {planner.backups} backups ({planner.backups_per_second:.0f}/s), "
+                      f"model states={len(planner.model.states)}")
+                planner.reset_stats()
+            training.end_episode()
+            if not training.verbose:
+                log(f"Episode {episode + 1}: reward={total_reward:.2f} steps={step + 1} "
+                    f"{outcome}")
+            if evaluating or episode + 1 == MAX_EPISODES:
+                log(f"  Speed: {training.report()}")
         
-        # Save after every episode
+            # Save after every episode
+            save_q(q_table)
+            save_episode(episode + 1)
+            if recorder:
+                with profiler.region("persistence"):
+                    recorder.flush()
+
+        print("\n✓✓✓ All episodes complete!")
+
+    except Exception as e:
+        print(f"\n✗✗✗ CRASH: {e}")
+        import traceback
+        traceback.print_exc()
         save_q(q_table)
         save_episode(episode + 1)
+    finally:
+        training.restore()
+        feedback.close()
+        if recorder:
+            recorder.close()
 
-    print("\n✓✓✓ All episodes complete!")
 
-except Exception as e:
-    print(f"\n✗✗✗ CRASH: {e}")
-    import traceback
-    traceback.print_exc()
-    save_q(q_table)
-    save_episode(episode + 1)
+def check_arenas():
+    """Periodic task: fall/stall detection in every arena."""
+    for slot in slots:
+        if slot.episode is not None:
+            slot.monitor.check(sim.time_ms)
 
-# Keep stepping
-while robot.step(timestep) != -1:
-    pass
+
+def poll_agents():
+    """Periodic task: collect the agents' "done" answers."""
+    agents.poll()
+
+
+async def start_episodes(arenas, next_episode):
+    """Place the NAO and duck of `arenas`, let them settle, and start their episodes.
+
+    Arenas beyond MAX_EPISODES are retired. Returns the next free episode number.
+    """
+    starting = []
+    for slot in arenas:
+        agents.send(slot, "rest")
+        if next_episode >= MAX_EPISODES:
+            slot.episode = None
+            continue
+        slot.place(curriculum.sample() if curriculum else None)
+        starting.append((slot, next_episode))
+        next_episode += 1
+    if starting:
+        await step_for(128)
+    for slot, episode in starting:
+        slot.begin(episode, robot.getTime(), sim.time_ms)
+    return next_episode
+
+
+async def train_lockstep():
+    """Train every arena at once: one action per arena per tick, the tick's updates batched."""
+    if FAST_TRAINING:
+        robot.simulationSetMode(robot.SIMULATION_MODE_FAST)
+    wall_start = time.perf_counter()
+    finished = 0
+    ticks = 0
+    try:
+        next_episode = await start_episodes(slots, start_episode)
+        while True:
+            active = [slot for slot in slots if slot.episode is not None]
+            if not active:
+                break
+            # Every arena acts, then the tick waits for the slowest one
+            for slot in active:
+                if slot.state is None:
+                    slot.state = privileged_state(slot.nao, slot.duck, slot.start_height)
+                if slot.action is None:
+                    slot.action = choose_action(slot.state[:-1])
+                agents.send(slot, ACTIONS[slot.action])
+            if not await sim.until(lambda: all(slot.idle for slot in active), timeout_ms=ACTION_TIMEOUT_MS):
+                late = [slot.index for slot in active if not slot.idle]
+                log(f"  No answer from the agents of arenas {late} within {ACTION_TIMEOUT_MS} ms")
+            ticks += 1
+
+            ended = []
+            with profiler.region("policy"):
+                now = robot.getTime()
+                for slot in active:
+                    new_state = privileged_state(slot.nao, slot.duck, slot.start_height)
+                    duck_height = slot.duck.getPosition()[2] - slot.start_height
+                    slot.max_height = max(slot.max_height, duck_height)
+                    if duck_height < 0.001:
+                        slot.time_on_ground += now - slot.tick_s
+                    else:
+                        slot.time_on_ground = 0
+                    slot.tick_s = now
+                    reward = reward_for(duck_height, slot.time_on_ground)
+                    terminated = slot.monitor.reason if TERMINATE_EARLY else None
+                    if terminated:
+                        reward += FALL_REWARD if terminated == "fall" else STALL_REWARD
+                    slot.total_reward += reward
+                    slot.step += 1
+
+                    success = duck_height > 0.15
+                    done = success or terminated is not None
+                    next_action_idx = choose_action(new_state[:-1])
+                    slot.learner.update(slot.state[:-1], slot.action, reward, new_state[:-1], next_action_idx,
+                                        done=done)
+                    if recorder:
+                        recorder.append(slot.state[:-1], slot.action, reward, new_state[:-1], done)
+                    if planner:
+                        planner.observe(slot.state[:-1], slot.action, reward, new_state[:-1], done=done)
+                    slot.state, slot.action = new_state, next_action_idx
+
+                    if done or slot.step >= MAX_STEPS or now - slot.start_s >= MAX_TIME_PER_EPISODE:
+                        ended.append((slot, "lifted" if success else terminated or "timeout"))
+                # One planning pass for the whole tick
+                if planner:
+                    planner.plan(PLANNING_BUDGET_MS)
+
+            if not ended:
+                continue
+            for slot, outcome in ended:
+                finished += 1
+                if outcome in ("fall", "stall"):
+                    slot.monitor.terminate((MAX_TIME_PER_EPISODE - (now - slot.start_s)) * 1000.0)
+                if curriculum:
+                    curriculum.record(slot.max_height >= CURRICULUM_SUCCESS_HEIGHT)
+                rate = finished / max(time.perf_counter() - wall_start, 1e-9) * 3600.0
+                log(f"Episode {slot.episode + 1} (arena {slot.index}): reward={slot.total_reward:.2f} "
+                    f"steps={slot.step} {outcome} | {ARENAS} arenas, {rate:.0f} episodes/h")
+            save_q(q_table)
+            save_episode(next_episode)
+            if recorder:
+                with profiler.region("persistence"):
+                    recorder.flush()
+            next_episode = await start_episodes([slot for slot, _ in ended], next_episode)
+
+        wall = time.perf_counter() - wall_start
+        log(f"\n✓✓✓ {finished} episodes in {ARENAS} arenas: {wall:.1f} s wall, {ticks} ticks, "
+            f"{finished / max(wall, 1e-9) * 3600.0:.0f} episodes/h")
+        if curriculum:
+            log(f"  Resets: {curriculum.report()}")
+        if TERMINATE_EARLY:
+            falls = sum(slot.monitor.counts["fall"] for slot in slots)
+            stalls = sum(slot.monitor.counts["stall"] for slot in slots)
+            log(f"  Early terminations: {falls} falls, {stalls} stalls")
+    finally:
+        training.restore()
+        feedback.close()
+        if recorder:
+            recorder.close()
+
+
+async def distill():
+    """The privileged Q-table acts greedily; each vision state collects its Q-rows (see distill.py)."""
+    teacher = load_q(PRIVILEGED_Q_PATHS)
+    distiller = PolicyDistiller(len(ACTIONS))
+    if distiller.load(DISTILL_PATH):
+        print(f"✓ Continuing distillation with {len(distiller.sums)} vision states")
+    try:
+        for episode in range(DISTILL_EPISODES):
+            log(f"\n=== Distillation episode {episode + 1}/{DISTILL_EPISODES} ===")
+            await reset_episode()
+            monitor.reset(sim.time_ms)
+            episode_start_time = robot.getTime()
+            for step in range(MAX_STEPS):
+                if robot.getTime() - episode_start_time >= MAX_TIME_PER_EPISODE:
+                    break
+                vision_state = await observe_vision()
+                # Unvisited states get no zero row; the teacher has no preference there
+                teacher_q = teacher.get(get_privileged_state()[:-1])
+                distiller.observe(vision_state[:-1], teacher_q)
+                action = ACTIONS[greedy(teacher_q)] if teacher_q is not None else random.choice(ACTIONS)
+                overlay.update(progress=(episode + 1, step + 1), action=action, observed=vision_state[-1])
+                await execute_action(action)
+                lifted = duck_node.getField("translation").getSFVec3f()[2] - duck_start_height > 0.15
+                if lifted or (TERMINATE_EARLY and monitor.reason):
+                    break
+            log(f"  {distiller.samples} samples, {len(distiller.sums)} vision states, "
+                f"student agrees with teacher on {distiller.agreement:.0%} of steps, "
+                f"{distiller.unseen} steps without teacher data")
+            distiller.save(DISTILL_PATH)
+            save_q(distiller.q_table(), VISION_Q_PATHS)
+        print("\n✓✓✓ Distillation complete!")
+    finally:
+        feedback.close()
+
+
+# Run training, then keep stepping
+startup_task = sim.every(0, report_startup)
+overlay_task = None
+if ARENAS > 1:
+    if TERMINATE_EARLY:
+        sim.every(MONITOR_PERIOD_MS, check_arenas)
+    sim.every(0, poll_agents)
+    sim.run(train_lockstep())
+else:
+    sim.every(0, sample_sensors)
+    if TERMINATE_EARLY:
+        sim.every(MONITOR_PERIOD_MS, check_termination)
+    sim.every(0, profiler.timed("cameras")(cameras.tick))
+    sim.every(0, poll_feedback)
+    if display:
+        overlay_task = sim.every(OVERLAY_PERIOD_MS, profiler.timed("display")(overlay.render))
+    sim.run(distill() if OBSERVATION == "distill" else train())
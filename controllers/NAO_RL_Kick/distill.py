@@ -0,0 +1,80 @@
+"""
+Distillation of a privileged-observation Q-table onto the vision state.
+
+The teacher is trained on ground-truth supervisor state (duck distance,
+bearing, height); the deployed controller only has the camera. During
+distillation episodes the teacher acts greedily while both observations
+are taken, and every vision state accumulates the teacher's Q-row for the
+privileged state it co-occurred with. The student's Q(v, a) is the mean of
+those rows, i.e. the teacher's value of each action averaged over the
+true states that look like v, so acting greedily on it picks the action
+that is best in expectation given what the camera can tell apart. Values
+keep the teacher's scale, so vision training can continue from them.
+
+Sums and counts are kept (and saved) rather than the means, so several
+distillation runs accumulate.
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+class PolicyDistiller:
+    """Per-vision-state running sums of teacher Q-rows."""
+
+    def __init__(self, n_actions):
+        self.n_actions = n_actions
+        self.sums = {}
+        self.counts = {}
+        self.samples = 0
+        self.agreements = 0
+        self.unseen = 0   # steps whose privileged state the teacher never visited
+
+    def observe(self, student_state, teacher_q):
+        """One step in which the vision state was `student_state` and the teacher's Q-row `teacher_q`.
+
+        teacher_q is None when the teacher has no row for the privileged state;
+        such steps are only counted, so the student does not average in zeros.
+        """
+        if teacher_q is None:
+            self.unseen += 1
+            return
+        row = self.sums.get(student_state)
+        if row is None:
+            row = self.sums[student_state] = np.zeros(self.n_actions)
+            self.counts[student_state] = 0
+        elif int(np.argmax(row)) == int(np.argmax(teacher_q)):
+            # The student, as it stood before this step, would have acted like the teacher
+            self.agreements += 1
+        row += teacher_q
+        self.counts[student_state] += 1
+        self.samples += 1
+
+    @property
+    def agreement(self):
+        return self.agreements / self.samples if self.samples else 0.0
+
+    def q_table(self):
+        """Student Q-table: mean teacher Q-row per vision state."""
+        return {state: [float(v) for v in self.sums[state] / self.counts[state]] for state in self.sums}
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        serial = {",".join(str(v) for v in state): {"sum": [float(v) for v in row], "count": self.counts[state]}
+                  for state, row in self.sums.items()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(serial, f, indent=2)
+
+    def load(self, path):
+        """Add the sums and counts saved by an earlier run; a missing file is fine."""
+        if not os.path.isfile(path):
+            return False
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        for key, entry in raw.items():
+            state = tuple(map(int, key.split(",")))
+            self.sums[state] = self.sums.get(state, np.zeros(self.n_actions)) + np.asarray(entry["sum"])
+            self.counts[state] = self.counts.get(state, 0) + int(entry["count"])
+        return True
@@ -0,0 +1,140 @@
+"""
+Tabular learners for NAO_RL_Kick.
+
+All learners update the same q_table dict used by the controller
+({state_tuple: [q per action]}), so load_q/save_q keep working whichever
+learner is selected.
+"""
+
+
+class SparseTraces:
+    """Eligibility traces kept only for recently visited state-action pairs.
+
+    Traces decay by gamma * lambda every step and are dropped once they fall
+    below `threshold`; at most `max_size` entries are kept, so an update
+    touches a bounded number of Q-values no matter how long the episode is.
+    """
+
+    def __init__(self, decay, threshold=0.01, max_size=64):
+        self.decay = decay
+        self.threshold = threshold
+        self.max_size = max_size
+        self.traces = {}
+
+    def visit(self, state, action):
+        """Replacing trace: the visited pair gets eligibility 1."""
+        self.traces[(state, action)] = 1.0
+        if len(self.traces) > self.max_size:
+            weakest = min(self.traces, key=self.traces.get)
+            del self.traces[weakest]
+
+    def decay_and_prune(self):
+        decay = self.decay
+        threshold = self.threshold
+        self.traces = {k: e * decay for k, e in self.traces.items() if e * decay >= threshold}
+
+    def clear(self):
+        self.traces.clear()
+
+    def items(self):
+        return self.traces.items()
+
+    def __len__(self):
+        return len(self.traces)
+
+
+class QLearner:
+    """One-step Q-learning (the original NAO_RL_Kick update)."""
+
+    name = "q"
+
+    def __init__(self, q_table, n_actions, alpha, gamma):
+        self.q_table = q_table
+        self.n_actions = n_actions
+        self.alpha = alpha
+        self.gamma = gamma
+
+    def values(self, state):
+        if state not in self.q_table:
+            self.q_table[state] = [0.0 for _ in range(self.n_actions)]
+        return self.q_table[state]
+
+    def start_episode(self):
+        pass
+
+    def td_error(self, state, action, reward, next_state, next_action, done):
+        target = reward
+        if not done:
+            target += self.gamma * max(self.values(next_state))
+        return target - self.values(state)[action]
+
+    def update(self, state, action, reward, next_state, next_action, done=False):
+        """Learn from one transition; returns the TD error."""
+        delta = self.td_error(state, action, reward, next_state, next_action, done)
+        self.values(state)[action] += self.alpha * delta
+        return delta
+
+
+class SarsaLambdaLearner(QLearner):
+    """On-policy SARSA(lambda) with sparse replacing traces."""
+
+    name = "sarsa_lambda"
+
+    def __init__(self, q_table, n_actions, alpha, gamma, lam, trace_threshold=0.01, max_traces=64):
+        super().__init__(q_table, n_actions, alpha, gamma)
+        self.lam = lam
+        self.traces = SparseTraces(gamma * lam, trace_threshold, max_traces)
+
+    def start_episode(self):
+        self.traces.clear()
+
+    def td_error(self, state, action, reward, next_state, next_action, done):
+        target = reward
+        if not done:
+            target += self.gamma * self.values(next_state)[next_action]
+        return target - self.values(state)[action]
+
+    def update(self, state, action, reward, next_state, next_action, done=False):
+        delta = self.td_error(state, action, reward, next_state, next_action, done)
+        self.traces.visit(state, action)
+        step = self.alpha * delta
+        for (s, a), e in self.traces.items():
+            self.values(s)[a] += step * e
+        if done:
+            self.traces.clear()
+        else:
+            self.traces.decay_and_prune()
+        return delta
+
+
+class WatkinsQLambdaLearner(SarsaLambdaLearner):
+    """Watkins Q(lambda): off-policy target, traces cut after exploratory actions."""
+
+    name = "q_lambda"
+
+    def td_error(self, state, action, reward, next_state, next_action, done):
+        return QLearner.td_error(self, state, action, reward, next_state, next_action, done)
+
+    def update(self, state, action, reward, next_state, next_action, done=False):
+        delta = super().update(state, action, reward, next_state, next_action, done)
+        if not done:
+            qv_next = self.values(next_state)
+            if qv_next[next_action] < max(qv_next):
+                self.traces.clear()
+        return delta
+
+
+LEARNERS = {
+    QLearner.name: QLearner,
+    SarsaLambdaLearner.name: SarsaLambdaLearner,
+    WatkinsQLambdaLearner.name: WatkinsQLambdaLearner,
+}
+
+
+def make_learner(name, q_table, n_actions, alpha, gamma, lam=0.8, **trace_options):
+    """Build a learner by name: 'q', 'sarsa_lambda' or 'q_lambda'."""
+    if name not in LEARNERS:
+        raise ValueError(f"Unknown learner '{name}', expected one of {sorted(LEARNERS)}")
+    if name == QLearner.name:
+        return QLearner(q_table, n_actions, alpha, gamma)
+    return LEARNERS[name](q_table, n_actions, alpha, gamma, lam, **trace_options)
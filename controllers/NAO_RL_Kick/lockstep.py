@@ -0,0 +1,113 @@
+"""
+Arenas and agent messaging for NAO_RL_Kick's multi-arena lockstep trainer.
+
+In a world written by tools/make_arena_world.py, arena i has DEF ARENA_i,
+NAO_i and DUCK_i, and NAO_i runs NAO_RL_Kick_Agent on channel i + 1. The
+trainer is a bodiless supervisor: it reads every pose straight from the
+nodes, sends "<seq> <action>" to each agent through one emitter, and
+collects the agents' "done <channel> <seq>" answers through a broadcast
+receiver.
+
+An ArenaSlot holds one arena's nodes and episode bookkeeping, its
+early-termination monitor and its own learner, so eligibility traces stay
+per arena while the Q-table is shared.
+"""
+
+
+class AgentChannel:
+    """Commands to the arena agents and their acknowledgements."""
+
+    def __init__(self, emitter, receiver, slots):
+        self.emitter = emitter
+        self.receiver = receiver
+        self.by_channel = {slot.channel: slot for slot in slots}
+        self.sent = 0
+        if receiver is not None:
+            # Agents answer on their own channels
+            receiver.setChannel(receiver.CHANNEL_BROADCAST)
+
+    def send(self, slot, action):
+        slot.seq += 1
+        slot.acked = False
+        if self.emitter is None:
+            return
+        self.emitter.setChannel(slot.channel)
+        self.emitter.send(f"{slot.seq} {action}".encode("utf-8"))
+        self.sent += 1
+
+    def poll(self):
+        """Drain the receiver; marks slots whose current command has been played out."""
+        if self.receiver is None:
+            return
+        while self.receiver.getQueueLength() > 0:
+            words = self.receiver.getString().split()
+            self.receiver.nextPacket()
+            if len(words) != 3 or words[0] != "done":
+                continue   # our own commands, on a shared channel
+            slot = self.by_channel.get(int(words[1]))
+            if slot is not None and int(words[2]) == slot.seq:
+                slot.acked = True
+
+
+class ArenaSlot:
+    """One arena: nodes, placement in the world, and the episode running in it."""
+
+    def __init__(self, robot, index, learner, monitor_factory):
+        self.index = index
+        self.channel = index + 1
+        self.nao = robot.getFromDef(f"NAO_{index}")
+        self.duck = robot.getFromDef(f"DUCK_{index}")
+        if self.nao is None or self.duck is None:
+            raise ValueError(f"Arena {index}: missing DEF NAO_{index} or DUCK_{index}")
+        arena = robot.getFromDef(f"ARENA_{index}")
+        self.center = tuple(arena.getField("translation").getSFVec3f()[:2]) if arena else (0.0, 0.0)
+        self.fields = {name: node.getField(field) for name, node, field in (
+            ("nao_translation", self.nao, "translation"), ("nao_rotation", self.nao, "rotation"),
+            ("duck_translation", self.duck, "translation"), ("duck_rotation", self.duck, "rotation"))}
+        self.initial = {name: list(field.getSFRotation() if "rotation" in name else field.getSFVec3f())
+                        for name, field in self.fields.items()}
+        self.learner = learner
+        self.monitor = monitor_factory(self.nao, self.duck)
+        self.seq = 0
+        self.acked = True
+        self.episode = None    # episode number running here, None once the arena is retired
+        self.state = None
+        self.action = None
+
+    def place(self, placement=None):
+        """Move the NAO and duck to a curriculum placement (arena-local), or back to where the world put them."""
+        if placement is None:
+            for name, field in self.fields.items():
+                if "rotation" in name:
+                    field.setSFRotation(self.initial[name])
+                else:
+                    field.setSFVec3f(self.initial[name])
+        else:
+            cx, cy = self.center
+            (nao_x, nao_y, nao_yaw), (duck_x, duck_y, duck_yaw) = placement
+            self.fields["nao_translation"].setSFVec3f([cx + nao_x, cy + nao_y, self.initial["nao_translation"][2]])
+            self.fields["nao_rotation"].setSFRotation([0.0, 0.0, 1.0, nao_yaw])
+            self.fields["duck_translation"].setSFVec3f([cx + duck_x, cy + duck_y, self.initial["duck_translation"][2]])
+            self.fields["duck_rotation"].setSFRotation([0.0, 0.0, 1.0, duck_yaw])
+        self.nao.resetPhysics()
+        self.duck.resetPhysics()
+
+    def begin(self, episode, time_s, time_ms):
+        """Start `episode` here once the placement has settled."""
+        self.episode = episode
+        self.step = 0
+        self.start_s = time_s
+        self.tick_s = time_s
+        self.total_reward = 0.0
+        self.time_on_ground = 0.0
+        self.start_height = self.duck.getPosition()[2]
+        self.max_height = 0.0
+        self.state = None
+        self.action = None
+        self.learner.start_episode()
+        self.monitor.reset(time_ms)
+
+    @property
+    def idle(self):
+        """The agent has finished its command, or the episode is already over."""
+        return self.acked or self.monitor.reason is not None
@@ -0,0 +1,161 @@
+"""
+Prioritized sweeping over a learned tabular model for NAO_RL_Kick.
+
+Every real transition updates a count/sum model held in NumPy arrays. TD
+errors above `theta` go into a max-priority heap, and planning pops the most
+urgent state-action pair, applies a full expected backup from the model, and
+pushes its likely predecessors so a large reward (e.g. the duck lift) is
+propagated back through the reach-then-close chain between simulator steps.
+"""
+
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+
+class TabularModel:
+    """Transition counts, reward sums and a predecessor index.
+
+    States are the controller's state tuples; they are mapped to dense
+    indices on first sight and the arrays grow by doubling.
+    """
+
+    def __init__(self, n_actions, capacity=16):
+        self.n_actions = n_actions
+        self.index = {}
+        self.states = []
+        self.counts = np.zeros((capacity, n_actions, capacity), dtype=np.float32)
+        self.terminal_counts = np.zeros((capacity, n_actions), dtype=np.float32)
+        self.visits = np.zeros((capacity, n_actions), dtype=np.float32)
+        self.reward_sums = np.zeros((capacity, n_actions), dtype=np.float64)
+        self.predecessors = {}
+
+    def state_id(self, state):
+        sid = self.index.get(state)
+        if sid is None:
+            sid = len(self.states)
+            if sid >= self.visits.shape[0]:
+                self._grow()
+            self.index[state] = sid
+            self.states.append(state)
+            self.predecessors[sid] = set()
+        return sid
+
+    def _grow(self):
+        old = self.visits.shape[0]
+        new = old * 2
+        counts = np.zeros((new, self.n_actions, new), dtype=np.float32)
+        counts[:old, :, :old] = self.counts
+        self.counts = counts
+        for name in ("terminal_counts", "visits", "reward_sums"):
+            array = getattr(self, name)
+            grown = np.zeros((new, self.n_actions), dtype=array.dtype)
+            grown[:old] = array
+            setattr(self, name, grown)
+
+    def record(self, state, action, reward, next_state, done):
+        s = self.state_id(state)
+        s2 = self.state_id(next_state)
+        self.visits[s, action] += 1
+        self.reward_sums[s, action] += reward
+        if done:
+            self.terminal_counts[s, action] += 1
+        else:
+            self.counts[s, action, s2] += 1
+            self.predecessors[s2].add((s, action))
+        return s, s2
+
+    def expected(self, s, action):
+        """Mean reward and (next_ids, probabilities) of non-terminal successors."""
+        n = self.visits[s, action]
+        row = self.counts[s, action, : len(self.states)]
+        next_ids = np.flatnonzero(row)
+        return self.reward_sums[s, action] / n, next_ids, row[next_ids] / n
+
+
+class PrioritizedSweeping:
+    """Model-based planner that backs up Q-values in TD-error priority order."""
+
+    def __init__(self, q_table, n_actions, gamma, theta=1e-3, max_queue=4096):
+        self.q_table = q_table
+        self.n_actions = n_actions
+        self.gamma = gamma
+        self.theta = theta
+        self.max_queue = max_queue
+        self.model = TabularModel(n_actions)
+        self.queue = []
+        self.priority = {}
+        self.counter = itertools.count()
+        self.backups = 0
+        self.planning_time = 0.0
+
+    def values(self, state):
+        if state not in self.q_table:
+            self.q_table[state] = [0.0 for _ in range(self.n_actions)]
+        return self.q_table[state]
+
+    def _target(self, s, action):
+        mean_reward, next_ids, probs = self.model.expected(s, action)
+        if len(next_ids) == 0:
+            return float(mean_reward)
+        states = self.model.states
+        next_max = np.fromiter((max(self.values(states[i])) for i in next_ids), dtype=np.float64,
+                               count=len(next_ids))
+        return float(mean_reward + self.gamma * (probs @ next_max))
+
+    def _push(self, s, action, priority):
+        if priority <= self.theta or priority <= self.priority.get((s, action), 0.0):
+            return
+        if len(self.queue) >= self.max_queue:
+            return
+        self.priority[(s, action)] = priority
+        heapq.heappush(self.queue, (-priority, next(self.counter), s, action))
+
+    def observe(self, state, action, reward, next_state, done=False):
+        """Record a real transition and queue it if the model disagrees with Q."""
+        s, _ = self.model.record(state, action, reward, next_state, done)
+        error = abs(self._target(s, action) - self.values(state)[action])
+        self._push(s, action, error)
+
+    def adjust_reward(self, state, action, delta):
+        """Add `delta` to one already observed reward of (state, action) and requeue it."""
+        s = self.model.index.get(state)
+        if s is None or self.model.visits[s, action] == 0:
+            return
+        self.model.reward_sums[s, action] += delta
+        self._push(s, action, abs(self._target(s, action) - self.values(state)[action]))
+
+    def plan(self, budget_ms):
+        """Run backups until the queue empties or `budget_ms` of wall time is used."""
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000.0
+        states = self.model.states
+        done = 0
+        while self.queue and time.perf_counter() < deadline:
+            neg_priority, _, s, action = heapq.heappop(self.queue)
+            if self.priority.get((s, action)) != -neg_priority:
+                continue  # stale entry superseded by a higher priority push
+            del self.priority[(s, action)]
+
+            self.values(states[s])[action] = self._target(s, action)
+            done += 1
+
+            # Predecessors whose backup now changes propagate the error backward
+            for ps, pa in self.model.predecessors[s]:
+                error = abs(self._target(ps, pa) - self.values(states[ps])[pa])
+                self._push(ps, pa, error)
+        self.backups += done
+        self.planning_time += time.perf_counter() - start
+        return done
+
+    @property
+    def backups_per_second(self):
+        if self.planning_time <= 0.0:
+            return 0.0
+        return self.backups / self.planning_time
+
+    def reset_stats(self):
+        self.backups = 0
+        self.planning_time = 0.0
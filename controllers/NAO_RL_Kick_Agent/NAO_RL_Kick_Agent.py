@@ -1,79 +1,100 @@
-from controller import Robot, Motion
+"""
+Agent side of NAO_RL_Kick: plays the actions a supervisor sends it.
+
+Messages arrive on the NAO's channel. A bare action name ("forward") is
+simply played. Multi-arena worlds (tools/make_arena_world.py) have the
+NAO_RL_Kick trainer send "<seq> <action>"; the agent then answers
+"done <channel> <seq>" once the action has finished, so the trainer can
+step all arenas in lockstep. A new command interrupts the action in
+progress, and "rest" only stops it.
+"""
+
+from controller import Robot
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "libraries", "python"))
+from device_registry import DeviceRegistry
+from keyframe_motion import KeyframePlayer, load_keyframe_motion
+from nao_actions import ARM_POSES, GAIT_FILES, GAIT_STEPS, resolve_motion_dir
+
+MOTION_SPEED = 1.0
+# Gaits this agent plays beyond the NAO_RL_Kick action set
+EXTRA_GAITS = {"kick": "KickRight.motion"}
 
 robot = Robot()
 timestep = int(robot.getBasicTimeStep())
+devices = DeviceRegistry(robot, timestep)
 
-receiver = robot.getDevice("receiver")
-if receiver is None:
-    receiver = robot.getDevice("RECEIVER")
-
+receiver = devices.sensor("receiver") or devices.sensor("RECEIVER")
+emitter = devices["emitter"]
 if receiver is None:
     print("Receiver device not found. Ensure NAO channel is set and receiver exists.")
-else:
-    receiver.enable(timestep)
-
-WEBOTS_HOME = os.environ.get("WEBOTS_HOME", "/Applications/Webots.app/Contents")
-
-
-def resolve_motion_dir(webots_home):
-    if webots_home.endswith(".app"):
-        webots_home = os.path.join(webots_home, "Contents")
-    motion_dir = os.path.join(webots_home, "projects/robots/softbank/nao/motions")
-    if os.path.isdir(motion_dir):
-        return motion_dir
-    if webots_home.endswith("/Contents"):
-        alt_home = webots_home[: -len("/Contents")]
-        alt_motion_dir = os.path.join(alt_home, "Contents/projects/robots/softbank/nao/motions")
-        if os.path.isdir(alt_motion_dir):
-            return alt_motion_dir
-    return motion_dir
-
-
-MOTION_DIR = resolve_motion_dir(WEBOTS_HOME)
-
-
-def load_motion(name):
-    path = os.path.join(MOTION_DIR, name)
-    if not os.path.isfile(path):
-        print(f"Motion missing: {path}")
-        return None
-    try:
-        return Motion(path)
-    except Exception as e:
-        print(f"Motion load error: {e}")
-        return None
-
-
-motions = {
-    "forward": load_motion("Forwards50.motion"),
-    "turn_left": load_motion("TurnLeft60.motion"),
-    "turn_right": load_motion("TurnRight60.motion"),
-    "kick": load_motion("KickRight.motion"),
-}
-
-current_motion = None
-current_action = None
-
-
-def start_motion(action):
-    global current_motion, current_action
-    motion = motions.get(action)
-    if motion is None:
+channel = emitter.getChannel() if emitter else 0
+
+MOTION_DIR = resolve_motion_dir()
+players = {}
+
+
+def player(action):
+    """Keyframe player for a gait action, loaded on first use (None if its motion is missing)."""
+    if action not in players:
+        motion = load_keyframe_motion(MOTION_DIR, {**GAIT_FILES, **EXTRA_GAITS}[action])
+        players[action] = KeyframePlayer(motion, devices, timestep, speed=MOTION_SPEED) if motion else None
+    return players[action]
+
+
+current = None        # KeyframePlayer in progress
+hold_until = None     # ms: arm pose held until then
+pending_seq = None    # command to acknowledge when the action ends
+
+
+def finish():
+    global current, hold_until, pending_seq
+    if current is not None:
+        current.stop()
+    current = None
+    hold_until = None
+    if pending_seq is not None and emitter is not None:
+        emitter.send(f"done {channel} {pending_seq}".encode("utf-8"))
+    pending_seq = None
+
+
+def start(action, seq):
+    global current, hold_until, pending_seq
+    finish()
+    pending_seq = seq
+    if action in GAIT_FILES or action in EXTRA_GAITS:
+        current = player(action)
+        if current is not None:
+            # The same slice of the gait as the trainer's single-arena actions
+            duration = current.motion.duration_ms
+            current.play(speed=MOTION_SPEED,
+                         end_phase=min(1.0, GAIT_STEPS * timestep / duration) if duration > 0 else 1.0)
+            return
+    elif action in ARM_POSES:
+        targets, duration_ms = ARM_POSES[action]
+        for name, position in targets.items():
+            motor = devices[name]
+            if motor:
+                motor.setPosition(position)
+        hold_until = robot.getTime() * 1000.0 + duration_ms
         return
-    motion.play()
-    current_motion = motion
-    current_action = action
+    # "rest", unknown actions and missing motions end at once
+    finish()
 
 
 while robot.step(timestep) != -1:
     if receiver is not None:
         while receiver.getQueueLength() > 0:
-            message = receiver.getData().decode("utf-8")
+            words = receiver.getString().split()
             receiver.nextPacket()
-            start_motion(message)
-
-    if current_motion is not None and current_motion.isOver():
-        current_motion.stop()
-        current_motion = None
-        current_action = None
+            if len(words) == 1:
+                start(words[0], None)
+            elif len(words) == 2 and words[0] != "done":
+                start(words[1], int(words[0]))
+
+    if current is not None and not current.step():
+        finish()
+    elif hold_until is not None and robot.getTime() * 1000.0 >= hold_until:
+        finish()
@@ -1,7 +1,18 @@
 from controller import Robot, Motion
 import math
 import os
-from datetime import datetime
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "libraries", "python"))
+from async_log import AsyncEventLog
+from head_tracker import AlphaBetaTracker, centroid_to_bearing, vertical_fov
+from pose_table import MotorBank, PoseTable
+from min_jerk import StagedTrajectory, TrajectoryStage
+from sensor_hub import SensorHub
+from camera_manager import ACTIVE, CameraManager
+from device_registry import NAO_JOINT_GROUPS, DeviceRegistry
 
 # ============================================================================
 # CONSTANTS - Easy to modify
@@ -11,17 +22,31 @@ TURN_SPEED = 2.0      # Turning speed
 YELLOW_COLOR_THRESHOLD = 50  # Adjust for yellow detection sensitivity
 YELLOW_DETECT_PERCENT = 0.003  # 0.3% yellow pixels to detect object
 YELLOW_NEAR_PERCENT = 0.035     # 3.5% yellow pixels means close enough to pick up
-HEAD_TRACK_YAW_GAIN = 2.0
-HEAD_TRACK_PITCH_GAIN = 1.4
 HEAD_TRACK_SMOOTHING = 0.35  # 0..1, higher = smoother
 HEAD_TRACK_MAX_STEP = 0.06   # max rad per timestep
+HEAD_TRACK_VISION_PERIOD = 4  # Scan for the centroid every N timesteps
+HEAD_TRACK_ALPHA = 0.6        # Alpha-beta filter position gain
+HEAD_TRACK_BETA = 0.15        # Alpha-beta filter velocity gain
+HEAD_TRACK_COAST_MS = 1500    # Keep predicting this long without a detection
 APPROACH_TILT_TARGET = 0.25  # ~14 degrees in radians
-PICKUP_STAGE_TIME = 2400     # ms per pickup stage
+PICKUP_STAGE_TIME = 2400     # ms per pickup stage (upper bound, last stage doubled)
+PICKUP_MOVE_TIME = 1000      # ms of minimum-jerk motion per pickup stage
+PICKUP_DURATION_SCALE = 1.0  # <1 = faster pickup (scales move time and stage bound)
+PICKUP_SETTLE_TOLERANCE = 0.05  # rad; joints this close to target count as settled
+PICKUP_STALL_DELTA = 0.002   # rad per step; slower joints count as stalled (e.g. on the duck)
+FSR_MIN_LOAD = 5.0           # N per foot to count the stance as balanced
+FSR_SAMPLE_PERIOD = 64       # ms between foot force samples
+JOINT_SAMPLE_PERIOD = 32     # ms between joint position samples
+SENSOR_HISTORY = 8           # snapshots kept for derivatives / filtering
+CAMERA_SEARCH_PERIOD = 4     # Render (and scan) every N timesteps while sweeping
 FALL_ANGLE_THRESHOLD = 0.7    # radians (~40 degrees)
 DISTANCE_SCALE = 0.7          # Tunable scale for distance estimate (meters)
 DISTANCE_MIN = 0.15           # Minimum distance clamp (meters)
 DISTANCE_MAX = 2.5            # Maximum distance clamp (meters)
 DISTANCE_TO_OBJECT = 0.5   # Distance threshold for approaching object
+DEBUG_LOG_MAX_BYTES = 1_000_000  # Rotate debug_fall.log past this size
+DEBUG_LOG_BACKUPS = 5            # Keep debug_fall.log.1 ... .5 (one per run)
+STATS_LOG_PERIOD = 250           # Log motor-bank / camera savings every N timesteps
 WEBOTS_HOME = os.environ.get("WEBOTS_HOME", "/Applications/Webots.app/Contents")
 
 def resolve_motion_dir(webots_home):
@@ -49,68 +74,89 @@ if not os.path.isdir(MOTION_DIR):
 # ============================================================================
 robot = Robot()
 timestep = int(robot.getBasicTimeStep())
-
-# Head joints for looking around
-head_yaw = robot.getDevice("HeadYaw")      # Look left/right
-head_pitch = robot.getDevice("HeadPitch")  # Look up/down
-
-# Right arm for picking up
-r_shoulder_pitch = robot.getDevice("RShoulderPitch")
-r_shoulder_roll = robot.getDevice("RShoulderRoll")
-r_elbow_roll = robot.getDevice("RElbowRoll")
-r_elbow_yaw = robot.getDevice("RElbowYaw")
-r_wrist_yaw = robot.getDevice("RWristYaw")
-
-# Left arm
-l_shoulder_pitch = robot.getDevice("LShoulderPitch")
-l_shoulder_roll = robot.getDevice("LShoulderRoll")
-l_elbow_roll = robot.getDevice("LElbowRoll")
-l_elbow_yaw = robot.getDevice("LElbowYaw")
-l_wrist_yaw = robot.getDevice("LWristYaw")
-
-# Leg motors for walking
-l_hip_yaw_pitch = robot.getDevice("LHipYawPitch")
-l_hip_roll = robot.getDevice("LHipRoll")
-l_hip_pitch = robot.getDevice("LHipPitch")
-l_knee_pitch = robot.getDevice("LKneePitch")
-l_ankle_pitch = robot.getDevice("LAnklePitch")
-l_ankle_roll = robot.getDevice("LAnkleRoll")
-
-r_hip_yaw_pitch = robot.getDevice("RHipYawPitch")
-r_hip_roll = robot.getDevice("RHipRoll")
-r_hip_pitch = robot.getDevice("RHipPitch")
-r_knee_pitch = robot.getDevice("RKneePitch")
-r_ankle_pitch = robot.getDevice("RAnklePitch")
-r_ankle_roll = robot.getDevice("RAnkleRoll")
+devices = DeviceRegistry(robot, timestep)
+
+# Head joints for looking around: yaw looks left/right, pitch up/down
+head_yaw, head_pitch = devices.group("head")
+
+# Arm and leg joints are written through a motor bank: poses are staged
+# during a step and only joints whose target changed are sent on commit()
+RIGHT_ARM = NAO_JOINT_GROUPS["right_arm"]
+LEFT_ARM = NAO_JOINT_GROUPS["left_arm"]
+LEFT_LEG = NAO_JOINT_GROUPS["left_leg"]
+RIGHT_LEG = NAO_JOINT_GROUPS["right_leg"]
+
+poses = PoseTable(RIGHT_ARM + LEFT_ARM + LEFT_LEG + RIGHT_LEG)
+poses.add_group("right_arm", RIGHT_ARM)
+poses.add_group("left_arm", LEFT_ARM)
+poses.add_group("left_leg", LEFT_LEG)
+poses.add_group("right_leg", RIGHT_LEG)
+poses.add_pose("right_arm_rest", dict.fromkeys(RIGHT_ARM, 0.0))
+poses.add_pose("arms_lowered", {
+    "RShoulderPitch": 1.0, "RShoulderRoll": 0.3, "RElbowRoll": 0.8, "RElbowYaw": 0.0, "RWristYaw": 0.0,
+    "LShoulderPitch": 1.0, "LShoulderRoll": -0.3, "LElbowRoll": -0.8, "LElbowYaw": 0.0, "LWristYaw": 0.0,
+})
+poses.add_pose("arms_open_wide", {
+    "RShoulderPitch": 0.8, "RShoulderRoll": 0.9, "RElbowRoll": 0.6, "RElbowYaw": 0.0, "RWristYaw": 0.0,
+    "LShoulderPitch": 0.8, "LShoulderRoll": -0.9, "LElbowRoll": -0.6, "LElbowYaw": 0.0, "LWristYaw": 0.0,
+})
+poses.add_pose("arms_closed", {
+    "RShoulderPitch": 1.1, "RShoulderRoll": 0.1, "RElbowRoll": 1.0, "RElbowYaw": 0.0, "RWristYaw": 0.0,
+    "LShoulderPitch": 1.1, "LShoulderRoll": -0.1, "LElbowRoll": -1.0, "LElbowYaw": 0.0, "LWristYaw": 0.0,
+})
+poses.add_pose("arms_pickup", {
+    "RShoulderPitch": 1.1, "RShoulderRoll": 0.3, "RElbowRoll": 0.9, "RElbowYaw": 0.0, "RWristYaw": 0.0,
+    "LShoulderPitch": 1.1, "LShoulderRoll": -0.3, "LElbowRoll": -0.9, "LElbowYaw": 0.0, "LWristYaw": 0.0,
+})
+poses.add_pose("right_arm_throw", {
+    "RShoulderPitch": -0.8, "RShoulderRoll": -0.3, "RElbowRoll": 0.3, "RElbowYaw": 0.0, "RWristYaw": 0.0,
+})
+poses.add_pose("legs_bend_pickup", {
+    "LHipPitch": -0.8, "RHipPitch": -0.8, "LKneePitch": 1.2, "RKneePitch": 1.2,
+    "LAnklePitch": -0.6, "RAnklePitch": -0.6,
+})
+poses.add_pose("legs_pickup_stage1", {
+    "LHipPitch": -0.6, "RHipPitch": -0.6, "LKneePitch": 1.05, "RKneePitch": 1.05,
+    "LAnklePitch": -0.4, "RAnklePitch": -0.4,
+})
+poses.add_pose("legs_pickup_stage2", {
+    "LHipPitch": -0.8, "RHipPitch": -0.8, "LKneePitch": 1.35, "RKneePitch": 1.35,
+    "LAnklePitch": -0.55, "RAnklePitch": -0.55,
+})
+
+# Pickup stage targets win over any default-priority write to the same joint
+STAGE_PRIORITY = 1
+
+motors = MotorBank(devices, poses)
 
 # Camera for object detection
-camera_top = robot.getDevice("CameraTop")
-camera_bottom = robot.getDevice("CameraBottom")
-camera_top.enable(timestep)
-camera_bottom.enable(timestep)
-
+camera_top = devices["CameraTop"]
+camera_bottom = devices["CameraBottom"]
+# Cameras are enabled per state (see the declarations below the state names)
+cameras = CameraManager({"top": camera_top, "bottom": camera_bottom}, timestep,
+                        clock=lambda: robot.getTime() * 1000.0)
+
+# Proprioception: every sensor is read once per step into a snapshot
+sensors = SensorHub(timestep, SENSOR_HISTORY)
 # Inertial unit for fall detection
-inertial_unit = robot.getDevice("inertial unit")
-inertial_unit.enable(timestep)
-
+sensors.add_vector("imu", devices["inertial unit"], method="getRollPitchYaw")
 # Foot sensors (force sensors and bumpers)
-lf_fsr = robot.getDevice("LFsr")
-rf_fsr = robot.getDevice("RFsr")
-lf_fsr.enable(timestep)
-rf_fsr.enable(timestep)
-
-lfootlbumper = robot.getDevice("LFoot/Bumper/Left")
-lfootrbumper = robot.getDevice("LFoot/Bumper/Right")
-rfootlbumper = robot.getDevice("RFoot/Bumper/Left")
-rfootrbumper = robot.getDevice("RFoot/Bumper/Right")
-lfootlbumper.enable(timestep)
-lfootrbumper.enable(timestep)
-rfootlbumper.enable(timestep)
-rfootrbumper.enable(timestep)
-
-# Debug log for fall detection
+sensors.add_vector("lfsr", devices["LFsr"], period=FSR_SAMPLE_PERIOD)
+sensors.add_vector("rfsr", devices["RFsr"], period=FSR_SAMPLE_PERIOD)
+sensors.add_group("bumpers", [
+    devices["LFoot/Bumper/Left"],
+    devices["LFoot/Bumper/Right"],
+    devices["RFoot/Bumper/Left"],
+    devices["RFoot/Bumper/Right"],
+])
+# Arm/leg joint positions, in the motor bank's joint order
+sensors.add_group("joints", [devices[name + "S"] for name in poses.joint_names],
+                  period=JOINT_SAMPLE_PERIOD)
+sensors.build()
+
+# Debug log for fall detection (written by a background thread, rotated per run)
 DEBUG_LOG_PATH = os.path.join(os.path.dirname(__file__), "debug_fall.log")
-debug_log = open(DEBUG_LOG_PATH, "a", buffering=1)
+debug_log = AsyncEventLog(DEBUG_LOG_PATH, max_bytes=DEBUG_LOG_MAX_BYTES, backups=DEBUG_LOG_BACKUPS)
 
 # Baseline orientation for fall detection
 baseline_roll = None
@@ -118,13 +164,12 @@ baseline_pitch = None
 is_fallen = False
 
 def log_fall_event(event, roll, pitch, yaw):
-    timestamp = datetime.now().isoformat(timespec="seconds")
-    debug_log.write(f"{timestamp} {event} roll={roll:.3f} pitch={pitch:.3f} yaw={yaw:.3f}\n")
+    debug_log.log("{} roll={:.3f} pitch={:.3f} yaw={:.3f}", event, roll, pitch, yaw)
 
 
-def log_debug(message):
-    timestamp = datetime.now().isoformat(timespec="seconds")
-    debug_log.write(f"{timestamp} DEBUG {message}\n")
+def log_debug(template, *args):
+    """Queue a debug line; `template.format(*args)` runs on the log's writer thread."""
+    debug_log.log("DEBUG " + template, *args)
 
 # Motion files for walking/turning (built-in Webots NAO motions)
 def load_motion(path):
@@ -160,11 +205,17 @@ STATE_APPROACH = "approach"  # Moving towards box
 STATE_PICKUP = "pickup"      # Picking up the box
 STATE_THROW = "throw"        # Throwing the box
 
+# Camera needs per state: camera name (or the head-pitch choice) -> period multiplier
+cameras.declare(STATE_SEARCH, {ACTIVE: CAMERA_SEARCH_PERIOD})
+cameras.declare(STATE_APPROACH, {ACTIVE: 1})
+cameras.declare(STATE_PICKUP, {"bottom": 1})
+cameras.declare(STATE_THROW, {})
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def get_active_camera():
+def preferred_camera_name():
     """Choose which camera to use based on head pitch / lost track state."""
     # Use bottom camera when looking down or when target is lost
     try:
@@ -172,8 +223,26 @@ def get_active_camera():
     except Exception:
         pitch = 0.0
     if pitch > 0.6:
-        return camera_bottom
-    return camera_top
+        return "bottom"
+    return "top"
+
+
+def active_camera_name():
+    """Preferred camera, unless the current state only enables the other one; None if neither is on."""
+    name = preferred_camera_name()
+    if not cameras.is_enabled(name):
+        name = "top" if name == "bottom" else "bottom"
+        if not cameras.is_enabled(name):
+            return None
+    return name
+
+
+def get_active_camera():
+    """The enabled camera to read, or None while the current state renders none."""
+    name = active_camera_name()
+    if name is None:
+        return None
+    return camera_bottom if name == "bottom" else camera_top
 
 
 def get_yellow_percentage():
@@ -224,12 +293,7 @@ def estimate_distance_to_yellow():
 
 def foot_bumper_pressed():
     """Return True if any foot bumper is pressed (contact detected)."""
-    return (
-        lfootlbumper.getValue() > 0.0 or
-        lfootrbumper.getValue() > 0.0 or
-        rfootlbumper.getValue() > 0.0 or
-        rfootrbumper.getValue() > 0.0
-    )
+    return bool(np.any(sensors.get("bumpers") > 0.0))
 
 
 def get_yellow_centroid():
@@ -274,11 +338,40 @@ def get_yellow_centroid():
         return None
 
 
-def track_yellow_with_head():
-    """Adjust head yaw/pitch to keep yellow object centered."""
+def measure_target_bearing():
+    """Scan the active camera and return the head (yaw, pitch) that centers the target."""
+    camera = get_active_camera()
     centroid = get_yellow_centroid()
-    global lost_track_pitch
     if centroid is None:
+        return None
+    try:
+        current_yaw = head_yaw.getTargetPosition()
+        current_pitch = head_pitch.getTargetPosition()
+    except Exception:
+        current_yaw = 0.0
+        current_pitch = 0.0
+    hfov = camera.getFov()
+    vfov = vertical_fov(hfov, camera.getWidth(), camera.getHeight())
+    return centroid_to_bearing(centroid[0], centroid[1], current_yaw, current_pitch, hfov, vfov)
+
+
+def track_yellow_with_head():
+    """Point the head at the predicted target bearing.
+
+    The alpha-beta tracker predicts every timestep; the camera is only
+    scanned every HEAD_TRACK_VISION_PERIOD steps to correct it.
+    """
+    global lost_track_pitch
+    now_ms = robot.getTime() * 1000.0
+    if not head_tracker.advance(now_ms):
+        return  # Already commanded this timestep
+
+    if debug_step % HEAD_TRACK_VISION_PERIOD == 0 or not head_tracker.initialized:
+        bearing = measure_target_bearing()
+        if bearing is not None:
+            head_tracker.correct(now_ms, *bearing)
+
+    if head_tracker.lost:
         # Slowly lower head to try to keep the object in view
         try:
             current_pitch = head_pitch.getTargetPosition()
@@ -288,13 +381,11 @@ def track_yellow_with_head():
         lost_track_pitch = min(1.5, current_pitch + 0.08)
         head_pitch.setPosition(lost_track_pitch)
         if debug_step % 20 == 0:
-            log_debug(f"TRACK_LOST lowering pitch={lost_track_pitch:.2f}")
+            log_debug("TRACK_LOST lowering pitch={:.2f}", lost_track_pitch)
         return
 
-    nx, ny = centroid
-    # Proportional control for head tracking
-    yaw_target = -HEAD_TRACK_YAW_GAIN * nx
-    pitch_target = HEAD_TRACK_PITCH_GAIN * ny + 0.15
+    yaw_target = head_tracker.yaw
+    pitch_target = head_tracker.pitch
 
     # Clamp to safe range
     yaw_target = max(min(yaw_target, 1.2), -1.2)
@@ -352,6 +443,7 @@ def start_motion(motion):
             current_motion = motion
         except Exception:
             current_motion = None
+        motors.invalidate()
 
 
 def stop_motion():
@@ -362,6 +454,8 @@ def stop_motion():
             current_motion.stop()
     except Exception:
         pass
+    if current_motion is not None:
+        motors.invalidate()
     current_motion = None
 
 
@@ -424,111 +518,95 @@ def look_right():
 
 def move_arm_to_rest():
     """Move arm to neutral/rest position."""
-    r_shoulder_pitch.setPosition(0.0)
-    r_shoulder_roll.setPosition(0.0)
-    r_elbow_roll.setPosition(0.0)
-    r_elbow_yaw.setPosition(0.0)
-    r_wrist_yaw.setPosition(0.0)
+    motors.apply("right_arm_rest")
 
 
 def move_arm_to_lowered():
     """Move both arms to lowered starting position."""
-    # Right arm
-    r_shoulder_pitch.setPosition(1.0)   # Lower down
-    r_shoulder_roll.setPosition(0.3)    # Slightly out
-    r_elbow_roll.setPosition(0.8)       # Bent
-    r_elbow_yaw.setPosition(0.0)        # Neutral
-    r_wrist_yaw.setPosition(0.0)        # Neutral
-    
-    # Left arm
-    l_shoulder_pitch.setPosition(1.0)   # Lower down
-    l_shoulder_roll.setPosition(-0.3)   # Slightly out (opposite side)
-    l_elbow_roll.setPosition(-0.8)      # Bent (opposite side)
-    l_elbow_yaw.setPosition(0.0)        # Neutral
-    l_wrist_yaw.setPosition(0.0)        # Neutral
+    motors.apply("arms_lowered")
 
 
 def bend_for_pickup():
     """Bend torso and legs to reach low objects."""
-    l_hip_pitch.setPosition(-0.8)
-    r_hip_pitch.setPosition(-0.8)
-    l_knee_pitch.setPosition(1.2)
-    r_knee_pitch.setPosition(1.2)
-    l_ankle_pitch.setPosition(-0.6)
-    r_ankle_pitch.setPosition(-0.6)
+    motors.apply("legs_bend_pickup")
 
 
-def set_body_tilt(tilt_forward):
-    """Tilt body forward by setting hip/ankle pitch."""
+def body_tilt_targets(tilt_forward):
+    """Hip/ankle pitch targets that tilt the body forward."""
     tilt_forward = max(min(tilt_forward, APPROACH_TILT_TARGET), 0.0)
-    l_hip_pitch.setPosition(-0.35 - tilt_forward)
-    r_hip_pitch.setPosition(-0.35 - tilt_forward)
-    l_ankle_pitch.setPosition(-0.3 - tilt_forward * 0.4)
-    r_ankle_pitch.setPosition(-0.3 - tilt_forward * 0.4)
-
-
-def open_arms_wide():
-    """Open both arms for grasping posture."""
-    r_shoulder_pitch.setPosition(0.8)
-    r_shoulder_roll.setPosition(0.9)
-    r_elbow_roll.setPosition(0.6)
-    r_elbow_yaw.setPosition(0.0)
-    r_wrist_yaw.setPosition(0.0)
-
-    l_shoulder_pitch.setPosition(0.8)
-    l_shoulder_roll.setPosition(-0.9)
-    l_elbow_roll.setPosition(-0.6)
-    l_elbow_yaw.setPosition(0.0)
-    l_wrist_yaw.setPosition(0.0)
-
-
-def close_arms_in():
-    """Close both arms to grasp."""
-    r_shoulder_pitch.setPosition(1.1)
-    r_shoulder_roll.setPosition(0.1)
-    r_elbow_roll.setPosition(1.0)
-    r_elbow_yaw.setPosition(0.0)
-    r_wrist_yaw.setPosition(0.0)
-
-    l_shoulder_pitch.setPosition(1.1)
-    l_shoulder_roll.setPosition(-0.1)
-    l_elbow_roll.setPosition(-1.0)
-    l_elbow_yaw.setPosition(0.0)
-    l_wrist_yaw.setPosition(0.0)
-
-
-def move_arm_to_pickup():
-    """Move both arms down to pickup position."""
-    # Right arm
-    r_shoulder_pitch.setPosition(1.1)   # Reach down
-    r_shoulder_roll.setPosition(0.3)    # Slightly out
-    r_elbow_roll.setPosition(0.9)       # Bend elbow (within limits)
-    r_elbow_yaw.setPosition(0.0)        # Neutral
-    r_wrist_yaw.setPosition(0.0)        # Neutral
-
-    # Left arm
-    l_shoulder_pitch.setPosition(1.1)   # Reach down
-    l_shoulder_roll.setPosition(-0.3)   # Slightly out (opposite)
-    l_elbow_roll.setPosition(-0.9)      # Bend elbow (opposite)
-    l_elbow_yaw.setPosition(0.0)        # Neutral
-    l_wrist_yaw.setPosition(0.0)        # Neutral
+    hip = -0.35 - tilt_forward
+    ankle = -0.3 - tilt_forward * 0.4
+    return {"LHipPitch": hip, "RHipPitch": hip, "LAnklePitch": ankle, "RAnklePitch": ankle}
 
 
 def move_arm_to_throw():
     """Move arm up to throw position."""
-    r_shoulder_pitch.setPosition(-0.8)  # Raise up
-    r_shoulder_roll.setPosition(-0.3)   # Out to side
-    r_elbow_roll.setPosition(0.3)       # Extended
-    r_elbow_yaw.setPosition(0.0)        # Neutral
-    r_wrist_yaw.setPosition(0.0)        # Open hand
+    motors.apply("right_arm_throw")
+
+
+def feet_loaded():
+    """True when both feet carry at least FSR_MIN_LOAD (stable stance)."""
+    left = sensors.get("lfsr")[2]
+    right = sensors.get("rfsr")[2]
+    if np.isnan(left) or np.isnan(right):
+        return True
+    return left >= FSR_MIN_LOAD and right >= FSR_MIN_LOAD
+
+
+def joints_settled(target):
+    """True when the targeted joints reached their target or stopped moving."""
+    # Compare against the snapshot one joint-sample period ago
+    window = JOINT_SAMPLE_PERIOD // timestep + 1
+    recent = sensors.history("joints", window)
+    positions = recent[-1]
+    previous = recent[0] if len(recent) == window else None
+    mask = ~np.isnan(target) & ~np.isnan(positions)
+    if not mask.any():
+        return True
+    if np.max(np.abs(positions[mask] - target[mask])) < PICKUP_SETTLE_TOLERANCE:
+        return True
+    return previous is not None and np.max(np.abs(positions[mask] - previous[mask])) < PICKUP_STALL_DELTA
+
+
+def make_pickup_stage(name, target, max_ms, require_balance=True):
+    def done_when():
+        return joints_settled(target) and (not require_balance or feet_loaded())
+    return TrajectoryStage(name, target, PICKUP_MOVE_TIME, max_ms, done_when)
+
+
+# Stage 1: lower knees and open arms; stage 2: crouch further and reach down;
+# stage 3: close arms to grasp (ends when the arms stall on the duck)
+pickup_trajectory = StagedTrajectory([
+    make_pickup_stage("crouch_open", poses.compose(body_tilt_targets(0.15), "legs_pickup_stage1",
+                                                   "arms_open_wide"), PICKUP_STAGE_TIME),
+    make_pickup_stage("reach_down", poses.compose(body_tilt_targets(0.2), "legs_pickup_stage2",
+                                                  "arms_pickup"), PICKUP_STAGE_TIME),
+    make_pickup_stage("grasp", poses.compose(body_tilt_targets(0.2), "arms_closed"),
+                      PICKUP_STAGE_TIME * 2, require_balance=False),
+], timestep, PICKUP_DURATION_SCALE)
+
+pickup_count = 0
+pickup_fall_count = 0
+pickup_fell = False
+
+
+def begin_pickup():
+    """Precompute the pickup trajectory from the current joint positions."""
+    global pickup_fell
+    stop()
+    pickup_fell = False
+    pickup_trajectory.start(sensors.get("joints"))
 
 
 # ============================================================================
 # MAIN CONTROL LOOP
 # ============================================================================
+head_tracker = AlphaBetaTracker(HEAD_TRACK_ALPHA, HEAD_TRACK_BETA, HEAD_TRACK_COAST_MS)
+
 # Initialize robot posture
 move_arm_to_lowered()
 set_walk_stance()
+motors.commit()
 
 state = STATE_SEARCH
 search_time = 0
@@ -541,12 +619,17 @@ lost_track_pitch = 0.0
 lost_target_timer = 0
 
 while robot.step(timestep) != -1:
+    sensors.sample(robot.getTime() * 1000.0)
+    cameras.apply(state, preferred_camera_name())
+    cameras.tick()
     action_timer += timestep
     debug_step += 1
+    if debug_step == 1:
+        print(devices.startup_report())
     if target_locked:
         track_yellow_with_head()
     # Fall detection
-    roll, pitch, yaw = inertial_unit.getRollPitchYaw()
+    roll, pitch, yaw = sensors.get("imu")
     if baseline_roll is None:
         baseline_roll = roll
         baseline_pitch = pitch
@@ -564,7 +647,9 @@ while robot.step(timestep) != -1:
     
     # STATE: SEARCH
     if state == STATE_SEARCH:
-        if detect_yellow_object():
+        # Only scan when the sweep camera has rendered a new frame
+        name = active_camera_name()
+        if name is not None and cameras.fresh(name) and detect_yellow_object():
             state = STATE_APPROACH
             action_timer = 0
             track_yellow_with_head()
@@ -610,7 +695,7 @@ while robot.step(timestep) != -1:
         distance_est = estimate_distance_to_yellow()
         if debug_step % 20 == 0:
             cam_name = "bottom" if get_active_camera() == camera_bottom else "top"
-            log_debug(f"APPROACH cam={cam_name} yellow={yellow_percentage:.4f} dist={distance_est}")
+            log_debug("APPROACH cam={} yellow={:.4f} dist={}", cam_name, yellow_percentage, distance_est)
 
         if yellow_percentage < YELLOW_DETECT_PERCENT:
             lost_target_timer += timestep
@@ -621,13 +706,13 @@ while robot.step(timestep) != -1:
             # Contact detected
             state = STATE_PICKUP
             action_timer = 0
-            stop()
+            begin_pickup()
             log_debug("FOOT_CONTACT -> PICKUP")
         # Only trigger pickup if object lost for sustained period (4+ seconds) or foot contact
         elif lost_target_timer > 4000:
             state = STATE_PICKUP
             action_timer = 0
-            stop()
+            begin_pickup()
             log_debug("LOST_TARGET -> PICKUP")
         else:
             track_yellow_with_head()
@@ -636,36 +721,23 @@ while robot.step(timestep) != -1:
     
     # STATE: PICKUP
     elif state == STATE_PICKUP:
-        # Stage 1: lower knees slowly and open arms (stable)
-        if action_timer < PICKUP_STAGE_TIME:
+        # Minimum-jerk stages; each ends early once joints settle and feet are loaded
+        pickup_fell = pickup_fell or is_fallen
+        targets = pickup_trajectory.step()
+        if targets is not None:
             track_yellow_with_head()
-            set_body_tilt(0.15)
-            l_hip_pitch.setPosition(-0.6)
-            r_hip_pitch.setPosition(-0.6)
-            l_knee_pitch.setPosition(1.05)
-            r_knee_pitch.setPosition(1.05)
-            l_ankle_pitch.setPosition(-0.4)
-            r_ankle_pitch.setPosition(-0.4)
-            open_arms_wide()
-        # Stage 2: lower knees further, keep torso stable, reach down
-        elif action_timer < PICKUP_STAGE_TIME * 2:
-            track_yellow_with_head()
-            set_body_tilt(0.2)
-            l_hip_pitch.setPosition(-0.8)
-            r_hip_pitch.setPosition(-0.8)
-            l_knee_pitch.setPosition(1.35)
-            r_knee_pitch.setPosition(1.35)
-            l_ankle_pitch.setPosition(-0.55)
-            r_ankle_pitch.setPosition(-0.55)
-            move_arm_to_pickup()
-        # Stage 3: close arms slowly to grasp
-        elif action_timer < PICKUP_STAGE_TIME * 4:
-            track_yellow_with_head()
-            set_body_tilt(0.2)
-            close_arms_in()
+            motors.apply_vector(targets, STAGE_PRIORITY)
         else:
+            pickup_count += 1
+            pickup_fall_count += int(pickup_fell)
+            log_debug("PICKUP_DONE time={} fell={} fall_rate={}/{} scale={} stages={}",
+                      pickup_trajectory.elapsed, pickup_fell, pickup_fall_count, pickup_count,
+                      PICKUP_DURATION_SCALE, dict(pickup_trajectory.stage_times))
             state = STATE_THROW
             action_timer = 0
+            # THROW renders no camera, so stop tracking; SEARCH sweeps for a new target
+            target_locked = False
+            head_tracker.reset()
     
     # STATE: THROW (repurposed as TURN_AROUND)
     elif state == STATE_THROW:
@@ -677,4 +749,14 @@ while robot.step(timestep) != -1:
             state = STATE_SEARCH
             action_timer = 0
 
-
+    # Send only the joint targets that changed this step
+    motors.commit()
+    if debug_step % STATS_LOG_PERIOD == 0:
+        log_debug("MOTORS requested={} written={} saved_per_step={:.1f}",
+                  motors.requested, motors.written, motors.saved_per_step)
+        log_debug("CAMERAS camera frames {:.0f}/{:.0f} saved={:.1f}/sim-s",
+                  cameras.frames, cameras.baseline_frames, cameras.frames_saved_per_second)
+        motors.reset_stats()
+        cameras.reset_stats()
+
+debug_log.close()
@@ -0,0 +1,89 @@
+"""
+Predictive head tracking for NAO_Wave.
+
+An alpha-beta filter keeps the target bearing (head yaw/pitch that would
+center it) and its rate. It predicts every control step and is corrected
+only when a vision measurement is available, so the head keeps moving
+smoothly while the camera is scanned every N steps.
+"""
+
+import math
+
+
+def vertical_fov(horizontal_fov, width, height):
+    """Vertical field of view of a pinhole camera from its horizontal FOV."""
+    return 2.0 * math.atan(math.tan(horizontal_fov / 2.0) * height / width)
+
+
+def centroid_to_bearing(nx, ny, head_yaw, head_pitch, hfov, vfov):
+    """Convert a normalized image centroid ([-1, 1], +x right, +y down) into
+    the head yaw/pitch that would put it in the center of the image it was
+    measured in. Bearings are in the frame of the camera being read, so a
+    centered target leaves the head where it is whichever camera is active."""
+    yaw = head_yaw - nx * hfov / 2.0
+    pitch = head_pitch + ny * vfov / 2.0
+    return yaw, pitch
+
+
+class AlphaBetaTracker:
+    """Constant-velocity alpha-beta filter on (yaw, pitch) bearings.
+
+    alpha, beta:     position and velocity correction gains
+    coast_ms:        how long to keep predicting without a measurement
+                     before the target counts as lost
+    velocity_decay:  per-step velocity damping while coasting
+    """
+
+    def __init__(self, alpha=0.6, beta=0.15, coast_ms=1500, velocity_decay=0.95):
+        self.alpha = alpha
+        self.beta = beta
+        self.coast_ms = coast_ms
+        self.velocity_decay = velocity_decay
+        self.yaw = 0.0
+        self.pitch = 0.0
+        self.yaw_rate = 0.0    # rad/ms
+        self.pitch_rate = 0.0  # rad/ms
+        self.last_time = None
+        self.last_measurement = None
+        self.initialized = False
+
+    def advance(self, now_ms):
+        """Predict forward to now_ms. Returns False if already at now_ms."""
+        if self.last_time is not None and now_ms <= self.last_time:
+            return False
+        if self.initialized and self.last_time is not None:
+            dt = now_ms - self.last_time
+            self.yaw += self.yaw_rate * dt
+            self.pitch += self.pitch_rate * dt
+            if now_ms - self.last_measurement > dt:
+                self.yaw_rate *= self.velocity_decay
+                self.pitch_rate *= self.velocity_decay
+        self.last_time = now_ms
+        return True
+
+    def correct(self, now_ms, yaw, pitch):
+        """Fuse a measured bearing taken at now_ms (re-initializes once lost)."""
+        if self.lost:
+            self.yaw, self.pitch = yaw, pitch
+            self.yaw_rate = self.pitch_rate = 0.0
+            self.initialized = True
+        else:
+            dt = max(now_ms - self.last_measurement, 1.0)
+            yaw_residual = yaw - self.yaw
+            pitch_residual = pitch - self.pitch
+            self.yaw += self.alpha * yaw_residual
+            self.pitch += self.alpha * pitch_residual
+            self.yaw_rate += self.beta * yaw_residual / dt
+            self.pitch_rate += self.beta * pitch_residual / dt
+        self.last_measurement = now_ms
+        self.last_time = now_ms
+
+    @property
+    def lost(self):
+        if not self.initialized:
+            return True
+        return self.last_time - self.last_measurement > self.coast_ms
+
+    def reset(self):
+        self.initialized = False
+        self.yaw_rate = self.pitch_rate = 0.0
@@ -0,0 +1,118 @@
+"""
+Asynchronous, batched event log with size and per-run rotation.
+
+The control loop only appends (time, format, args) tuples to an in-memory
+ring buffer; a background thread formats and writes them in batches. The
+loop never touches the filesystem, and close() (also run at interpreter
+exit) drains everything that is still buffered.
+"""
+
+import atexit
+import collections
+import os
+import threading
+import time
+from datetime import datetime
+
+
+class AsyncEventLog:
+    """Ring-buffered log file written by a background thread.
+
+    capacity:        events kept in memory; when full the oldest are dropped
+                     and counted in `dropped` instead of blocking the caller
+    flush_interval:  seconds between background drains
+    max_bytes:       rotate once the file grows past this size
+    backups:         rotated files kept as path.1 ... path.N
+    rotate_on_start: start every run in a fresh file
+    """
+
+    def __init__(self, path, capacity=8192, flush_interval=0.5, max_bytes=1_000_000,
+                 backups=5, rotate_on_start=True):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.buffer = collections.deque(maxlen=capacity)
+        self.dropped = 0
+        self.written = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = None
+
+        if rotate_on_start and os.path.isfile(path) and os.path.getsize(path) > 0:
+            self._rotate()
+        self._open()
+
+        self._thread = threading.Thread(target=self._run, name="AsyncEventLog", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, template, *args):
+        """Queue one line; `template.format(*args)` runs on the writer thread."""
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((time.time(), template, args))
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.isfile(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0 and os.path.isfile(self.path):
+            os.replace(self.path, f"{self.path}.1")
+
+    def _drain(self):
+        lines = []
+        buffer = self.buffer
+        while buffer:
+            try:
+                stamp, template, args = buffer.popleft()
+            except IndexError:
+                break
+            timestamp = datetime.fromtimestamp(stamp).isoformat(timespec="seconds")
+            try:
+                text = template.format(*args) if args else template
+            except Exception as e:
+                text = f"{template!r} {args!r} (format error: {e})"
+            lines.append(f"{timestamp} {text}\n")
+        if not lines:
+            return
+        self._file.write("".join(lines))
+        self._file.flush()
+        self.written += len(lines)
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+            self._open()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                print(f"AsyncEventLog write error: {e}")
+
+    def flush(self):
+        """Ask the writer thread to drain now (does not wait)."""
+        self._wake.set()
+
+    def close(self):
+        """Stop the writer and synchronously write whatever is still buffered."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        try:
+            self._drain()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,133 @@
+"""
+Reactive red-ball chase for the e-puck.
+
+Vision and control are written over NumPy arrays with a leading robot axis,
+so the same code drives one e-puck (EPuck_Red_Ball) or a batch of them.
+
+    red_bearing(frames)  -> (red fraction, bearing in [-1, 1]) per frame
+    BallChaser.step(...) -> (left, right) wheel speeds per robot
+
+The controller fuses all eight proximity sensors through a Braitenberg
+weight matrix with the ball bearing, and searches toward the side where
+the ball was last seen instead of spinning blindly.
+"""
+
+import numpy as np
+
+MAX_SPEED = 6.28  # rad/s
+
+# Red: high R, low G and B (BGRA byte order from camera.getImage())
+RED_MIN_R = 200
+RED_MAX_GB = 100
+SCAN_STRIDE = 2  # Scan every 2 pixels
+
+# Proximity sensors: raw values below PS_FLOOR are ambient noise, PS_RANGE
+# above it means touching
+PS_FLOOR = 80.0
+PS_RANGE = 1000.0
+
+# Braitenberg weights, one row per sensor ps0..ps7: (left wheel, right wheel).
+# ps0-ps2 are on the right side, ps5-ps7 on the left, ps3/ps4 at the back.
+BRAITENBERG_WEIGHTS = np.array([
+    [-1.0, 0.8],
+    [-0.8, 0.6],
+    [-0.4, 0.3],
+    [0.1, 0.0],
+    [0.0, 0.1],
+    [0.3, -0.4],
+    [0.6, -0.8],
+    [0.8, -1.0],
+])
+FRONT_SENSORS = [0, 7]
+
+CHASE_SPEED = 0.8          # fraction of MAX_SPEED while the ball is visible
+STEER_GAIN = 0.6           # wheel speed difference per unit bearing
+AVOID_GAIN = 1.0           # weight of the Braitenberg obstacle term
+NEAR_FRACTION = 0.15       # red fraction at which front obstacles are the ball itself
+REACHED_FRACTION = 0.35    # red fraction at which the ball is reached
+SEARCH_SPEED = 0.4         # fraction of MAX_SPEED when turning toward the last bearing
+SEARCH_SPIN_MS = 3000      # turn in place this long before wandering
+WANDER_SPEED = 0.6         # forward speed while wandering with a slow arc
+WANDER_ARC = 0.3
+
+
+def frames_from_image(image, width, height):
+    """View a camera.getImage() buffer as an (H, W, 4) uint8 BGRA array."""
+    return np.frombuffer(image, dtype=np.uint8).reshape(height, width, 4)
+
+
+def red_bearing(frames):
+    """Red pixel fraction and horizontal bearing for one frame or a batch.
+
+    frames: (..., H, W, 4) BGRA. Bearing is -1 at the left image edge, +1 at
+    the right edge and 0 where no red pixel is visible.
+    """
+    sub = frames[..., ::SCAN_STRIDE, ::SCAN_STRIDE, :]
+    mask = (sub[..., 2] > RED_MIN_R) & (sub[..., 1] < RED_MAX_GB) & (sub[..., 0] < RED_MAX_GB)
+    width = frames.shape[-2]
+    columns = np.arange(0, width, SCAN_STRIDE, dtype=np.float64)
+    count = mask.sum(axis=(-2, -1))
+    column_sum = (mask.sum(axis=-2) * columns).sum(axis=-1)
+    center = (width - 1) / 2.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bearing = np.where(count > 0, (column_sum / count - center) / center, 0.0)
+    fraction = count / float(mask.shape[-2] * mask.shape[-1])
+    return fraction, bearing
+
+
+def obstacle_activation(ps_values):
+    """Normalize raw proximity readings to [0, 1] (1 = touching)."""
+    return np.clip((np.asarray(ps_values, dtype=np.float64) - PS_FLOOR) / PS_RANGE, 0.0, 1.0)
+
+
+class BallChaser:
+    """Ball chase + Braitenberg avoidance + memory-guided search for n robots."""
+
+    def __init__(self, n, timestep):
+        self.n = n
+        self.timestep = timestep
+        self.last_bearing = np.ones(n)     # search direction (+1 = turn right)
+        self.unseen_ms = np.zeros(n)
+        self.reached = np.zeros(n, dtype=bool)
+
+    def step(self, fraction, bearing, ps_values):
+        """Wheel speeds (left, right), each shape (n,), for this control step."""
+        fraction = np.asarray(fraction, dtype=np.float64).reshape(self.n)
+        bearing = np.asarray(bearing, dtype=np.float64).reshape(self.n)
+        activation = obstacle_activation(ps_values).reshape(self.n, 8)
+
+        seen = fraction > 0.0
+        self.last_bearing = np.where(seen & (bearing != 0.0), np.sign(bearing), self.last_bearing)
+        self.unseen_ms = np.where(seen, 0.0, self.unseen_ms + self.timestep)
+        self.reached = fraction >= REACHED_FRACTION
+
+        # Chase: forward with proportional steering toward the ball
+        chase = CHASE_SPEED * (1.0 - 0.5 * np.clip(fraction / REACHED_FRACTION, 0.0, 1.0))
+        chase_left = chase * (1.0 + STEER_GAIN * bearing)
+        chase_right = chase * (1.0 - STEER_GAIN * bearing)
+
+        # Search: turn toward the last bearing, then wander in an arc
+        spinning = self.unseen_ms < SEARCH_SPIN_MS
+        search_left = np.where(spinning, SEARCH_SPEED * self.last_bearing,
+                               WANDER_SPEED * (1.0 + WANDER_ARC * self.last_bearing))
+        search_right = np.where(spinning, -SEARCH_SPEED * self.last_bearing,
+                                WANDER_SPEED * (1.0 - WANDER_ARC * self.last_bearing))
+
+        left = np.where(seen, chase_left, search_left)
+        right = np.where(seen, chase_right, search_right)
+
+        # Obstacles: don't avoid the ball itself when it fills the view ahead
+        near_ball = np.clip(fraction / NEAR_FRACTION, 0.0, 1.0) * (1.0 - np.abs(bearing))
+        weights = np.ones((self.n, 8))
+        weights[:, FRONT_SENSORS] -= near_ball[:, None]
+        weighted = activation * weights
+        avoid = weighted @ BRAITENBERG_WEIGHTS
+        # Head-on obstacle: break the tie toward the side the ball was last seen
+        front = weighted[:, FRONT_SENSORS].min(axis=1)
+        left = left + AVOID_GAIN * (avoid[:, 0] + front * self.last_bearing)
+        right = right + AVOID_GAIN * (avoid[:, 1] - front * self.last_bearing)
+
+        left = np.where(self.reached, 0.0, left)
+        right = np.where(self.reached, 0.0, right)
+        return (np.clip(left, -1.0, 1.0) * MAX_SPEED,
+                np.clip(right, -1.0, 1.0) * MAX_SPEED)
@@ -0,0 +1,113 @@
+"""
+State-dependent camera sampling periods.
+
+Webots renders an image for every enabled camera at its sampling period,
+whether or not the controller reads it. A CameraManager lets each
+controller state declare which cameras it needs and how often, and
+enables, disables or re-periods the cameras only when the requirement
+changes. It also counts rendered frames against the naive setup (every
+camera enabled at the basic timestep), and, given a clock, tells whether a
+camera has rendered a new frame this step (fresh()).
+"""
+
+ACTIVE = "active"  # Placeholder camera name: whichever camera the controller picks
+
+
+class CameraManager:
+    """Enables cameras according to per-state needs.
+
+    needs maps a camera name (or ACTIVE) to a period multiplier of the basic
+    timestep; cameras not listed are disabled in that state. clock returns
+    the simulation time in ms (e.g. lambda: robot.getTime() * 1000.0); it is
+    only needed for fresh().
+    """
+
+    def __init__(self, cameras, timestep, render_ms_per_frame=None, clock=None):
+        self.cameras = {name: cam for name, cam in cameras.items() if cam is not None}
+        self.timestep = timestep
+        self.render_ms_per_frame = render_ms_per_frame
+        self.clock = clock
+        self.needs = {}
+        self.periods = {name: 0 for name in self.cameras}  # 0 = disabled
+        self.enabled_ms = {name: None for name in self.cameras}
+        self.state = None
+        self.active = None
+        self.frames = 0.0
+        self.baseline_frames = 0.0
+        self.sim_ms = 0.0
+        self.switches = 0
+
+    def declare(self, state, needs):
+        self.needs[state] = dict(needs)
+
+    def apply(self, state, active=None):
+        """Switch cameras for `state`; `active` names the camera ACTIVE refers to."""
+        if state == self.state and active == self.active:
+            return
+        self.state = state
+        self.active = active
+        wanted = {}
+        for name, multiplier in self.needs.get(state, {}).items():
+            if name == ACTIVE:
+                name = active
+            if name in self.cameras:
+                period = int(multiplier * self.timestep)
+                wanted[name] = min(wanted.get(name, period), period)
+        for name, camera in self.cameras.items():
+            period = wanted.get(name, 0)
+            if period == self.periods[name]:
+                continue
+            if period:
+                camera.enable(period)
+            else:
+                camera.disable()
+            self.periods[name] = period
+            self.enabled_ms[name] = self.clock() if period and self.clock else None
+            self.switches += 1
+
+    def is_enabled(self, name):
+        return self.periods.get(name, 0) > 0
+
+    def fresh(self, name):
+        """True if `name` rendered a new frame at the current time.
+
+        A camera enabled at time t renders at t + period, t + 2 * period, ...,
+        so frames are counted from when this manager enabled it. Without a
+        clock this is the same as is_enabled().
+        """
+        period = self.periods.get(name, 0)
+        if not period:
+            return False
+        if self.enabled_ms[name] is None:
+            return True
+        elapsed = round(self.clock() - self.enabled_ms[name])
+        return elapsed > 0 and elapsed % period == 0
+
+    def tick(self, elapsed_ms=None):
+        """Account for one step (or elapsed_ms) of rendering."""
+        elapsed_ms = elapsed_ms or self.timestep
+        self.sim_ms += elapsed_ms
+        self.baseline_frames += len(self.cameras) * elapsed_ms / self.timestep
+        for period in self.periods.values():
+            if period:
+                self.frames += elapsed_ms / period
+
+    @property
+    def frames_saved_per_second(self):
+        """Camera frames not rendered per simulated second vs. always-on cameras."""
+        if self.sim_ms <= 0:
+            return 0.0
+        return (self.baseline_frames - self.frames) * 1000.0 / self.sim_ms
+
+    def report(self):
+        text = (f"camera frames {self.frames:.0f}/{self.baseline_frames:.0f} "
+                f"saved={self.frames_saved_per_second:.1f}/sim-s")
+        if self.render_ms_per_frame:
+            saved_ms = self.frames_saved_per_second * self.render_ms_per_frame
+            text += f" (~{saved_ms:.0f} ms render/sim-s)"
+        return text
+
+    def reset_stats(self):
+        self.frames = 0.0
+        self.baseline_frames = 0.0
+        self.sim_ms = 0.0
@@ -0,0 +1,98 @@
+"""
+Lazy device registry for controller start-up.
+
+Controllers used to call robot.getDevice for every joint and sensor at
+import time, including devices they never touch (and some twice). A
+DeviceRegistry resolves a handle the first time it is asked for and
+caches it, missing devices included (as None):
+
+    devices = DeviceRegistry(robot, timestep)
+    devices["HeadYaw"].setPosition(0.3)
+    r_shoulder_pitch, r_shoulder_roll, *_ = devices.group("right_arm")
+    touched = devices.sensor("LFoot/Bumper/Left").getValue()
+
+sensor() enables a sensor the first time it is requested. As with any
+Webots sensor, the first value is available after the next robot.step.
+The registry also has getDevice(), so it can be passed where a robot is
+only used for device lookups (MotorBank, SensorHub set-up, ...).
+
+startup_report() gives the time from process start to the first step,
+plus what the lookups cost. That time is paid again on every world
+reload.
+"""
+
+import os
+import time
+
+_IMPORTED = time.monotonic()
+
+NAO_JOINT_GROUPS = {
+    "head": ["HeadYaw", "HeadPitch"],
+    "right_arm": ["RShoulderPitch", "RShoulderRoll", "RElbowRoll", "RElbowYaw", "RWristYaw"],
+    "left_arm": ["LShoulderPitch", "LShoulderRoll", "LElbowRoll", "LElbowYaw", "LWristYaw"],
+    "left_leg": ["LHipYawPitch", "LHipRoll", "LHipPitch", "LKneePitch", "LAnklePitch", "LAnkleRoll"],
+    "right_leg": ["RHipYawPitch", "RHipRoll", "RHipPitch", "RKneePitch", "RAnklePitch", "RAnkleRoll"],
+}
+
+
+def process_age():
+    """Seconds since this process started (Linux); since this module's import elsewhere."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            # Field 22 is the start time in clock ticks after boot; the command
+            # name (field 2) may contain spaces, so split after its ')'
+            start_ticks = int(f.read().rsplit(b")", 1)[1].split()[19])
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _IMPORTED
+
+
+class DeviceRegistry:
+    """Resolves device handles on first access and enables sensors on first use."""
+
+    def __init__(self, robot, timestep, groups=NAO_JOINT_GROUPS):
+        self.robot = robot
+        self.timestep = timestep
+        self.groups = groups
+        self._devices = {}
+        self._groups = {}
+        self._enabled = {}
+        self.lookups = 0
+        self.lookup_s = 0.0
+
+    def __getitem__(self, name):
+        try:
+            return self._devices[name]
+        except KeyError:
+            start = time.perf_counter()
+            device = self._devices[name] = self.robot.getDevice(name)
+            self.lookup_s += time.perf_counter() - start
+            self.lookups += 1
+            return device
+
+    def getDevice(self, name):
+        return self[name]
+
+    def group(self, name):
+        """Devices of a joint group, in the group's order (None for missing ones)."""
+        devices = self._groups.get(name)
+        if devices is None:
+            devices = self._groups[name] = tuple(self[joint] for joint in self.groups[name])
+        return devices
+
+    def sensor(self, name, period=None):
+        """The device, enabled at `period` ms (default: the basic timestep) on the first call."""
+        device = self[name]
+        if device is not None and name not in self._enabled:
+            period = period or self.timestep
+            device.enable(period)
+            self._enabled[name] = period
+        return device
+
+    def startup_report(self):
+        missing = sum(device is None for device in self._devices.values())
+        return (f"Time to first step: {process_age() * 1000.0:.0f} ms "
+                f"({self.lookups} device lookups in {self.lookup_s * 1000.0:.1f} ms, "
+                f"{len(self._enabled)} sensors enabled, {missing} missing)")
@@ -0,0 +1,249 @@
+"""
+Lightweight 2D differential-drive simulator for e-puck behavior tuning.
+
+Not a physics engine: robots are disks driven by ideal wheel kinematics,
+pushed out of walls and boxes on contact, with the eight proximity sensors
+ray-cast against the arena and mapped through the e-puck lookup table.
+All state is held in arrays with a leading robot axis, so thousands of
+robots (one per parameter set) step together.
+
+    arena = Arena.from_wbt("worlds/OBS_World.wbt")
+    sim = DiffDriveSim(arena, n=1000, timestep=32)
+    sim.reset(rng)
+    while ...:
+        ps = sim.proximity()           # (n, 8) raw ps0..ps7 values
+        sim.step(left, right)          # wheel speeds in rad/s, shape (n,)
+    sim.coverage(), sim.collisions, sim.stuck_ms
+"""
+
+import re
+
+import numpy as np
+
+# e-puck geometry
+WHEEL_RADIUS = 0.0205   # m
+AXLE_LENGTH = 0.052     # m
+BODY_RADIUS = 0.037     # m
+MAX_SPEED = 6.28        # rad/s
+
+# Proximity sensors ps0..ps7: heading relative to the robot's forward axis (rad,
+# counterclockwise), mounted on the body rim
+PS_ANGLES = np.array([-0.301, -0.801, -1.571, -2.641, 2.641, 1.571, 0.801, 0.301])
+PS_RADIUS = 0.033
+# E-puck.proto lookup table: distance (m) -> raw value
+PS_LOOKUP_DISTANCE = np.array([0.0, 0.005, 0.01, 0.015, 0.02, 0.03, 0.04, 0.05, 0.06, 0.07])
+PS_LOOKUP_VALUE = np.array([4095.0, 2133.33, 1465.73, 601.46, 383.84, 234.93, 158.03, 120.0, 104.09, 67.19])
+PS_RANGE = PS_LOOKUP_DISTANCE[-1]
+
+COVERAGE_CELL = 0.05     # m, grid cell for coverage
+STUCK_DISTANCE = 0.01    # m, moving less than this ...
+STUCK_WINDOW_MS = 2000   # ... for this long counts as stuck
+
+
+class Arena:
+    """Rectangular arena (inner walls) plus axis-aligned boxes (cx, cy, sx, sy)."""
+
+    def __init__(self, size=(1.0, 1.0), center=(0.0, 0.0), boxes=()):
+        cx, cy = center
+        self.x_min, self.x_max = cx - size[0] / 2.0, cx + size[0] / 2.0
+        self.y_min, self.y_max = cy - size[1] / 2.0, cy + size[1] / 2.0
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.box_min = boxes[:, :2] - boxes[:, 2:] / 2.0   # (B, 2)
+        self.box_max = boxes[:, :2] + boxes[:, 2:] / 2.0
+        self.boxes = boxes
+
+    @classmethod
+    def from_wbt(cls, path, extra_boxes=()):
+        """Arena from a world file: RectangleArena floorSize and WoodenBox/CardboardBox nodes.
+
+        Box rotations are ignored (boxes are treated as axis-aligned).
+        """
+        text = open(path).read()
+        size, center = (1.0, 1.0), (0.0, 0.0)
+        match = re.search(r"RectangleArena\s*\{([^}]*)\}", text)
+        if match:
+            body = match.group(1)
+            floor = re.search(r"floorSize\s+([-\d.e]+)\s+([-\d.e]+)", body)
+            if floor:
+                size = (float(floor.group(1)), float(floor.group(2)))
+            translation = re.search(r"translation\s+([-\d.e]+)\s+([-\d.e]+)", body)
+            if translation:
+                center = (float(translation.group(1)), float(translation.group(2)))
+        boxes = list(extra_boxes)
+        for _, body in re.findall(r"(WoodenBox|CardboardBox)\s*\{([^}]*)\}", text):
+            translation = re.search(r"translation\s+([-\d.e]+)\s+([-\d.e]+)", body)
+            box_size = re.search(r"size\s+([-\d.e]+)\s+([-\d.e]+)", body)
+            sx, sy = (float(box_size.group(1)), float(box_size.group(2))) if box_size else (0.6, 0.6)
+            if translation:
+                boxes.append((float(translation.group(1)), float(translation.group(2)), sx, sy))
+        return cls(size, center, boxes)
+
+    def free_cells(self, cell):
+        """Boolean grid of coverage cells whose centers a robot can reach."""
+        xs = np.arange(self.x_min + cell / 2.0, self.x_max, cell)
+        ys = np.arange(self.y_min + cell / 2.0, self.y_max, cell)
+        gx, gy = np.meshgrid(xs, ys, indexing="ij")
+        points = np.stack([gx, gy], axis=-1)
+        return ~self.collides(points.reshape(-1, 2), BODY_RADIUS).reshape(gx.shape)
+
+    def collides(self, points, radius):
+        """Whether disks of `radius` at `points` (..., 2) overlap a wall or box."""
+        x, y = points[..., 0], points[..., 1]
+        hit = ((x - radius < self.x_min) | (x + radius > self.x_max)
+               | (y - radius < self.y_min) | (y + radius > self.y_max))
+        if len(self.boxes):
+            nearest = np.clip(points[..., None, :], self.box_min, self.box_max)
+            gap = np.linalg.norm(points[..., None, :] - nearest, axis=-1)
+            hit |= (gap < radius).any(axis=-1)
+        return hit
+
+    def ray_distance(self, origin, direction, max_range):
+        """Distance along unit rays (..., 2) to the nearest wall or box, capped at max_range."""
+        ox, oy = origin[..., 0], origin[..., 1]
+        dx, dy = direction[..., 0], direction[..., 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Inside the walls: distance to where the ray leaves the rectangle
+            tx = np.where(dx > 0, (self.x_max - ox) / dx, np.where(dx < 0, (self.x_min - ox) / dx, np.inf))
+            ty = np.where(dy > 0, (self.y_max - oy) / dy, np.where(dy < 0, (self.y_min - oy) / dy, np.inf))
+            distance = np.minimum(tx, ty)
+            if len(self.boxes):
+                # Slab test against every box
+                inv_x = 1.0 / dx[..., None]
+                inv_y = 1.0 / dy[..., None]
+                t1x = (self.box_min[:, 0] - ox[..., None]) * inv_x
+                t2x = (self.box_max[:, 0] - ox[..., None]) * inv_x
+                t1y = (self.box_min[:, 1] - oy[..., None]) * inv_y
+                t2y = (self.box_max[:, 1] - oy[..., None]) * inv_y
+                t_near = np.maximum(np.minimum(t1x, t2x), np.minimum(t1y, t2y))
+                t_far = np.minimum(np.maximum(t1x, t2x), np.maximum(t1y, t2y))
+                t_near = np.nan_to_num(t_near, nan=-np.inf)
+                t_far = np.nan_to_num(t_far, nan=np.inf)
+                hit = (t_far >= np.maximum(t_near, 0.0))
+                t_box = np.where(hit, np.maximum(t_near, 0.0), np.inf).min(axis=-1)
+                distance = np.minimum(distance, t_box)
+        return np.clip(distance, 0.0, max_range)
+
+    def push_out(self, points, radius):
+        """Move disks out of walls and boxes; returns (points, in_contact)."""
+        points = points.copy()
+        contact = np.zeros(points.shape[:-1], dtype=bool)
+        for axis, low, high in ((0, self.x_min, self.x_max), (1, self.y_min, self.y_max)):
+            clipped = np.clip(points[..., axis], low + radius, high - radius)
+            contact |= clipped != points[..., axis]
+            points[..., axis] = clipped
+        for b in range(len(self.boxes)):
+            nearest = np.clip(points, self.box_min[b], self.box_max[b])
+            offset = points - nearest
+            gap = np.linalg.norm(offset, axis=-1)
+            inside = gap < radius
+            if not inside.any():
+                continue
+            contact |= inside
+            # Center inside the box: leave through the nearest face
+            deep = inside & (gap < 1e-12)
+            if deep.any():
+                p = points[deep]
+                faces = np.stack([p[:, 0] - self.box_min[b, 0], self.box_max[b, 0] - p[:, 0],
+                                  p[:, 1] - self.box_min[b, 1], self.box_max[b, 1] - p[:, 1]], axis=1)
+                face = faces.argmin(axis=1)
+                normal = np.array([[-1.0, 0.0], [1.0, 0.0], [0.0, -1.0], [0.0, 1.0]])[face]
+                rows = np.arange(len(p))
+                on_face = p.copy()
+                on_face[rows, face // 2] = np.where(face % 2 == 0, self.box_min[b, face // 2],
+                                                    self.box_max[b, face // 2])
+                nearest[deep] = on_face
+                offset[deep] = normal
+                gap[deep] = 1.0
+            scale = (radius / np.maximum(gap[inside], 1e-12))[:, None]
+            points[inside] = nearest[inside] + offset[inside] * scale
+        return points, contact
+
+
+class DiffDriveSim:
+    """n e-pucks in one arena, stepped together."""
+
+    def __init__(self, arena, n, timestep=32, coverage_cell=COVERAGE_CELL,
+                 stuck_distance=STUCK_DISTANCE, stuck_window_ms=STUCK_WINDOW_MS):
+        self.arena = arena
+        self.n = n
+        self.timestep = timestep
+        self.dt = timestep / 1000.0
+        self.stuck_distance = stuck_distance
+        self.stuck_window_ms = stuck_window_ms
+        self.cell = coverage_cell
+        self.free = arena.free_cells(coverage_cell)
+        self.grid_shape = self.free.shape
+        self.reset(np.random.default_rng(0))
+
+    def reset(self, rng, poses=None):
+        """Random collision-free start poses (or explicit (n, 3) x, y, heading)."""
+        if poses is None:
+            a = self.arena
+            poses = np.zeros((self.n, 3))
+            todo = np.arange(self.n)
+            while len(todo):
+                candidates = np.column_stack([
+                    rng.uniform(a.x_min + BODY_RADIUS, a.x_max - BODY_RADIUS, len(todo)),
+                    rng.uniform(a.y_min + BODY_RADIUS, a.y_max - BODY_RADIUS, len(todo)),
+                ])
+                ok = ~a.collides(candidates, BODY_RADIUS * 1.05)
+                poses[todo[ok], :2] = candidates[ok]
+                todo = todo[~ok]
+            poses[:, 2] = rng.uniform(-np.pi, np.pi, self.n)
+        poses = np.asarray(poses, dtype=np.float64)
+        self.position = poses[:, :2].copy()
+        self.heading = poses[:, 2].copy()
+        self.time_ms = 0
+        self.in_contact = np.zeros(self.n, dtype=bool)
+        self.collisions = np.zeros(self.n, dtype=np.int64)
+        self.contact_ms = np.zeros(self.n)
+        self.stuck_ms = np.zeros(self.n)
+        self.distance = np.zeros(self.n)
+        self._anchor = self.position.copy()
+        self._anchor_ms = np.zeros(self.n)
+        self.visited = np.zeros((self.n,) + self.grid_shape, dtype=bool)
+        self._visit()
+
+    def _visit(self):
+        a = self.arena
+        ix = np.clip(((self.position[:, 0] - a.x_min) / self.cell).astype(int), 0, self.grid_shape[0] - 1)
+        iy = np.clip(((self.position[:, 1] - a.y_min) / self.cell).astype(int), 0, self.grid_shape[1] - 1)
+        self.visited[np.arange(self.n), ix, iy] = True
+
+    def proximity(self, sensors=None):
+        """Raw ps0..ps7 readings, shape (n, 8), or only the listed sensor indices."""
+        mount = PS_ANGLES if sensors is None else PS_ANGLES[list(sensors)]
+        angles = self.heading[:, None] + mount[None, :]
+        direction = np.stack([np.cos(angles), np.sin(angles)], axis=-1)      # (n, 8, 2)
+        origin = self.position[:, None, :] + PS_RADIUS * direction
+        distance = self.arena.ray_distance(origin, direction, PS_RANGE)
+        return np.interp(distance, PS_LOOKUP_DISTANCE, PS_LOOKUP_VALUE)
+
+    def step(self, left, right):
+        """Integrate one timestep with wheel speeds in rad/s."""
+        left = np.clip(np.asarray(left, dtype=np.float64), -MAX_SPEED, MAX_SPEED)
+        right = np.clip(np.asarray(right, dtype=np.float64), -MAX_SPEED, MAX_SPEED)
+        v = WHEEL_RADIUS * (left + right) / 2.0
+        w = WHEEL_RADIUS * (right - left) / AXLE_LENGTH
+        mid = self.heading + w * self.dt / 2.0
+        moved = self.position + (v * self.dt)[:, None] * np.column_stack([np.cos(mid), np.sin(mid)])
+        self.heading = np.arctan2(np.sin(self.heading + w * self.dt), np.cos(self.heading + w * self.dt))
+        moved, contact = self.arena.push_out(moved, BODY_RADIUS)
+        self.distance += np.linalg.norm(moved - self.position, axis=1)
+        self.position = moved
+
+        self.time_ms += self.timestep
+        self.collisions += contact & ~self.in_contact
+        self.contact_ms += contact * self.timestep
+        self.in_contact = contact
+
+        # Stuck: not leaving a small neighborhood for a whole window
+        away = np.linalg.norm(self.position - self._anchor, axis=1) > self.stuck_distance
+        self._anchor[away] = self.position[away]
+        self._anchor_ms[away] = self.time_ms
+        self.stuck_ms += (self.time_ms - self._anchor_ms >= self.stuck_window_ms) * self.timestep
+        self._visit()
+
+    def coverage(self):
+        """Fraction of reachable coverage cells each robot has visited."""
+        return (self.visited & self.free).sum(axis=(1, 2)) / max(self.free.sum(), 1)
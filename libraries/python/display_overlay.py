@@ -0,0 +1,135 @@
+"""
+Incremental text/sparkline overlay for a Webots Display.
+
+Fields are fixed boxes on the display. set() only marks a field dirty when
+its value changed, and render() repaints just the dirty boxes (one
+fillRectangle, one setColor and one drawText each), so a frame in which
+nothing changed costs no display calls at all. Call render() at the
+redraw rate you want, e.g. from SimRuntime.every(OVERLAY_PERIOD_MS, ...).
+
+A sparkline keeps the last `capacity` values in a fixed-size ring buffer
+and is redrawn (as line segments) only when a value is pushed.
+"""
+
+import numpy as np
+
+
+class _Field:
+    __slots__ = ("x", "y", "width", "height", "fmt", "color", "value", "dirty")
+
+    def __init__(self, x, y, width, height, fmt, color, value):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.fmt = fmt
+        self.color = color
+        self.value = value
+        self.dirty = True
+
+
+class Sparkline:
+    """Last `capacity` values in a ring buffer, drawn scaled to their own min/max."""
+
+    def __init__(self, x, y, width, height, capacity=32, color=0x00FFFF, zero_color=0x404040):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.values = np.zeros(capacity)
+        self.count = 0
+        self.head = 0
+        self.color = color
+        self.zero_color = zero_color
+        self.dirty = True
+
+    def push(self, value):
+        self.values[self.head] = value
+        self.head = (self.head + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+        self.dirty = True
+
+    def ordered(self):
+        """Values oldest first."""
+        if self.count < len(self.values):
+            return self.values[:self.count]
+        return np.roll(self.values, -self.head)
+
+    def draw(self, display, background):
+        display.setColor(background)
+        display.fillRectangle(self.x, self.y, self.width, self.height)
+        values = self.ordered()
+        if len(values) < 2:
+            return
+        low, high = float(values.min()), float(values.max())
+        span = (high - low) or 1.0
+        bottom = self.y + self.height - 1
+        scale = (self.height - 1) / span
+        if low < 0.0 < high:
+            zero = int(round(bottom - (0.0 - low) * scale))
+            display.setColor(self.zero_color)
+            display.drawLine(self.x, zero, self.x + self.width - 1, zero)
+        xs = np.linspace(self.x, self.x + self.width - 1, len(values)).round().astype(int)
+        ys = (bottom - (values - low) * scale).round().astype(int)
+        display.setColor(self.color)
+        for i in range(1, len(values)):
+            display.drawLine(int(xs[i - 1]), int(ys[i - 1]), int(xs[i]), int(ys[i]))
+
+
+class DisplayOverlay:
+    """Named fields and sparklines on a Display, repainted only when they change."""
+
+    def __init__(self, display, background=0x000000):
+        self.display = display
+        self.background = background
+        self.fields = {}
+        self.sparklines = {}
+        self.renders = 0
+        self.repaints = 0
+
+    def add_field(self, name, x, y, width, fmt="{}", color=0xFFFFFF, value=None, height=14):
+        """A text box, blank until set(); `color` may be a callable(value) -> 0xRRGGBB."""
+        self.fields[name] = _Field(x, y, width, height, fmt, color, value)
+
+    def add_label(self, text, x, y, width, color=0xFFFFFF, height=14):
+        """Static text, drawn on the first render."""
+        self.add_field(f"label:{x},{y}", x, y, width, text.replace("{", "{{").replace("}", "}}"),
+                       color, value="", height=height)
+
+    def add_sparkline(self, name, x, y, width, height, capacity=32, **colors):
+        self.sparklines[name] = Sparkline(x, y, width, height, capacity, **colors)
+
+    def set(self, name, value):
+        field = self.fields[name]
+        if value != field.value:
+            field.value = value
+            field.dirty = True
+
+    def update(self, **values):
+        for name, value in values.items():
+            self.set(name, value)
+
+    def push(self, name, value):
+        self.sparklines[name].push(value)
+
+    def render(self):
+        """Repaint the fields and sparklines that changed since the last render."""
+        self.renders += 1
+        display = self.display
+        if display is None:
+            return
+        for field in self.fields.values():
+            if not field.dirty or field.value is None:
+                continue
+            display.setColor(self.background)
+            display.fillRectangle(field.x, field.y, field.width, field.height)
+            color = field.color(field.value) if callable(field.color) else field.color
+            display.setColor(color)
+            display.drawText(field.fmt.format(field.value), field.x, field.y)
+            field.dirty = False
+            self.repaints += 1
+        for sparkline in self.sparklines.values():
+            if sparkline.dirty:
+                sparkline.draw(display, self.background)
+                sparkline.dirty = False
+                self.repaints += 1
@@ -0,0 +1,106 @@
+"""
+Early episode termination for RL training: falls and stalls.
+
+An EpisodeMonitor is reset at the start of every episode and check()ed
+periodically (e.g. from SimRuntime.every). It reports
+
+    "fall"   the robot's up axis tilted more than `fall_tilt` rad from
+             vertical, or its torso dropped below `fall_height_ratio` of
+             the height it started the episode at
+    "stall"  neither the robot (position or heading) nor any watched
+             node moved more than `stall_distance` / `stall_angle` for
+             `stall_window_ms` of simulated time
+
+Orientation and translation come from supervisor nodes (world z-up). An
+inertial unit can be used for the tilt instead: pass `imu`, a callable
+returning (roll, pitch, yaw); tilt is then measured from the roll/pitch
+at reset.
+"""
+
+import math
+
+
+def _tilt(orientation):
+    """Angle (rad) between a node's local z axis and the world z axis."""
+    return math.acos(max(-1.0, min(1.0, orientation[8])))
+
+
+def _heading(orientation):
+    """The node's local x axis projected on the ground plane, as an angle."""
+    return math.atan2(orientation[3], orientation[0])
+
+
+class EpisodeMonitor:
+    """Detects falls and stalls; counts them and the simulated time they save."""
+
+    def __init__(self, robot_node, watched=(), imu=None, fall_tilt=1.0, fall_height_ratio=0.5,
+                 stall_window_ms=4000, stall_distance=0.02, stall_angle=0.15):
+        self.robot_node = robot_node
+        self.watched = [node for node in watched if node is not None]
+        self.imu = imu
+        self.fall_tilt = fall_tilt
+        self.fall_height_ratio = fall_height_ratio
+        self.stall_window_ms = stall_window_ms
+        self.stall_distance = stall_distance
+        self.stall_angle = stall_angle
+        self.reason = None
+        self.counts = {"fall": 0, "stall": 0}
+        self.saved_ms = 0.0
+        self._start_height = None
+        self._imu_baseline = None
+        self._anchor = None
+        self._anchor_ms = 0.0
+
+    def _pose(self):
+        position = self.robot_node.getPosition()
+        orientation = self.robot_node.getOrientation()
+        return position, orientation
+
+    def _snapshot(self, position, orientation):
+        return ([position] + [node.getPosition() for node in self.watched], _heading(orientation))
+
+    def reset(self, time_ms):
+        """Start of an episode: take the reference height, orientation and positions."""
+        position, orientation = self._pose()
+        self.reason = None
+        self._start_height = position[2]
+        self._imu_baseline = self.imu()[:2] if self.imu else None
+        self._anchor = self._snapshot(position, orientation)
+        self._anchor_ms = time_ms
+
+    def tilt(self, orientation=None):
+        if self.imu:
+            roll, pitch = self.imu()[:2]
+            return max(abs(roll - self._imu_baseline[0]), abs(pitch - self._imu_baseline[1]))
+        return _tilt(orientation if orientation is not None else self.robot_node.getOrientation())
+
+    def check(self, time_ms):
+        """Update and return the termination reason ("fall", "stall") or None."""
+        if self.reason is not None or self._anchor is None:
+            return self.reason
+        position, orientation = self._pose()
+        if self.tilt(orientation) > self.fall_tilt or \
+                position[2] < self._start_height * self.fall_height_ratio:
+            self.reason = "fall"
+            return self.reason
+
+        positions, heading = self._snapshot(position, orientation)
+        anchor_positions, anchor_heading = self._anchor
+        turned = abs(math.remainder(heading - anchor_heading, math.tau)) > self.stall_angle
+        moved = turned or any(math.dist(p, q) > self.stall_distance
+                              for p, q in zip(positions, anchor_positions))
+        if moved:
+            self._anchor = (positions, heading)
+            self._anchor_ms = time_ms
+        elif time_ms - self._anchor_ms >= self.stall_window_ms:
+            self.reason = "stall"
+        return self.reason
+
+    def terminate(self, remaining_ms):
+        """Record that the episode ended early with `remaining_ms` of its budget unused."""
+        self.counts[self.reason] += 1
+        self.saved_ms += max(0.0, remaining_ms)
+
+    def report(self):
+        return (f"early terminations: {self.counts['fall']} falls, {self.counts['stall']} stalls, "
+                f"{self.saved_ms / 1000.0:.1f} s simulated time saved")
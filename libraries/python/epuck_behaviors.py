@@ -0,0 +1,85 @@
+"""
+Wheel FSM tables for the e-puck controllers.
+
+Each builder takes the controller's tunable parameters and returns a
+wheel_fsm table, so the Webots controllers and the offline parameter search
+(tools/epuck_param_search.py) run the same behavior.
+"""
+
+from wheel_fsm import sequence_table
+
+PROXIMITY_SENSORS = [f"ps{i}" for i in range(8)]
+
+
+def change_direction_table(forward_time=3.0, turn_left_time=0.5, reverse_time=4.0, spin_time=6.0):
+    """Change_Direction: forward -> left -> forward -> reverse -> spin -> ..."""
+    # (name, left_speed, right_speed, duration)
+    return sequence_table([
+        ("forward", 3.0, 3.0, forward_time),
+        ("turn_left", -6.0, 6.0, turn_left_time),
+        ("forward", 3.0, 3.0, forward_time),
+        ("reverse", -6.0, -6.0, reverse_time),
+        ("spin", 6.0, -6.0, spin_time),
+    ])
+
+
+def change_direction_added_state_table(forward_time=2.0, turn_left_time=2, turn_right_time=0.3):
+    """Change_Direction_Added_State: forward -> left -> forward -> right -> ..."""
+    return sequence_table([
+        ("forward", 3.0, 3.0, forward_time),
+        ("turn_left", -3.0, 3.0, turn_left_time),
+        ("forward", 3.0, 3.0, forward_time),
+        ("turn_right", 3.0, -3.0, turn_right_time),
+    ])
+
+
+def obstacle_turn_table(obstacle_threshold=80.0, min_turn_time=3):
+    """Change_State_Obs_Fix: turn away from ps0 obstacles, spin when repeatedly stuck."""
+    return {
+        "sensors": ["ps0"],
+        "initial": "forward",
+        "states": {
+            "forward": {"speed": (6.0, 6.0)},
+            "turn_left": {"speed": (-6.0, 6.0)},
+            "turn_right": {"speed": (6.0, -6.0)},
+            "spin_right": {"speed": (6.0, -6.0)},
+        },
+        "transitions": [
+            {"from": "forward", "to": "turn_left",
+             "when": {"sensor": "ps0", "above": obstacle_threshold}, "do": {"inc": "stuck"}},
+            {"from": ["turn_left", "turn_right"], "to": "forward",
+             "when": {"after": min_turn_time, "sensor": "ps0", "below": obstacle_threshold}},
+            {"from": "spin_right", "to": "turn_left",
+             "when": {"sensor": "ps0", "below": obstacle_threshold}, "do": {"reset": "stuck"}},
+        ],
+        # Checked after the transitions above, against the state they left us in
+        "global": [
+            # If stuck too many times, spin right
+            {"from": "*", "except": ["spin_right"], "to": "spin_right",
+             "when": {"counter": "stuck", "at_least": 2}, "do": {"reset": "stuck"}},
+            # Alternate turns on next obstacle
+            {"from": "turn_left", "to": "turn_right",
+             "when": {"counter": "stuck", "even": True, "after": min_turn_time * 2}},
+        ],
+    }
+
+
+def detect_stop_table(obstacle_threshold=80.0, speed_left=6.0, speed_right=6.0):
+    """Detect_Stop: drive until any proximity sensor sees an obstacle.
+
+    Run with write_after=True so the robot stops in the step it sees one.
+    """
+    return {
+        "sensors": PROXIMITY_SENSORS,
+        "initial": "drive",
+        "states": {
+            "drive": {"speed": (speed_left, speed_right)},
+            "stopped": {"speed": (0.0, 0.0)},
+        },
+        "transitions": [
+            {"from": "drive", "to": "stopped",
+             "when": {"sensor": PROXIMITY_SENSORS, "above": obstacle_threshold}},
+            {"from": "stopped", "to": "drive",
+             "when": {"sensor": PROXIMITY_SENSORS, "below": obstacle_threshold, "mode": "all"}},
+        ],
+    }
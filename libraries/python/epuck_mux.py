@@ -0,0 +1,228 @@
+"""
+Drive many red-ball-chasing e-pucks from one process.
+
+A fleet exposes n robots as arrays: read() returns all camera frames as one
+(n, H, W, 4) BGRA array plus the (n, 8) proximity readings, write() takes
+(n,) wheel speeds. EpuckMultiplexer runs ball_chase's detection and control
+once per step over the whole batch instead of once per robot process.
+
+Fleets:
+    StandInFleet       local stand-in e-pucks on diff_drive_sim, with
+                       synthetic camera frames (tests and benchmarks)
+    SharedMemoryFleet  real e-pucks in Webots, each running the thin
+                       EPuck_Mux_Relay controller
+
+Webots' Python controller library binds one robot per process, so the
+Webots side still needs one relay interpreter per robot; the relays do no
+vision and import no numpy. Both sides block on mux_protocol doorbells
+between steps instead of polling.
+"""
+
+import resource
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from ball_chase import BallChaser, red_bearing
+from diff_drive_sim import DiffDriveSim
+from mux_protocol import HEADER, IMAGE_OFFSET, MUX_DOORBELL, PS_OFFSET, SPEED_OFFSET, STOP, Doorbell, block_name
+
+# e-puck camera
+CAMERA_WIDTH = 52
+CAMERA_HEIGHT = 39
+CAMERA_FOV = 0.84             # rad, horizontal
+BALL_RADIUS = 0.0325          # Ball.proto default
+REACH_DISTANCE = 0.15         # m; about where the ball fills ball_chase.REACHED_FRACTION of the frame
+BACKGROUND_BGRA = (110, 110, 110, 255)
+BALL_BGRA = (30, 30, 230, 255)
+
+
+def process_usage():
+    """(peak resident memory in MB, CPU seconds) of the calling process."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_maxrss / 1024.0, usage.ru_utime + usage.ru_stime
+
+
+class StandInFleet:
+    """n independent stand-in e-pucks, each chasing its own red ball in a copy of the arena."""
+
+    def __init__(self, n, arena, timestep=32, seed=0, width=CAMERA_WIDTH, height=CAMERA_HEIGHT):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.timestep = timestep
+        self.rng = np.random.default_rng(seed)
+        self.sim = DiffDriveSim(arena, n, timestep)
+        self.sim.reset(self.rng)
+        self.ball = np.zeros((n, 2))
+        self._place_balls(np.arange(n))
+        self.reached = np.zeros(n, dtype=np.int64)
+        self.speeds = np.zeros((n, 2))
+        self._columns = np.arange(width, dtype=np.float64)[None, None, :]
+        self._rows = np.arange(height, dtype=np.float64)[None, :, None]
+        self._frames = np.empty((n, height, width, 4), dtype=np.uint8)
+
+    def _place_balls(self, which):
+        a = self.sim.arena
+        margin = BALL_RADIUS + 0.02
+        self.ball[which] = np.column_stack([
+            self.rng.uniform(a.x_min + margin, a.x_max - margin, len(which)),
+            self.rng.uniform(a.y_min + margin, a.y_max - margin, len(which)),
+        ])
+
+    def step(self):
+        """Advance the stand-in world one timestep with the last written speeds."""
+        self.sim.step(self.speeds[:, 0], self.speeds[:, 1])
+        # A reached ball reappears elsewhere so the workload stays steady
+        distance = np.linalg.norm(self.ball - self.sim.position, axis=1)
+        hit = np.flatnonzero(distance < REACH_DISTANCE)
+        self.reached[hit] += 1
+        self._place_balls(hit)
+        return True
+
+    def _render(self):
+        """Synthetic BGRA frames: the ball as a red square at its projected bearing."""
+        rel = self.ball - self.sim.position
+        distance = np.maximum(np.linalg.norm(rel, axis=1), 1e-6)
+        bearing = np.arctan2(rel[:, 1], rel[:, 0]) - self.sim.heading
+        bearing = np.arctan2(np.sin(bearing), np.cos(bearing))   # + = left of the robot
+        half_fov = np.tan(CAMERA_FOV / 2.0)
+        center = (self.width - 1) / 2.0
+        column = center - np.tan(np.clip(bearing, -1.5, 1.5)) / half_fov * center
+        half = np.tan(np.arcsin(np.minimum(BALL_RADIUS / distance, 1.0))) / half_fov * center
+        visible = np.abs(bearing) < np.pi / 2.0
+        row = (self.height - 1) / 2.0
+        mask = ((np.abs(self._columns - column[:, None, None]) <= half[:, None, None])
+                & (np.abs(self._rows - row) <= half[:, None, None])
+                & visible[:, None, None])
+        self._frames[:] = BACKGROUND_BGRA
+        self._frames[mask] = BALL_BGRA
+        return self._frames
+
+    def read(self):
+        return self._render(), self.sim.proximity()
+
+    def write(self, left, right):
+        self.speeds[:, 0] = left
+        self.speeds[:, 1] = right
+
+    def close(self):
+        pass
+
+
+class SharedMemoryFleet:
+    """Real e-pucks, one EPuck_Mux_Relay controller each, exchanged through shared memory."""
+
+    def __init__(self, robot_names, timestep=32, attach_timeout=60.0, wait_timeout=1.0):
+        self.names = list(robot_names)
+        self.n = len(self.names)
+        self.timestep = timestep
+        self.wait_timeout = wait_timeout   # s; re-check the relays at least this often
+        # Listen before attaching, so no relay's first sample can ring unheard
+        self.doorbell = Doorbell(MUX_DOORBELL, listen=True)
+        self.blocks = [self._attach(name, attach_timeout) for name in self.names]
+        sizes = {HEADER.unpack_from(block.buf, 0)[2:] for block in self.blocks}
+        if len(sizes) != 1:
+            raise ValueError(f"Relays report different camera sizes: {sizes}")
+        self.width, self.height = sizes.pop()
+        self._images = [np.ndarray((self.height, self.width, 4), np.uint8, block.buf, IMAGE_OFFSET)
+                        for block in self.blocks]
+        self._ps = [np.ndarray(8, np.float64, block.buf, PS_OFFSET) for block in self.blocks]
+        self._speeds = [np.ndarray(2, np.float64, block.buf, SPEED_OFFSET) for block in self.blocks]
+        self._seqs = [np.ndarray(2, np.int64, block.buf, 0) for block in self.blocks]  # robot, mux
+        self._frames = np.empty((self.n, self.height, self.width, 4), dtype=np.uint8)
+        self._ps_batch = np.empty((self.n, 8))
+        self._answered = np.zeros(self.n, dtype=np.int64)
+        self._relay_doorbells = [Doorbell(block_name(name), listen=False) for name in self.names]
+
+    @staticmethod
+    def _attach(name, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                block = shared_memory.SharedMemory(name=block_name(name))
+            except FileNotFoundError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"No relay for robot '{name}' (is EPuck_Mux_Relay running?)")
+                time.sleep(0.1)
+                continue
+            # The relay owns the block; before Python 3.13 attaching also registers it with
+            # this process's resource tracker, which would unlink it when the multiplexer exits
+            try:
+                resource_tracker.unregister(block._name, "shared_memory")
+            except Exception:
+                pass
+            return block
+
+    def step(self):
+        """Wait until every relay has published a sample newer than the last answer.
+
+        Returns False once any relay has exited (simulation ended or reverted).
+        """
+        for i, seqs in enumerate(self._seqs):
+            while seqs[0] <= self._answered[i]:
+                if seqs[0] == STOP:
+                    return False
+                self.doorbell.wait(self.wait_timeout)
+        return True
+
+    def read(self):
+        for i in range(self.n):
+            self._frames[i] = self._images[i]
+            self._ps_batch[i] = self._ps[i]
+        return self._frames, self._ps_batch
+
+    def write(self, left, right):
+        for i in range(self.n):
+            self._speeds[i][:] = (left[i], right[i])
+            seq = self._seqs[i][0]
+            self._seqs[i][1] = seq
+            self._answered[i] = seq
+            self._relay_doorbells[i].ring()
+
+    def close(self):
+        for seqs, doorbell in zip(self._seqs, self._relay_doorbells):
+            seqs[1] = STOP
+            doorbell.ring()
+            doorbell.close()
+        self.doorbell.close()
+        self._images = self._ps = self._speeds = self._seqs = None
+        for block in self.blocks:
+            block.close()
+
+
+class EpuckMultiplexer:
+    """One batched vision + control pass per step for every robot in a fleet."""
+
+    def __init__(self, fleet, timestep):
+        self.fleet = fleet
+        self.chaser = BallChaser(fleet.n, timestep)
+        self.steps = 0
+        self.control_s = 0.0   # wall time in detection + control
+        self.io_s = 0.0        # wall time waiting for / exchanging with the robots
+
+    def step(self):
+        start = time.perf_counter()
+        if not self.fleet.step():
+            return False
+        frames, ps = self.fleet.read()
+        middle = time.perf_counter()
+        fraction, bearing = red_bearing(frames)
+        left, right = self.chaser.step(fraction, bearing, ps)
+        end = time.perf_counter()
+        self.fleet.write(left, right)
+        self.io_s += middle - start + time.perf_counter() - end
+        self.control_s += end - middle
+        self.steps += 1
+        return True
+
+    def run(self, steps=None):
+        while (steps is None or self.steps < steps) and self.step():
+            pass
+
+    def report(self):
+        n = self.fleet.n
+        per_step = 1e6 / max(self.steps, 1) / n
+        return (f"{n} robots, {self.steps} steps: control {self.control_s * per_step:.1f} us/robot-step, "
+                f"io {self.io_s * per_step:.1f} us/robot-step")
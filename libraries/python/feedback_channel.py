@@ -0,0 +1,116 @@
+"""
+Buffered human feedback for reward shaping.
+
+A coach scores the robot with the number keys in the Webots window (0-9
+add, Shift+0-9 subtract) or from another terminal over a local UDP socket
+(tools/coach.py, or anything that sends "+3" / "-2" / "5" datagrams).
+poll() runs on every simulator step and drains *all* pending keys and
+datagrams into a buffer stamped with simulated time, so presses during a
+long action are not lost.
+
+Each event is attributed to the transition that was running `latency_ms`
+before it arrived (people score what they just saw). The controller marks
+transition starts with begin(key, time_ms), claims the bonus of the
+transition it is about to learn from with claim(key), and gets feedback
+that arrived after a transition was already learned from via late(), to
+apply as a correction.
+"""
+
+import bisect
+import collections
+import socket
+
+DEFAULT_PORT = 47800
+
+
+def parse_scores(text):
+    """Scores in a coach message: whitespace-separated numbers such as "+3 -1 2"."""
+    scores = []
+    for token in text.split():
+        try:
+            scores.append(float(token))
+        except ValueError:
+            pass
+    return scores
+
+
+class FeedbackChannel:
+    """Timestamped feedback buffer fed by a Webots keyboard and/or a UDP socket."""
+
+    def __init__(self, keyboard=None, shift_mask=0, port=None, host="127.0.0.1",
+                 latency_ms=300.0, history=64):
+        self.keyboard = keyboard
+        self.shift_mask = shift_mask
+        self.latency_ms = latency_ms
+        self.socket = None
+        if port is not None:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.socket.bind((host, port))
+            self.socket.setblocking(False)
+        self.events = []                                 # (time_ms, score, source) not yet attributed
+        self.starts = collections.deque(maxlen=history)  # (start_ms, key) of recent transitions
+        self.bonus = {}                                  # key -> attributed score not yet claimed
+        self.claimed = set()
+        self.received = 0
+        self.unattributed = 0
+
+    def poll(self, time_ms):
+        """Drain every pending key press and datagram into the buffer."""
+        if self.keyboard is not None:
+            key = self.keyboard.getKey()
+            while key >= 0:
+                base = key & 0xFF
+                if ord("0") <= base <= ord("9"):
+                    value = float(base - ord("0"))
+                    self._add(time_ms, -value if key & self.shift_mask else value, "keyboard")
+                key = self.keyboard.getKey()
+        if self.socket is not None:
+            while True:
+                try:
+                    data = self.socket.recv(512)
+                except (BlockingIOError, InterruptedError):
+                    break
+                for score in parse_scores(data.decode("utf-8", "replace")):
+                    self._add(time_ms, score, "socket")
+
+    def _add(self, time_ms, score, source):
+        self.events.append((time_ms, score, source))
+        self.received += 1
+
+    def begin(self, key, time_ms):
+        """A new transition `key` starts now; the previous one ends."""
+        self._attribute()
+        self.starts.append((time_ms, key))
+
+    def _attribute(self):
+        if not self.events:
+            return
+        times = [start for start, _ in self.starts]
+        for time_ms, score, _ in self.events:
+            i = bisect.bisect_right(times, time_ms - self.latency_ms) - 1
+            if i < 0:
+                self.unattributed += 1
+                continue
+            key = self.starts[i][1]
+            self.bonus[key] = self.bonus.get(key, 0.0) + score
+        self.events.clear()
+
+    def claim(self, key):
+        """Total score attributed to `key` so far; later arrivals show up in late()."""
+        self._attribute()
+        self.claimed.add(key)
+        return self.bonus.pop(key, 0.0)
+
+    def late(self):
+        """[(key, score)] for transitions that were already claimed."""
+        self._attribute()
+        late = [(key, self.bonus.pop(key)) for key in list(self.bonus) if key in self.claimed]
+        # Keys that fell out of the history can no longer receive feedback
+        live = {key for _, key in self.starts}
+        self.claimed &= live
+        return late
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
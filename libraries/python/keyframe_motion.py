@@ -0,0 +1,152 @@
+"""
+Keyframe motion engine for NAO .motion files.
+
+Reads the CSV keyframes of a Webots .motion file into NumPy arrays and drives
+the joint motors directly, so playback speed, partial playback and start/stop
+phases can be chosen per call instead of the fixed speed of controller.Motion.
+"""
+
+import os
+
+import numpy as np
+
+
+def parse_motion_time(text):
+    """Convert a 'MM:SS:mmm' keyframe time into milliseconds."""
+    minutes, seconds, millis = (int(part) for part in text.split(":"))
+    return (minutes * 60 + seconds) * 1000 + millis
+
+
+class KeyframeMotion:
+    """Keyframe times (ms) and joint positions (rad) of one motion file."""
+
+    def __init__(self, joint_names, times_ms, positions):
+        self.joint_names = list(joint_names)
+        self.times_ms = np.asarray(times_ms, dtype=np.float64)
+        self.positions = np.asarray(positions, dtype=np.float64)
+
+    @classmethod
+    def load(cls, path):
+        """Parse a .motion file. '*' entries hold the previous keyframe value."""
+        with open(path, "r", encoding="utf-8") as f:
+            header = f.readline().strip().split(",")
+            if not header or not header[0].startswith("#WEBOTS_MOTION"):
+                raise ValueError(f"Not a Webots motion file: {path}")
+            joint_names = header[2:]
+            times = []
+            rows = []
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                fields = line.split(",")
+                times.append(parse_motion_time(fields[0]))
+                rows.append([np.nan if v.strip() == "*" else float(v) for v in fields[2:]])
+
+        positions = np.array(rows, dtype=np.float64).reshape(len(rows), len(joint_names))
+
+        # Forward-fill '*' entries, then back-fill joints that start unspecified
+        for j in range(positions.shape[1]):
+            column = positions[:, j]
+            valid = ~np.isnan(column)
+            if not valid.any():
+                continue
+            idx = np.where(valid, np.arange(len(column)), 0)
+            np.maximum.accumulate(idx, out=idx)
+            column[:] = column[idx]
+            column[: np.argmax(valid)] = column[np.argmax(valid)]
+
+        # Drop joints that are never specified
+        keep = ~np.isnan(positions).all(axis=0)
+        joint_names = [name for name, k in zip(joint_names, keep) if k]
+        return cls(joint_names, times, positions[:, keep])
+
+    @property
+    def duration_ms(self):
+        return float(self.times_ms[-1] - self.times_ms[0])
+
+    def sample(self, t_ms):
+        """Interpolate joint positions at one or many times (ms from start).
+
+        Returns shape (J,) for a scalar time and (N, J) for an array of times.
+        """
+        t = np.clip(np.asarray(t_ms, dtype=np.float64) + self.times_ms[0],
+                    self.times_ms[0], self.times_ms[-1])
+        hi = np.clip(np.searchsorted(self.times_ms, t, side="right"), 1, len(self.times_ms) - 1)
+        lo = hi - 1
+        span = self.times_ms[hi] - self.times_ms[lo]
+        frac = np.divide(t - self.times_ms[lo], span, out=np.zeros_like(t), where=span > 0)
+        frac = frac[..., None]
+        return self.positions[lo] * (1.0 - frac) + self.positions[hi] * frac
+
+
+class KeyframePlayer:
+    """Plays a KeyframeMotion on a robot, one control timestep at a time.
+
+    speed > 1 covers the keyframes in fewer simulated steps (lower gait
+    fidelity, higher throughput). start_phase/end_phase are fractions of the
+    motion in [0, 1], so a player can run part of a gait cycle or resume
+    where a previous call stopped.
+    """
+
+    def __init__(self, motion, robot, timestep, speed=1.0):
+        self.motion = motion
+        self.timestep = timestep
+        self.speed = speed
+        self.motors = [robot.getDevice(name) for name in motion.joint_names]
+        self.active = [i for i, m in enumerate(self.motors) if m is not None]
+        self.trajectory = None
+        self.frame = 0
+        self.phase = 0.0
+
+    def play(self, speed=None, start_phase=0.0, end_phase=1.0):
+        """Precompute the joint targets for every control step of this playback."""
+        if speed is not None:
+            self.speed = speed
+        start_phase = min(max(start_phase, 0.0), 1.0)
+        end_phase = min(max(end_phase, start_phase), 1.0)
+        duration = self.motion.duration_ms
+        start_ms = start_phase * duration
+        end_ms = end_phase * duration
+        step_ms = self.timestep * self.speed
+        times = np.arange(start_ms + step_ms, end_ms + step_ms, step_ms)
+        times[-1:] = np.minimum(times[-1:], end_ms)
+        self.trajectory = self.motion.sample(times)[:, self.active]
+        self.phases = times / duration if duration > 0 else np.ones_like(times)
+        self.frame = 0
+        self.phase = start_phase
+
+    def step(self):
+        """Write the next frame of joint targets. Returns False once finished."""
+        if self.isOver():
+            return False
+        row = self.trajectory[self.frame]
+        for k, i in enumerate(self.active):
+            self.motors[i].setPosition(float(row[k]))
+        self.phase = float(self.phases[self.frame])
+        self.frame += 1
+        return True
+
+    def stop(self):
+        """Stop at the current phase; play(start_phase=player.phase) resumes."""
+        self.trajectory = None
+
+    def isOver(self):
+        return self.trajectory is None or self.frame >= len(self.trajectory)
+
+    @property
+    def steps_total(self):
+        return 0 if self.trajectory is None else len(self.trajectory)
+
+
+def load_keyframe_motion(motion_dir, name):
+    """Load a motion file from motion_dir, or None if it is missing/unreadable."""
+    path = os.path.join(motion_dir, name)
+    if not os.path.isfile(path):
+        print(f"Motion missing: {path}")
+        return None
+    try:
+        return KeyframeMotion.load(path)
+    except Exception as e:
+        print(f"Motion load error: {e}")
+        return None
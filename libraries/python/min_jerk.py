@@ -0,0 +1,99 @@
+"""
+Minimum-jerk joint trajectories for staged whole-body motions.
+
+A StagedTrajectory chains named target poses. start() precomputes, for
+every stage, the joint targets at each control timestep using the
+minimum-jerk profile s(t) = 10t^3 - 15t^4 + 6t^5, so the robot glides
+between poses instead of jumping. After a stage's trajectory has been
+played, the stage ends as soon as its `done_when` condition holds (e.g.
+joints settled, feet loaded) or after `max_ms`.
+"""
+
+import numpy as np
+
+
+def min_jerk_profile(steps):
+    """Normalized minimum-jerk progress at steps 1..steps (ends exactly at 1)."""
+    tau = np.arange(1, steps + 1, dtype=np.float64) / steps
+    return tau ** 3 * (10.0 - 15.0 * tau + 6.0 * tau ** 2)
+
+
+def min_jerk_trajectory(start, end, duration_ms, timestep):
+    """(steps, joints) array moving from start to end over duration_ms."""
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    steps = max(1, int(round(duration_ms / timestep)))
+    return start + (end - start) * min_jerk_profile(steps)[:, None]
+
+
+class TrajectoryStage:
+    """One stage: move to `target` (NaN = hold) in duration_ms, then wait for done_when()."""
+
+    def __init__(self, name, target, duration_ms, max_ms=None, done_when=None):
+        self.name = name
+        self.target = np.asarray(target, dtype=np.float64)
+        self.duration_ms = duration_ms
+        self.max_ms = max_ms if max_ms is not None else duration_ms
+        self.done_when = done_when
+
+
+class StagedTrajectory:
+    """Plays a sequence of TrajectoryStages one control step at a time."""
+
+    def __init__(self, stages, timestep, duration_scale=1.0):
+        self.stages = list(stages)
+        self.timestep = timestep
+        self.duration_scale = duration_scale
+        self.trajectories = []
+        self.stage_index = 0
+        self.frame = 0
+        self.stage_elapsed = 0
+        self.elapsed = 0
+        self.stage_times = []
+
+    def start(self, start_vector):
+        """Precompute every stage, chaining from start_vector (NaN = unknown)."""
+        current = np.asarray(start_vector, dtype=np.float64).copy()
+        self.trajectories = []
+        for stage in self.stages:
+            end = np.where(np.isnan(stage.target), current, stage.target)
+            begin = np.where(np.isnan(current), end, current)
+            duration = stage.duration_ms * self.duration_scale
+            self.trajectories.append(min_jerk_trajectory(begin, end, duration, self.timestep))
+            current = end
+        self.stage_index = 0
+        self.frame = 0
+        self.stage_elapsed = 0
+        self.elapsed = 0
+        self.stage_times = []
+
+    @property
+    def finished(self):
+        return self.stage_index >= len(self.stages)
+
+    @property
+    def stage_name(self):
+        return None if self.finished else self.stages[self.stage_index].name
+
+    def step(self):
+        """Return this step's joint targets (NaN = leave alone), or None when finished."""
+        if self.finished:
+            return None
+        stage = self.stages[self.stage_index]
+        trajectory = self.trajectories[self.stage_index]
+        if self.frame < len(trajectory):
+            row = trajectory[self.frame]
+            self.frame += 1
+        else:
+            row = trajectory[-1]
+        self.stage_elapsed += self.timestep
+        self.elapsed += self.timestep
+
+        moved = self.frame >= len(trajectory)
+        max_ms = max(stage.max_ms * self.duration_scale, len(trajectory) * self.timestep)
+        if (moved and (stage.done_when is None or stage.done_when())) or self.stage_elapsed >= max_ms:
+            self.stage_times.append((stage.name, self.stage_elapsed))
+            self.stage_index += 1
+            self.frame = 0
+            self.stage_elapsed = 0
+        return row
@@ -0,0 +1,123 @@
+"""
+Shared-memory block exchanged between an EPuck_Mux_Relay controller and
+the e-puck multiplexer (epuck_mux.SharedMemoryFleet).
+
+Standard library only, so the relay stays a small interpreter.
+
+Neither side polls the sequence numbers: each side rings the other's
+Doorbell (a named pipe) after writing, and blocks on its own until rung.
+
+Layout (little endian):
+    int64   robot_seq   bumped by the relay after writing a new sample, STOP on exit
+    int64   mux_seq     set to robot_seq by the multiplexer after writing speeds,
+                        STOP to make the relay halt the robot and exit
+    int64   width, height
+    float64 ps[8]       raw ps0..ps7
+    float64 speed[2]    left, right wheel speed (rad/s)
+    uint8   image[height * width * 4]  BGRA, as returned by camera.getImage()
+"""
+
+import os
+import select
+import struct
+import tempfile
+import time
+
+HEADER = struct.Struct("<4q")
+SEQ = struct.Struct("<q")
+ROBOT_SEQ_OFFSET = 0
+MUX_SEQ_OFFSET = 8
+PS = struct.Struct("<8d")
+SPEED = struct.Struct("<2d")
+PS_OFFSET = HEADER.size
+SPEED_OFFSET = PS_OFFSET + PS.size
+IMAGE_OFFSET = SPEED_OFFSET + SPEED.size
+STOP = -1  # either sequence number: that side has stopped
+
+
+def block_name(robot_name):
+    """Shared-memory name for one robot (Webots robot names may contain spaces/parens)."""
+    safe = "".join(c if c.isalnum() else "_" for c in robot_name)
+    return f"epuck_mux_{safe}"
+
+
+def block_size(width, height):
+    return IMAGE_OFFSET + width * height * 4
+
+
+def doorbell_path(name):
+    """Named pipe used to wake the process listening on `name` (a block name, or MUX_DOORBELL)."""
+    return os.path.join(tempfile.gettempdir(), f"{name}.doorbell")
+
+
+MUX_DOORBELL = "epuck_mux"   # rung by every relay after publishing a sample
+
+
+class Doorbell:
+    """Cross-process wake-up over a named pipe, so neither side has to poll.
+
+    The listener creates the pipe and blocks in wait() until someone rings it
+    or the timeout passes; the shared-memory sequence numbers stay the source
+    of truth, so callers re-check them after every wake-up. A ring that finds
+    no listener (not started yet, or gone) is dropped. Where named pipes are
+    not available (Windows) wait() sleeps with exponential backoff instead.
+    """
+
+    MIN_SLEEP = 0.0001   # s, fallback backoff
+    MAX_SLEEP = 0.002
+
+    def __init__(self, name, listen):
+        self.path = doorbell_path(name)
+        self.listen = listen
+        self.fd = None
+        self._sleep = self.MIN_SLEEP
+        self._woke = 0.0
+        if listen and hasattr(os, "mkfifo"):
+            if os.path.exists(self.path):
+                os.unlink(self.path)   # left over from a crashed run
+            os.mkfifo(self.path, 0o600)
+            # Read-write, so opening never blocks and the pipe never reads as closed
+            self.fd = os.open(self.path, os.O_RDWR | os.O_NONBLOCK)
+
+    def ring(self):
+        if not hasattr(os, "mkfifo"):
+            return
+        if self.fd is None:
+            try:
+                self.fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError:
+                return   # nobody listening yet
+        try:
+            os.write(self.fd, b"\0")
+        except BlockingIOError:
+            pass         # pipe full: the listener has plenty of wake-ups pending
+        except OSError:
+            os.close(self.fd)   # listener went away; reopen on the next ring
+            self.fd = None
+
+    def wait(self, timeout):
+        """Block until rung (or `timeout` seconds pass), then clear pending rings."""
+        if self.fd is None:
+            now = time.monotonic()
+            if now - self._woke > self.MAX_SLEEP:
+                self._sleep = self.MIN_SLEEP   # a new wait, not a continuing one
+            time.sleep(min(self._sleep, timeout))
+            self._sleep = min(self._sleep * 2.0, self.MAX_SLEEP)
+            self._woke = time.monotonic()
+            return
+        if select.select([self.fd], [], [], timeout)[0]:
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        if self.listen and hasattr(os, "mkfifo"):
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
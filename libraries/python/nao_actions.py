@@ -0,0 +1,51 @@
+"""
+Action set of the NAO duck-lifting task, shared by NAO_RL_Kick and the
+NAO_RL_Kick_Agent controllers of multi-arena worlds. Q-tables index actions
+by their position in ACTIONS, so the order must not change.
+"""
+
+import os
+
+ACTIONS = [
+    "turn_left",
+    "turn_right",
+    "forward",
+    "side_step_left",
+    "reach_forward_both",
+    "reach_down_both",
+    "close_hands",
+    "open_hands",
+]
+
+# Gait actions and their motion files
+GAIT_FILES = {
+    "turn_left": "TurnLeft60.motion",
+    "turn_right": "TurnRight60.motion",
+    "forward": "Forwards50.motion",
+    "side_step_left": "SideStepLeft.motion",
+}
+
+# Control steps one gait action lasts (the Webots Motion path stops there; keyframe
+# players cover the same part of the gait)
+GAIT_STEPS = 40
+
+# Bilateral arm actions: joint targets (left side mirrored) and how long to hold them (ms)
+ARM_POSES = {
+    # Both arms forward to embrace duck
+    "reach_forward_both": ({"RShoulderPitch": 0.5, "LShoulderPitch": 0.5, "RElbowRoll": 0.8, "LElbowRoll": -0.8}, 500),
+    # Both arms down to reach duck at feet
+    "reach_down_both": ({"RShoulderPitch": 1.5, "LShoulderPitch": 1.5, "RElbowRoll": 0.1, "LElbowRoll": -0.1}, 500),
+    # Both hands close for strong grip
+    "close_hands": ({"RWristYaw": 1.5, "LWristYaw": -1.5}, 400),
+    # Both hands open to release
+    "open_hands": ({"RWristYaw": -1.5, "LWristYaw": 1.5}, 400),
+}
+
+
+def resolve_motion_dir(webots_home=None):
+    """Directory of the stock NAO motion files under WEBOTS_HOME."""
+    if webots_home is None:
+        webots_home = os.environ.get("WEBOTS_HOME", "/Applications/Webots.app/Contents")
+    if webots_home.endswith(".app"):
+        webots_home = os.path.join(webots_home, "Contents")
+    return os.path.join(webots_home, "projects/robots/softbank/nao/motions")
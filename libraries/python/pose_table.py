@@ -0,0 +1,157 @@
+"""
+Named joint poses and a change-only motor bank.
+
+A PoseTable stores named (partial) poses and joint groups as NumPy index /
+value vectors over a fixed joint order. A MotorBank stages every write made
+during a control step, merges conflicting writes to the same joint, and on
+commit() calls setPosition only for joints whose target actually changed.
+
+Merge order: a write with a higher priority wins; for equal priority the
+later write wins, which matches calling setPosition twice before a step.
+"""
+
+import numpy as np
+
+
+class Pose:
+    __slots__ = ("name", "indices", "values")
+
+    def __init__(self, name, indices, values):
+        self.name = name
+        self.indices = indices
+        self.values = values
+
+
+class PoseTable:
+    """Joint order plus named joint groups and named poses."""
+
+    def __init__(self, joint_names):
+        self.joint_names = list(joint_names)
+        self.index = {name: i for i, name in enumerate(self.joint_names)}
+        self.groups = {}
+        self.poses = {}
+
+    def add_group(self, name, joints):
+        self.groups[name] = np.array([self.index[j] for j in joints], dtype=np.intp)
+        return self.groups[name]
+
+    def add_pose(self, name, targets):
+        """Register a pose from a {joint_name: position} mapping."""
+        indices = np.array([self.index[j] for j in targets], dtype=np.intp)
+        values = np.array(list(targets.values()), dtype=np.float64)
+        self.poses[name] = Pose(name, indices, values)
+        return self.poses[name]
+
+    def pose(self, name):
+        return self.poses[name]
+
+    def group(self, name):
+        return self.groups[name]
+
+    def vector(self, name):
+        """Full-length target vector for a pose, NaN for joints it leaves alone."""
+        pose = self.poses[name]
+        full = np.full(len(self.joint_names), np.nan)
+        full[pose.indices] = pose.values
+        return full
+
+    def compose(self, *parts):
+        """Overlay pose names, {joint: value} dicts or vectors; later parts win."""
+        full = np.full(len(self.joint_names), np.nan)
+        for part in parts:
+            if isinstance(part, str):
+                pose = self.poses[part]
+                full[pose.indices] = pose.values
+            elif isinstance(part, dict):
+                for joint, value in part.items():
+                    full[self.index[joint]] = value
+            else:
+                part = np.asarray(part, dtype=np.float64)
+                mask = ~np.isnan(part)
+                full[mask] = part[mask]
+        return full
+
+
+class MotorBank:
+    """Remembers commanded targets and writes only joints that changed."""
+
+    def __init__(self, robot, table, tolerance=1e-6):
+        self.table = table
+        self.tolerance = tolerance
+        self.motors = [robot.getDevice(name) for name in table.joint_names]
+        n = len(self.motors)
+        self.present = np.array([m is not None for m in self.motors])
+        self.last = np.full(n, np.nan)
+        self.pending = np.full(n, np.nan)
+        self.pending_priority = np.full(n, -np.inf)
+        self.requested = 0
+        self.written = 0
+        self.steps = 0
+
+    def _stage(self, indices, values, priority):
+        accept = priority >= self.pending_priority[indices]
+        indices = indices[accept]
+        self.pending[indices] = values[accept] if np.ndim(values) else values
+        self.pending_priority[indices] = priority
+        self.requested += len(accept)
+
+    def set(self, joint, value, priority=0):
+        i = self.table.index[joint]
+        if priority >= self.pending_priority[i]:
+            self.pending[i] = value
+            self.pending_priority[i] = priority
+        self.requested += 1
+
+    def apply(self, pose, priority=0):
+        """Stage a pose (name or Pose)."""
+        if isinstance(pose, str):
+            pose = self.table.pose(pose)
+        self._stage(pose.indices, pose.values, priority)
+
+    def set_group(self, group, values, priority=0):
+        """Stage one value or a vector of values for a named joint group."""
+        self._stage(self.table.group(group), np.asarray(values, dtype=np.float64), priority)
+
+    def apply_vector(self, values, priority=0):
+        """Stage a full-length target vector; NaN entries are left alone."""
+        values = np.asarray(values, dtype=np.float64)
+        indices = np.flatnonzero(~np.isnan(values))
+        self._stage(indices, values[indices], priority)
+
+    def target(self, joint):
+        """Staged target for this step if any, else the last committed target."""
+        i = self.table.index[joint]
+        value = self.pending[i]
+        return self.last[i] if np.isnan(value) else value
+
+    def invalidate(self):
+        """Forget committed targets, e.g. after a Motion file drove the joints."""
+        self.last[:] = np.nan
+
+    def commit(self):
+        """Write changed joints to the motors. Returns the number of setPosition calls."""
+        staged = ~np.isnan(self.pending)
+        changed = staged & self.present & ~(np.abs(self.pending - self.last) <= self.tolerance)
+        indices = np.flatnonzero(changed)
+        motors = self.motors
+        pending = self.pending
+        for i in indices:
+            motors[i].setPosition(float(pending[i]))
+        self.last[changed] = pending[changed]
+        self.pending[staged] = np.nan
+        self.pending_priority[staged] = -np.inf
+        self.written += len(indices)
+        self.steps += 1
+        return len(indices)
+
+    @property
+    def saved_per_step(self):
+        """Average setPosition calls avoided per committed step."""
+        if self.steps == 0:
+            return 0.0
+        return (self.requested - self.written) / self.steps
+
+    def reset_stats(self):
+        self.requested = 0
+        self.written = 0
+        self.steps = 0
@@ -0,0 +1,214 @@
+"""
+Randomized episode resets with a success-driven difficulty curriculum.
+
+Start states are drawn from a fixed set of placements, generated once
+(vectorized rejection sampling against the arena walls, boxes and balls of
+the world file) and cached as a small .npz. Each placement is a robot pose
+(x, y, yaw) plus an object pose (x, y, yaw), validated so the robot and the
+object do not interpenetrate each other or the arena, and scored by how hard
+it is to reach the object: the distance between them and how far the object
+is off the robot's heading. Placements are stored sorted by that score in
+int16 millimetres / 1e-4 rad, 14 bytes each.
+
+ResetCurriculum samples uniformly among the placements no harder than its
+current level, so a reset is one random integer and an array lookup. After
+every `window` episodes it looks at the success rate: above `raise_at` the
+level goes up by `step`, below `lower_at` it goes down.
+
+    placements = cached_placements("placements.npz", arena_from_world("worlds/bobby.wbt"))
+    curriculum = ResetCurriculum(placements)
+    robot_pose, object_pose = curriculum.sample()
+    ...
+    curriculum.record(success)
+"""
+
+import collections
+import hashlib
+import math
+import os
+import re
+
+import numpy as np
+
+from diff_drive_sim import Arena
+
+PLACEMENT_DTYPE = np.dtype([
+    ("robot", "<i2", (3,)),    # x, y (mm), yaw (1e-4 rad)
+    ("object", "<i2", (3,)),
+    ("difficulty", "<u2"),     # 0..65535 for 0..1
+])
+POSITION_SCALE = 1000.0
+YAW_SCALE = 10000.0
+DIFFICULTY_SCALE = 65535.0
+
+# Balls are obstacles too (treated as boxes of their diameter)
+BALL_DIAMETERS = {"PingPongBall": 0.04, "Ball": 0.065}
+
+
+def arena_from_world(path, extra_boxes=()):
+    """Arena.from_wbt plus the world's balls as small boxes; the default 1 x 1 m arena if `path` is missing."""
+    if not path or not os.path.isfile(path):
+        return Arena(boxes=extra_boxes)
+    text = open(path).read()
+    boxes = list(extra_boxes)
+    for proto, body in re.findall(r"\b(%s)\s*\{([^}]*)\}" % "|".join(BALL_DIAMETERS), text):
+        translation = re.search(r"translation\s+([-\d.e]+)\s+([-\d.e]+)", body)
+        if translation:
+            size = BALL_DIAMETERS[proto]
+            boxes.append((float(translation.group(1)), float(translation.group(2)), size, size))
+    return Arena.from_wbt(path, boxes)
+
+
+def generate_placements(arena, count=4096, robot_radius=0.15, object_radius=0.05,
+                        distance=(0.2, 0.7), clearance=0.02, seed=0):
+    """`count` validated placements in `arena`, sorted from easiest to hardest.
+
+    Distances are between the robot and object centres; `clearance` is the
+    extra gap kept between the two footprints and from every wall or box.
+    """
+    rng = np.random.default_rng(seed)
+    low = np.array([arena.x_min, arena.y_min])
+    high = np.array([arena.x_max, arena.y_max])
+    min_distance = max(distance[0], robot_radius + object_radius + clearance)
+    chunks, found = [], 0
+    for _ in range(1000):
+        n = 4 * count
+        robot = rng.uniform(low, high, (n, 2))
+        obj = rng.uniform(low, high, (n, 2))
+        offset = obj - robot
+        gap = np.hypot(offset[:, 0], offset[:, 1])
+        valid = ((gap >= min_distance) & (gap <= distance[1])
+                 & ~arena.collides(robot, robot_radius + clearance)
+                 & ~arena.collides(obj, object_radius + clearance))
+        robot, obj, offset, gap = robot[valid], obj[valid], offset[valid], gap[valid]
+        robot_yaw = rng.uniform(-math.pi, math.pi, len(robot))
+        object_yaw = rng.uniform(-math.pi, math.pi, len(robot))
+        bearing = np.abs(np.remainder(np.arctan2(offset[:, 1], offset[:, 0]) - robot_yaw + math.pi,
+                                      2 * math.pi) - math.pi)
+        span = max(distance[1] - min_distance, 1e-9)
+        difficulty = 0.5 * (gap - min_distance) / span + 0.5 * bearing / math.pi
+        chunks.append((robot, robot_yaw, obj, object_yaw, difficulty))
+        found += len(robot)
+        if found >= count:
+            break
+    else:
+        raise ValueError(f"Only {found} of {count} placements fit in the arena")
+
+    robot, robot_yaw, obj, object_yaw, difficulty = (np.concatenate(parts)[:count] for parts in zip(*chunks))
+    placements = np.zeros(count, dtype=PLACEMENT_DTYPE)
+    placements["robot"][:, :2] = np.round(robot * POSITION_SCALE)
+    placements["robot"][:, 2] = np.round(robot_yaw * YAW_SCALE)
+    placements["object"][:, :2] = np.round(obj * POSITION_SCALE)
+    placements["object"][:, 2] = np.round(object_yaw * YAW_SCALE)
+    placements["difficulty"] = np.round(np.clip(difficulty, 0.0, 1.0) * DIFFICULTY_SCALE)
+    return np.sort(placements, order="difficulty", kind="stable")
+
+
+def _cache_key(arena, kwargs):
+    parts = [arena.x_min, arena.x_max, arena.y_min, arena.y_max, *arena.boxes.ravel()]
+    parts += [f"{name}={kwargs[name]}" for name in sorted(kwargs)]
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def save_placements(path, placements, key=""):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, placements=placements, key=np.array(key))
+
+
+def load_placements(path):
+    """(placements, key) from a file written by save_placements."""
+    with np.load(path) as data:
+        placements = data["placements"]
+        if placements.dtype != PLACEMENT_DTYPE:
+            raise ValueError(f"{path} does not hold placements")
+        return placements, str(data["key"])
+
+
+def cached_placements(path, arena, **kwargs):
+    """Placements from `path` if they were generated for this arena and settings, else generate and save."""
+    key = _cache_key(arena, kwargs)
+    if path and os.path.isfile(path):
+        try:
+            placements, saved_key = load_placements(path)
+            if saved_key == key:
+                return placements
+        except (OSError, ValueError, KeyError):
+            pass
+    placements = generate_placements(arena, **kwargs)
+    if path:
+        try:
+            save_placements(path, placements, key)
+        except OSError as e:
+            print(f"Could not cache placements to {path}: {e}")
+    return placements
+
+
+class ResetCurriculum:
+    """Samples start placements no harder than the current level; adapts the level to success."""
+
+    def __init__(self, placements, level=0.2, window=10, raise_at=0.6, lower_at=0.2, step=0.1,
+                 min_level=0.05, min_choices=16, seed=None):
+        if not len(placements):
+            raise ValueError("No placements to sample from")
+        self.robot = placements["robot"].astype(np.float64)
+        self.object = placements["object"].astype(np.float64)
+        for poses in (self.robot, self.object):
+            poses[:, :2] /= POSITION_SCALE
+            poses[:, 2] /= YAW_SCALE
+        self.difficulty = placements["difficulty"] / DIFFICULTY_SCALE
+        self.rng = np.random.default_rng(seed)
+        self.window = window
+        self.raise_at = raise_at
+        self.lower_at = lower_at
+        self.step = step
+        self.min_level = min_level
+        self.min_choices = min(min_choices, len(placements))
+        self.outcomes = collections.deque(maxlen=window)
+        self.episodes = 0
+        self.successes = 0
+        self.index = None
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.level = min(1.0, max(self.min_level, level))
+        # Placements are sorted by difficulty, so the eligible ones are a prefix
+        self.choices = max(self.min_choices, int(np.searchsorted(self.difficulty, self.level, side="right")))
+
+    def sample(self):
+        """((x, y, yaw) of the robot, (x, y, yaw) of the object) for the next episode."""
+        self.index = int(self.rng.integers(self.choices))
+        return tuple(self.robot[self.index].tolist()), tuple(self.object[self.index].tolist())
+
+    def record(self, success):
+        """Outcome of the episode that started from the last sample(); may move the level."""
+        self.episodes += 1
+        self.successes += bool(success)
+        self.outcomes.append(bool(success))
+        if len(self.outcomes) < self.window:
+            return
+        rate = sum(self.outcomes) / len(self.outcomes)
+        if rate >= self.raise_at and self.level < 1.0:
+            self.set_level(self.level + self.step)
+        elif rate < self.lower_at and self.level > self.min_level:
+            self.set_level(self.level - self.step)
+        else:
+            return
+        # Judge the new level on its own episodes only
+        self.outcomes.clear()
+
+    def state_dict(self):
+        return {"level": self.level, "outcomes": [int(o) for o in self.outcomes]}
+
+    def load_state(self, state):
+        if not state:
+            return
+        self.set_level(state.get("level", self.level))
+        self.outcomes.clear()
+        self.outcomes.extend(bool(o) for o in state.get("outcomes", ()))
+
+    def report(self):
+        recent = f"{sum(self.outcomes)}/{len(self.outcomes)}" if self.outcomes else "-"
+        difficulty = self.difficulty[self.index] if self.index is not None else float("nan")
+        return (f"curriculum level {self.level:.2f} ({self.choices} placements), "
+                f"start difficulty {difficulty:.2f}, recent successes {recent}")
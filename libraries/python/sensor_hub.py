@@ -0,0 +1,120 @@
+"""
+Per-step sensor snapshots.
+
+A SensorHub reads every registered device at most once per control step
+into one row of a preallocated structured NumPy ring buffer. Controllers
+read the current snapshot (and a short history for derivatives and
+filtering) instead of calling getValue()/getValues() ad hoc. Each sensor
+can have its own sampling period; between samples its last value is
+carried forward.
+"""
+
+import numpy as np
+
+
+class _Entry:
+    __slots__ = ("name", "read", "size", "period", "next_due")
+
+    def __init__(self, name, read, size, period):
+        self.name = name
+        self.read = read
+        self.size = size
+        self.period = period
+        self.next_due = 0.0
+
+
+class SensorHub:
+    """Samples registered sensors into a structured ring buffer once per step."""
+
+    def __init__(self, timestep, history=8):
+        self.timestep = timestep
+        self.history_len = history
+        self.entries = []
+        self.ring = None
+        self.times = np.zeros(history)
+        self.head = -1
+        self.samples = 0
+        self.reads = 0
+
+    def _period(self, period):
+        # Sensor periods must be multiples of the basic timestep
+        period = period or self.timestep
+        return max(self.timestep, int(round(period / self.timestep)) * self.timestep)
+
+    def _add(self, name, devices, read, size, period):
+        if self.ring is not None:
+            raise RuntimeError("SensorHub.build() was already called")
+        period = self._period(period)
+        for device in devices:
+            if device is not None:
+                device.enable(period)
+        self.entries.append(_Entry(name, read, size, period))
+
+    def add_scalar(self, name, device, period=None):
+        """Sensor read with getValue() (touch sensor, position sensor, ...)."""
+        self._add(name, [device], device.getValue if device else None, 1, period)
+
+    def add_vector(self, name, device, size=3, method="getValues", period=None):
+        """Sensor read with getValues() or getRollPitchYaw() (FSR, gyro, IMU, ...)."""
+        read = getattr(device, method) if device else None
+        self._add(name, [device], read, size, period)
+
+    def add_group(self, name, devices, period=None):
+        """Several scalar sensors sampled together into one vector field."""
+        present = [d for d in devices if d is not None]
+        if len(present) == len(devices):
+            def read():
+                return [d.getValue() for d in devices]
+        else:
+            def read():
+                return [d.getValue() if d is not None else np.nan for d in devices]
+        self._add(name, devices, read if present else None, len(devices), period)
+
+    def build(self):
+        """Allocate the ring buffer once all sensors are registered."""
+        dtype = [(e.name, np.float64) if e.size == 1 else (e.name, np.float64, (e.size,))
+                 for e in self.entries]
+        self.ring = np.full(self.history_len, np.nan, dtype=dtype) if dtype else np.zeros(self.history_len)
+        return self
+
+    def sample(self, time_ms):
+        """Read every sensor that is due at time_ms into the next snapshot row."""
+        prev = self.head
+        self.head = (self.head + 1) % self.history_len
+        if prev >= 0:
+            self.ring[self.head] = self.ring[prev]
+        self.times[self.head] = time_ms
+        for entry in self.entries:
+            if entry.read is None or time_ms < entry.next_due:
+                continue
+            self.ring[entry.name][self.head] = entry.read()
+            self.reads += 1
+            entry.next_due = time_ms + entry.period
+        self.samples += 1
+        return self.ring[self.head]
+
+    @property
+    def snapshot(self):
+        """Current structured record (fields named after the sensors)."""
+        return self.ring[self.head]
+
+    def get(self, name):
+        return self.ring[name][self.head]
+
+    def history(self, name, n=None):
+        """Last n samples of a sensor, oldest first."""
+        n = min(n or self.history_len, self.samples, self.history_len)
+        order = (self.head - np.arange(n - 1, -1, -1)) % self.history_len
+        return self.ring[name][order]
+
+    def derivative(self, name):
+        """Per-second rate of change between the last two snapshots."""
+        if self.samples < 2:
+            return np.zeros_like(self.get(name))
+        prev = (self.head - 1) % self.history_len
+        dt = (self.times[self.head] - self.times[prev]) / 1000.0
+        return (self.ring[name][self.head] - self.ring[name][prev]) / dt
+
+    def mean(self, name, n=None):
+        """Moving average over the last n snapshots (simple low-pass filter)."""
+        return np.mean(self.history(name, n), axis=0)
@@ -0,0 +1,183 @@
+"""
+Cooperative multi-rate runtime for Webots controllers.
+
+Behaviors are `async def` coroutines (or plain generators) that wait on
+simulated time instead of calling robot.step themselves:
+
+    async def wave():
+        arm.setPosition(1.0)
+        await sim.sleep(400)
+        player.play()
+        await sim.motion_done(player)
+
+Periodic callbacks (fall detection every step, vision at 10 Hz, logging at
+1 Hz, ...) are registered with `every()`. The runtime owns the single
+`robot.step` call and, after each step, runs the due periodic callbacks and
+then resumes every coroutine whose wait condition is met. No threads.
+"""
+
+
+class Sleep:
+    """Wait until `ms` of simulated time have passed (at least one step)."""
+
+    __slots__ = ("ms",)
+
+    def __init__(self, ms):
+        self.ms = ms
+
+    def __await__(self):
+        yield self
+
+
+class Until:
+    """Wait until predicate() is true; resumes with False on timeout."""
+
+    __slots__ = ("predicate", "timeout_ms")
+
+    def __init__(self, predicate, timeout_ms=None):
+        self.predicate = predicate
+        self.timeout_ms = timeout_ms
+
+    def __await__(self):
+        return (yield self)
+
+
+def sleep(ms):
+    return Sleep(ms)
+
+
+def next_step():
+    return Sleep(0)
+
+
+def until(predicate, timeout_ms=None):
+    return Until(predicate, timeout_ms)
+
+
+def motion_done(motion, timeout_ms=None):
+    """Wait for a controller.Motion or KeyframePlayer to report isOver()."""
+    return Until(motion.isOver, timeout_ms)
+
+
+class PeriodicTask:
+    def __init__(self, period_ms, callback, name, next_due):
+        self.period_ms = period_ms
+        self.callback = callback
+        self.name = name
+        self.next_due = next_due
+        self.calls = 0
+        self.enabled = True
+
+
+class Task:
+    """A coroutine scheduled by the runtime. Awaiting a task waits for its result."""
+
+    def __init__(self, coro, name):
+        self.coro = coro
+        self.name = name
+        self.wait = None
+        self.deadline = None
+        self.done = False
+        self.result = None
+
+    def __await__(self):
+        yield Until(lambda: self.done)
+        return self.result
+
+
+class SimRuntime:
+    """Owns robot.step and schedules periodic callbacks and coroutines around it."""
+
+    def __init__(self, robot, timestep=None):
+        self.robot = robot
+        self.timestep = timestep or int(robot.getBasicTimeStep())
+        self.time_ms = robot.getTime() * 1000.0
+        self.steps = 0
+        self.running = True
+        self.periodic = []
+        self.tasks = []
+
+    # Awaitables, re-exported so behaviors only need the runtime object
+    sleep = staticmethod(sleep)
+    next_step = staticmethod(next_step)
+    until = staticmethod(until)
+    motion_done = staticmethod(motion_done)
+
+    def every(self, period_ms, callback, name=None):
+        """Call callback() every period_ms of simulated time (0 = every step)."""
+        task = PeriodicTask(period_ms, callback, name or callback.__name__, self.time_ms)
+        self.periodic.append(task)
+        return task
+
+    def spawn(self, coro, name=None):
+        """Schedule a coroutine or generator; it runs until its first wait now."""
+        task = Task(coro, name or getattr(coro, "__name__", "task"))
+        self._resume(task, None)
+        if not task.done:
+            self.tasks.append(task)
+        return task
+
+    def _resume(self, task, value):
+        try:
+            wait = task.coro.send(value)
+        except StopIteration as stop:
+            task.done = True
+            task.result = stop.value
+            return
+        if isinstance(wait, (int, float)):
+            wait = Sleep(wait)
+        task.wait = wait
+        if isinstance(wait, Sleep):
+            task.deadline = self.time_ms + wait.ms
+        elif isinstance(wait, Until):
+            task.deadline = None if wait.timeout_ms is None else self.time_ms + wait.timeout_ms
+        else:
+            raise TypeError(f"Task {task.name} yielded {wait!r}; expected sleep()/until()")
+
+    def step(self):
+        """Advance one basic timestep. Returns False once the simulation ends."""
+        if not self.running:
+            return False
+        if self.robot.step(self.timestep) == -1:
+            self.shutdown()
+            return False
+        self.steps += 1
+        self.time_ms += self.timestep
+
+        now = self.time_ms
+        for periodic in self.periodic:
+            if periodic.enabled and now >= periodic.next_due:
+                periodic.callback()
+                periodic.calls += 1
+                if periodic.period_ms > 0:
+                    while periodic.next_due <= now:
+                        periodic.next_due += periodic.period_ms
+
+        for task in list(self.tasks):
+            wait = task.wait
+            if isinstance(wait, Sleep):
+                if now >= task.deadline:
+                    self._resume(task, None)
+            elif wait.predicate():
+                self._resume(task, True)
+            elif task.deadline is not None and now >= task.deadline:
+                self._resume(task, False)
+            if task.done:
+                self.tasks.remove(task)
+        return self.running
+
+    def run(self, main=None, keep_alive=True):
+        """Run `main` (if given) to completion, then keep stepping if keep_alive."""
+        task = self.spawn(main) if main is not None else None
+        while self.running:
+            if task is not None and task.done and not keep_alive:
+                break
+            self.step()
+        return task.result if task is not None else None
+
+    def shutdown(self):
+        """Stop stepping and close every pending coroutine (runs their finally blocks)."""
+        self.running = False
+        for task in self.tasks:
+            task.coro.close()
+        self.tasks.clear()
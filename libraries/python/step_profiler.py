@@ -0,0 +1,257 @@
+"""
+Per-step profiler separating simulator time from controller time.
+
+    profiler = StepProfiler(timestep, report_period=30.0)
+    profiler.attach(robot)               # robot.step() is now timed as "sim"
+
+    @profiler.timed("vision")
+    def get_state(): ...
+
+    with profiler.region("policy"):
+        learner.update(...)
+
+Wall time between two robot.step calls is "controller"; named regions
+break it down further (a region must not contain a robot.step call).
+Durations are taken with time.perf_counter_ns and counted into fixed
+log-spaced histogram buckets (8 per power of two, about 6% resolution),
+so recording allocates nothing. Every `report_period` seconds of wall time
+a compact report with p50/p95/p99 per region, each region's share of the
+wall time and the real-time factor is printed, and the window restarts.
+
+With enabled=False, attach() is a no-op, timed() returns the function
+unchanged and region() returns a shared do-nothing context manager.
+"""
+
+import time
+
+import numpy as np
+
+_now = time.perf_counter_ns
+
+SUB_BITS = 3                        # 2**SUB_BITS buckets per power of two
+SUB_MASK = (1 << SUB_BITS) - 1
+BUCKETS = (64 + 1) << SUB_BITS      # covers every int64 nanosecond duration
+FOLD_EVERY = 512                    # steps between folding raw samples into the buckets
+CALIBRATION_ROUNDS = 2000
+
+
+def bucket_index(ns):
+    """Histogram bucket of a duration in nanoseconds."""
+    bits = ns.bit_length()
+    if bits <= SUB_BITS:
+        return ns
+    return (bits << SUB_BITS) | ((ns >> (bits - SUB_BITS - 1)) & SUB_MASK)
+
+
+def bucket_value(index):
+    """Midpoint (ns) of the durations counted in a bucket."""
+    bits = index >> SUB_BITS
+    if bits == 0:
+        return float(index)
+    sub = index & SUB_MASK
+    width = 1 << (bits - SUB_BITS - 1)
+    return ((1 << SUB_BITS) + sub + 0.5) * width
+
+
+class Histogram:
+    """Count, total and log-bucketed distribution of durations (ns).
+
+    add() only appends to a list; fold() buckets the pending samples in
+    one vectorized pass, so a timing costs little more than the two clock
+    reads around it.
+    """
+
+    __slots__ = ("name", "counts", "n", "total_ns", "pending", "add")
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = np.zeros(BUCKETS, dtype=np.int64)
+        self.n = 0
+        self.total_ns = 0
+        self.pending = []
+        self.add = self.pending.append
+
+    def fold(self):
+        if not self.pending:
+            return
+        ns = np.array(self.pending, dtype=np.int64)
+        self.pending.clear()
+        # Vectorized bucket_index(): frexp gives ns = m * 2**bits with m in [0.5, 1)
+        mantissa, bits = np.frexp(ns)
+        index = np.where(bits > SUB_BITS,
+                         (bits << SUB_BITS) | (np.floor(mantissa * (2 << SUB_BITS)).astype(np.int64) & SUB_MASK),
+                         ns)
+        self.counts += np.bincount(index, minlength=BUCKETS)
+        self.n += len(ns)
+        self.total_ns += int(ns.sum())
+
+    def percentiles(self, *qs):
+        """Approximate percentiles (ns) for q in [0, 100]."""
+        self.fold()
+        if not self.n:
+            return [0.0 for _ in qs]
+        cumulative = np.cumsum(self.counts)
+        return [bucket_value(int(np.searchsorted(cumulative, max(q * self.n / 100.0, 1)))) for q in qs]
+
+    def clear(self):
+        self.counts[:] = 0
+        self.n = 0
+        self.total_ns = 0
+        self.pending.clear()
+
+
+class _Region:
+    """Context manager and decorator target for one named region."""
+
+    __slots__ = ("add", "start")
+
+    def __init__(self, histogram):
+        self.add = histogram.add
+        self.start = 0
+
+    def __enter__(self):
+        self.start = _now()
+        return self
+
+    def __exit__(self, *exc):
+        self.add(_now() - self.start)
+        return False
+
+
+class _NullRegion:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_REGION = _NullRegion()
+
+
+class StepProfiler:
+    """Times robot.step ("sim"), the gaps between steps ("controller") and named regions."""
+
+    def __init__(self, timestep, report_period=30.0, enabled=True, emit=print):
+        self.timestep = timestep
+        self.report_period = report_period
+        self.enabled = enabled
+        self.emit = emit
+        self.sim = Histogram("sim")
+        self.controller = Histogram("controller")
+        self.regions = {}
+        self.steps = 0
+        self.sim_ms = 0
+        self.record_cost_ns = self._calibrate() if enabled else 0.0
+        self._window_start = _now()
+        self._next_report = self._window_start + int(report_period * 1e9) if report_period else None
+        self._last_return = None
+        self._step = None
+
+    @staticmethod
+    def _calibrate():
+        """Cost (ns) of one timed region including its share of fold(), on a throwaway histogram."""
+        histogram = Histogram("calibration")
+        region = _Region(histogram)
+        rounds = range(CALIBRATION_ROUNDS)
+        start = _now()
+        for _ in rounds:
+            pass
+        loop = _now() - start
+        start = _now()
+        for _ in rounds:
+            with region:
+                pass
+        histogram.fold()
+        return max(_now() - start - loop, 0) / CALIBRATION_ROUNDS
+
+    def attach(self, robot):
+        """Route robot.step through the profiler (works for SimRuntime and plain loops)."""
+        if self.enabled and self._step is None:
+            self._step = robot.step
+            robot.step = self.step
+        return robot
+
+    def step(self, duration):
+        now = _now()
+        if self._last_return is not None:
+            self.controller.add(now - self._last_return)
+        result = self._step(duration)
+        end = _now()
+        self.sim.add(end - now)
+        self.steps += 1
+        self.sim_ms += duration
+        self._last_return = end
+        if self._next_report is not None and end >= self._next_report:
+            self.emit(self.report())
+            self.reset()
+            # Reporting and folding are profiler time, not controller time
+            self._last_return = _now()
+        elif self.steps % FOLD_EVERY == 0:
+            self.fold()
+            self._last_return = _now()
+        return result
+
+    def histograms(self):
+        return [self.sim, self.controller] + list(self.regions.values())
+
+    def fold(self):
+        for h in self.histograms():
+            h.fold()
+
+    def region(self, name):
+        """Context manager timing `name`; reuse the returned object in hot loops."""
+        if not self.enabled:
+            return NULL_REGION
+        histogram = self.regions.get(name)
+        if histogram is None:
+            histogram = self.regions[name] = Histogram(name)
+        return _Region(histogram)
+
+    def timed(self, name):
+        """Decorator: time every call of a function as region `name`."""
+        def wrap(function):
+            if not self.enabled:
+                return function
+            self.region(name)
+            add = self.regions[name].add
+
+            def timed_call(*args, **kwargs):
+                start = _now()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    add(_now() - start)
+            timed_call.__name__ = function.__name__
+            timed_call.__doc__ = function.__doc__
+            timed_call.__wrapped__ = function
+            return timed_call
+        return wrap
+
+    def report(self):
+        wall_ns = max(_now() - self._window_start, 1)
+        self.fold()
+        rtf = self.sim_ms * 1e6 / wall_ns
+        records = self.sim.n + self.controller.n + sum(h.n for h in self.regions.values())
+        overhead = 100.0 * records * self.record_cost_ns / wall_ns
+        lines = [f"[profile] {self.steps} steps in {wall_ns / 1e9:.1f}s  RTF {rtf:.2f}x  "
+                 f"overhead ~{overhead:.2f}%  (ms: p50 p95 p99, share of wall)"]
+        for h in [self.sim, self.controller] + sorted(self.regions.values(), key=lambda h: -h.total_ns):
+            if not h.n:
+                continue
+            p50, p95, p99 = (v / 1e6 for v in h.percentiles(50, 95, 99))
+            lines.append(f"  {h.name:<12}{h.n:>7}  {p50:8.3f} {p95:8.3f} {p99:8.3f}  "
+                         f"{100.0 * h.total_ns / wall_ns:5.1f}%")
+        return "\n".join(lines)
+
+    def reset(self):
+        """Start a new reporting window."""
+        for h in self.histograms():
+            h.clear()
+        self.steps = 0
+        self.sim_ms = 0
+        self._window_start = _now()
+        if self.report_period:
+            self._next_report = self._window_start + int(self.report_period * 1e9)
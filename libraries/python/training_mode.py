@@ -0,0 +1,90 @@
+"""
+Fast-mode training with periodic real-time evaluation episodes.
+
+A TrainingMode switches a Supervisor to SIMULATION_MODE_FAST for training
+episodes and back to SIMULATION_MODE_REAL_TIME for one evaluation episode
+every `eval_every` episodes, so progress can be watched (and the display
+overlay and per-step logging are worth their cost) without slowing
+training down. `verbose` tells the controller which of the two it is in.
+
+It also clocks simulated against wall time per kind of episode, so the
+gain is reported as simulated seconds per wall second:
+
+    mode = TrainingMode(robot, eval_every=10)
+    for episode in ...:
+        evaluating = mode.begin_episode(episode)
+        ...
+        mode.end_episode()
+    print(mode.report())
+"""
+
+import time
+
+
+class _Clock:
+    __slots__ = ("episodes", "sim_s", "wall_s")
+
+    def __init__(self):
+        self.episodes = 0
+        self.sim_s = 0.0
+        self.wall_s = 0.0
+
+    @property
+    def rate(self):
+        """Simulated seconds per wall second."""
+        return self.sim_s / self.wall_s if self.wall_s > 0 else 0.0
+
+
+class TrainingMode:
+    """Fast training episodes, with a rendered real-time evaluation episode every `eval_every`."""
+
+    def __init__(self, robot, eval_every=10, fast=True):
+        self.robot = robot
+        self.eval_every = eval_every
+        self.fast = fast
+        self.evaluating = False
+        self.clocks = {"train": _Clock(), "eval": _Clock()}
+        self._start = None
+
+    @property
+    def verbose(self):
+        """Whether per-step output (console, overlay) is wanted right now."""
+        return self.evaluating or not self.fast
+
+    def is_eval(self, episode):
+        return bool(self.eval_every) and (episode + 1) % self.eval_every == 0
+
+    def begin_episode(self, episode):
+        """Set the simulation mode for `episode` (0-based); returns True for an evaluation episode."""
+        self.evaluating = self.is_eval(episode)
+        if self.fast:
+            self.robot.simulationSetMode(self.robot.SIMULATION_MODE_REAL_TIME if self.evaluating
+                                         else self.robot.SIMULATION_MODE_FAST)
+        self._start = (self.robot.getTime(), time.perf_counter())
+        return self.evaluating
+
+    def end_episode(self):
+        if self._start is None:
+            return
+        sim_start, wall_start = self._start
+        clock = self.clocks["eval" if self.evaluating else "train"]
+        clock.episodes += 1
+        clock.sim_s += self.robot.getTime() - sim_start
+        clock.wall_s += time.perf_counter() - wall_start
+        self._start = None
+
+    def restore(self):
+        """Back to real time, e.g. when training ends."""
+        self.evaluating = False
+        if self.fast:
+            self.robot.simulationSetMode(self.robot.SIMULATION_MODE_REAL_TIME)
+
+    def report(self):
+        train, evaluation = self.clocks["train"], self.clocks["eval"]
+        text = (f"training {train.sim_s:.1f} sim s in {train.wall_s:.1f} wall s "
+                f"({train.rate:.1f} sim s/wall s, {train.episodes} episodes)")
+        if evaluation.episodes:
+            text += (f", evaluation {evaluation.rate:.1f} sim s/wall s ({evaluation.episodes} episodes)")
+            if evaluation.rate > 0:
+                text += f", speedup {train.rate / evaluation.rate:.1f}x"
+        return text
@@ -0,0 +1,196 @@
+"""
+Binary transition logs and offline batch Q-iteration.
+
+A log is a 16-byte header followed by fixed-size little-endian records:
+
+    header  b"TRL1", uint16 state_dim, uint16 n_actions, 8 bytes reserved
+    record  int16 state[state_dim], int16 action, float32 reward,
+            int16 next_state[state_dim], uint8 done
+
+TransitionRecorder appends records during a run (buffered, flushed per
+episode). load_transitions() memory-maps any number of logs and stacks
+them into flat arrays, and batch_q_iteration() runs vectorized sweeps of
+Q(s, a) <- mean over logged (s, a) of r + gamma * (1 - done) * max Q(s', .)
+over all of them. With a tabular Q this is fitted-Q iteration on the
+empirical model, so every logged run counts, not just the current one.
+"""
+
+import glob
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"TRL1"
+HEADER = struct.Struct("<4sHH8x")
+
+
+def record_dtype(state_dim):
+    return np.dtype([
+        ("state", "<i2", (state_dim,)),
+        ("action", "<i2"),
+        ("reward", "<f4"),
+        ("next_state", "<i2", (state_dim,)),
+        ("done", "u1"),
+    ])
+
+
+class TransitionRecorder:
+    """Appends (state, action, reward, next_state, done) records to one log file."""
+
+    def __init__(self, path, state_dim, n_actions, buffer_size=256):
+        self.path = path
+        self.dtype = record_dtype(state_dim)
+        self.buffer = np.zeros(buffer_size, dtype=self.dtype)
+        self.pending = 0
+        self.written = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not fresh:
+            _check_header(path, state_dim, n_actions)
+        self._file = open(path, "ab")
+        if fresh:
+            self._file.write(HEADER.pack(MAGIC, state_dim, n_actions))
+
+    def append(self, state, action, reward, next_state, done):
+        record = self.buffer[self.pending]
+        record["state"] = state
+        record["action"] = action
+        record["reward"] = reward
+        record["next_state"] = next_state
+        record["done"] = done
+        self.pending += 1
+        if self.pending == len(self.buffer):
+            self.flush()
+
+    @property
+    def count(self):
+        """Records appended so far; the next append gets this index."""
+        return self.written + self.pending
+
+    def amend_reward(self, index, delta):
+        """Add `delta` to the reward of record `index` (e.g. late human feedback)."""
+        if index >= self.written:
+            self.buffer[index - self.written]["reward"] += delta
+            return
+        offset = HEADER.size + index * self.dtype.itemsize + self.dtype.fields["reward"][1]
+        with open(self.path, "r+b") as f:
+            f.seek(offset)
+            reward = np.frombuffer(f.read(4), dtype="<f4")[0]
+            f.seek(offset)
+            f.write(np.array([reward + delta], dtype="<f4").tobytes())
+
+    def flush(self):
+        if self.pending:
+            self._file.write(self.buffer[:self.pending].tobytes())
+            self.written += self.pending
+            self.pending = 0
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def _check_header(path, state_dim=None, n_actions=None):
+    with open(path, "rb") as f:
+        magic, file_state_dim, file_actions = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a transition log")
+    if (state_dim is not None and state_dim != file_state_dim) or \
+            (n_actions is not None and n_actions != file_actions):
+        raise ValueError(f"{path} holds state_dim={file_state_dim}, n_actions={file_actions}; "
+                         f"expected {state_dim}, {n_actions}")
+    return file_state_dim, file_actions
+
+
+def open_log(path):
+    """Memory-mapped records of one log, plus its n_actions."""
+    state_dim, n_actions = _check_header(path)
+    dtype = record_dtype(state_dim)
+    count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype), n_actions
+    # A run that was killed mid-write leaves a partial record; shape= ignores it
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,)), n_actions
+
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.trl")
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    return paths
+
+
+def load_transitions(paths):
+    """Stack every log into flat arrays: (states, actions, rewards, next_states, dones, n_actions)."""
+    logs = [open_log(path) for path in paths]
+    if not logs:
+        raise ValueError("No transition logs given")
+    dims = {log.dtype["state"].shape for log, _ in logs}
+    actions = {n for _, n in logs}
+    if len(dims) != 1 or len(actions) != 1:
+        raise ValueError(f"Logs disagree on state shape {dims} or action count {actions}")
+    records = np.concatenate([log for log, _ in logs])
+    return (records["state"], records["action"].astype(np.int64), records["reward"].astype(np.float64),
+            records["next_state"], records["done"].astype(bool), actions.pop())
+
+
+def batch_q_iteration(states, actions, rewards, next_states, dones, n_actions, gamma,
+                      iterations=500, tolerance=1e-6, initial=None):
+    """Fitted-Q iteration with a tabular Q over logged transitions.
+
+    Returns (q_table, sweeps, last_change). `initial` is an existing
+    q_table dict; its values seed the sweep and survive for state-action
+    pairs the logs never visit.
+    """
+    # Dense ids for every state that occurs as a state or a successor; rows are
+    # packed into one integer first because np.unique(axis=0) is much slower
+    rows = np.concatenate([states, next_states]).astype(np.int64)
+    low = rows.min(axis=0)
+    packed = np.ravel_multi_index((rows - low).T, tuple(rows.max(axis=0) - low + 1))
+    unique_packed, inverse = np.unique(packed, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    all_states = np.column_stack(np.unravel_index(unique_packed, tuple(rows.max(axis=0) - low + 1))) + low
+    n = len(states)
+    n_states = len(all_states)
+    pair = inverse[:n] * n_actions + actions
+    n_pairs = n_states * n_actions
+    visits = np.bincount(pair, minlength=n_pairs)
+    visited = visits > 0
+    reward_mean = np.bincount(pair, rewards, minlength=n_pairs)[visited] / visits[visited]
+
+    # Sweeps only need how often each (s, a) led to each (s', done): collapse
+    # the log into those outcome counts once instead of rescanning every record
+    outcome = (pair * n_states + inverse[n:]) * 2 + dones
+    outcome, weight = np.unique(outcome, return_counts=True)
+    outcome_pair = outcome // (2 * n_states)
+    outcome_next = (outcome // 2) % n_states
+    weight = np.where(outcome % 2 == 1, 0, weight)   # terminal outcomes do not bootstrap
+
+    keys = [tuple(int(v) for v in row) for row in all_states]
+    q = np.zeros((len(all_states), n_actions))
+    if initial:
+        for i, key in enumerate(keys):
+            if key in initial:
+                q[i] = initial[key]
+
+    change = 0.0
+    sweep = 0
+    for sweep in range(1, iterations + 1):
+        bootstrap = weight * q.max(axis=1)[outcome_next]
+        target = np.bincount(outcome_pair, bootstrap, minlength=n_pairs)[visited] / visits[visited]
+        flat = q.reshape(-1)
+        updated = reward_mean + gamma * target
+        change = float(np.abs(updated - flat[visited]).max()) if len(updated) else 0.0
+        flat[visited] = updated
+        if change < tolerance:
+            break
+
+    q_table = dict(initial) if initial else {}
+    q_table.update({key: [float(v) for v in q[i]] for i, key in enumerate(keys)})
+    return q_table, sweep, change
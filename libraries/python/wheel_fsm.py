@@ -0,0 +1,407 @@
+"""
+Table-driven finite state machine for two-wheeled controllers.
+
+A controller describes its behavior as a table:
+
+    TABLE = {
+        "sensors": ["ps0"],
+        "initial": "forward",
+        "states": {
+            "forward":   {"speed": (6.0, 6.0)},
+            "turn_left": {"speed": (-6.0, 6.0), "duration": 0.5, "next": "forward"},
+        },
+        "transitions": [
+            {"from": "forward", "to": "turn_left",
+             "when": {"sensor": "ps0", "above": 80.0}, "do": {"inc": "stuck"}},
+        ],
+        "global": [
+            {"from": "*", "except": ["turn_left"], "to": "turn_left",
+             "when": {"counter": "stuck", "at_least": 2}, "do": {"reset": "stuck"}},
+        ],
+    }
+
+Guards ("when") are conjunctions of:
+    after: seconds        time spent in the current state
+    sensor: name | [names], above | below: threshold, mode: "any" | "all"
+    counter: name, at_least: n and/or even: True
+Effects ("do"): inc / reset a named counter.
+
+compile_table() turns the table into NumPy arrays indexed by state and
+transition number. Every step the FSM reads the guarded sensors once, writes
+wheel speeds only when the state changes, then evaluates the current state's
+transitions followed by the global ones (each pass fires at most one
+transition, in table order). Transitions are recorded in a fixed-size trace.
+"""
+
+from operator import itemgetter
+
+import numpy as np
+
+
+class CompiledFSM:
+    """Array form of a wheel FSM table."""
+
+    def __init__(self, state_names, sensor_names, counter_names, initial, speeds, transitions):
+        self.state_names = state_names
+        self.state_index = {name: i for i, name in enumerate(state_names)}
+        self.sensor_names = sensor_names
+        self.counter_names = counter_names
+        self.initial = initial
+        self.speeds = speeds
+        t = transitions
+        n_sensors = len(sensor_names)
+        self.tr_from = np.array([r["from"] for r in t], dtype=np.int32)
+        self.tr_to = np.array([r["to"] for r in t], dtype=np.int32)
+        self.tr_pass = np.array([r["pass"] for r in t], dtype=np.int8)
+        self.tr_min_time = np.array([r["min_time"] for r in t], dtype=np.float64)
+        self.tr_sensor_mask = np.zeros((len(t), n_sensors), dtype=bool)
+        for k, r in enumerate(t):
+            self.tr_sensor_mask[k, list(r["sensors"])] = True
+        self.tr_sign = np.array([r["sign"] for r in t], dtype=np.int8)
+        self.tr_threshold = np.array([r["threshold"] for r in t], dtype=np.float64)
+        self.tr_all = np.array([r["all"] for r in t], dtype=bool)
+        self.tr_counter = np.array([r["counter"] for r in t], dtype=np.int32)
+        self.tr_counter_min = np.array([r["counter_min"] for r in t], dtype=np.float64)
+        self.tr_counter_even = np.array([r["counter_even"] for r in t], dtype=bool)
+        self.tr_inc = np.array([r["inc"] for r in t], dtype=np.int32)
+        self.tr_reset = np.array([r["reset"] for r in t], dtype=np.int32)
+
+        # Per (pass, state) transition index lists for the single-robot path
+        self.by_state = [[[], []] for _ in state_names]
+        for k, r in enumerate(t):
+            self.by_state[r["from"]][r["pass"]].append(k)
+
+
+def _compile_transition(row, src, state_index, sensor_index, counter_index, pass_no):
+    when = row.get("when", {})
+    effects = row.get("do", {})
+    sensors = when.get("sensor", [])
+    if isinstance(sensors, str):
+        sensors = [sensors]
+    if "above" in when:
+        sign, threshold = 1, float(when["above"])
+    elif "below" in when:
+        sign, threshold = -1, float(when["below"])
+    else:
+        sign, threshold = 0, 0.0
+    counter = when.get("counter")
+    return {
+        "from": src,
+        "to": state_index[row["to"]],
+        "pass": pass_no,
+        "min_time": float(when.get("after", 0.0)),
+        "sensors": tuple(sensor_index[s] for s in sensors) if sign else (),
+        "sign": sign,
+        "threshold": threshold,
+        "all": when.get("mode", "any") == "all",
+        "counter": counter_index[counter] if counter else -1,
+        "counter_min": float(when.get("at_least", -np.inf)),
+        "counter_even": bool(when.get("even", False)),
+        "inc": counter_index[effects["inc"]] if "inc" in effects else -1,
+        "reset": counter_index[effects["reset"]] if "reset" in effects else -1,
+    }
+
+
+def compile_table(table):
+    """Compile a declarative table (see module docstring) into a CompiledFSM."""
+    state_names = list(table["states"])
+    state_index = {name: i for i, name in enumerate(state_names)}
+    sensor_names = list(table.get("sensors", []))
+    sensor_index = {name: i for i, name in enumerate(sensor_names)}
+
+    counter_names = []
+    for row in table.get("transitions", []) + table.get("global", []):
+        for name in (row.get("when", {}).get("counter"), row.get("do", {}).get("inc"),
+                     row.get("do", {}).get("reset")):
+            if name and name not in counter_names:
+                counter_names.append(name)
+    counter_index = {name: i for i, name in enumerate(counter_names)}
+
+    speeds = np.array([table["states"][name]["speed"] for name in state_names], dtype=np.float64)
+
+    transitions = []
+    # Timed states: "duration" + "next" is shorthand for an "after" transition
+    for name in state_names:
+        spec = table["states"][name]
+        if "duration" in spec:
+            row = {"to": spec["next"], "when": {"after": spec["duration"]}}
+            transitions.append(_compile_transition(row, state_index[name], state_index,
+                                                   sensor_index, counter_index, 0))
+    for pass_no, key in ((0, "transitions"), (1, "global")):
+        for row in table.get(key, []):
+            sources = row["from"]
+            if sources == "*":
+                sources = state_names
+            elif isinstance(sources, str):
+                sources = [sources]
+            excluded = set(row.get("except", []))
+            for src in sources:
+                if src in excluded:
+                    continue
+                transitions.append(_compile_transition(row, state_index[src], state_index,
+                                                       sensor_index, counter_index, pass_no))
+    return CompiledFSM(state_names, sensor_names, counter_names,
+                       state_index[table["initial"]], speeds, transitions)
+
+
+def sequence_table(steps, sensors=None):
+    """Table for a timed cycle of (name, left_speed, right_speed, duration) steps.
+
+    Names may repeat (e.g. forward, turn, forward, reverse); repeats become
+    separate states so each knows its successor.
+    """
+    names = []
+    for name, *_ in steps:
+        count = sum(1 for n in names if n == name or n.startswith(name + "#"))
+        names.append(name if count == 0 else f"{name}#{count + 1}")
+    states = {}
+    for i, (name, left, right, duration) in enumerate(steps):
+        states[names[i]] = {"speed": (left, right), "duration": duration,
+                            "next": names[(i + 1) % len(names)]}
+    return {"sensors": sensors or [], "initial": names[0], "states": states}
+
+
+def _make_guard(fsm, k, slots):
+    """Specialize transition k into a predicate(values, time_in_state, counters).
+
+    values holds the sensors read this step; slots maps a sensor index to its
+    position in values.
+    """
+    min_time = float(fsm.tr_min_time[k])
+    sign = int(fsm.tr_sign[k])
+    threshold = float(fsm.tr_threshold[k])
+    all_mode = bool(fsm.tr_all[k])
+    counter = int(fsm.tr_counter[k])
+    counter_min = float(fsm.tr_counter_min[k])
+    counter_even = bool(fsm.tr_counter_even[k])
+    positions = [slots[i] for i in np.flatnonzero(fsm.tr_sensor_mask[k])]
+
+    checks = []
+    if min_time > 0.0:
+        checks.append(lambda v, t, c: t >= min_time)
+    if sign:
+        # any-above / all-below only depend on the max, all-above / any-below on the min
+        reduce = max if (sign > 0) != all_mode else min
+        if len(positions) == 1:
+            pos = positions[0]
+            pick = lambda v: v[pos]
+        elif positions == list(range(len(slots))):
+            pick = reduce
+        else:
+            getter = itemgetter(*positions)
+            pick = lambda v: reduce(getter(v))
+        if sign > 0:
+            checks.append(lambda v, t, c: pick(v) > threshold)
+        else:
+            checks.append(lambda v, t, c: pick(v) < threshold)
+    if counter >= 0:
+        if counter_min > -np.inf:
+            checks.append(lambda v, t, c: c[counter] >= counter_min)
+        if counter_even:
+            checks.append(lambda v, t, c: c[counter] % 2 == 0)
+
+    if not checks:
+        return lambda v, t, c: True
+    if len(checks) == 1:
+        return checks[0]
+    if len(checks) == 2:
+        a, b = checks
+        return lambda v, t, c: a(v, t, c) and b(v, t, c)
+    return lambda v, t, c: all(check(v, t, c) for check in checks)
+
+
+class WheelFSM:
+    """Runs a compiled table on one robot: batched sensor read, change-only wheel writes.
+
+    By default a step writes the current state's speeds before evaluating
+    transitions, so a new state takes effect on the next step (the timed
+    controllers). write_after=True applies it in the step its transition
+    fires, for purely reactive controllers.
+    """
+
+    def __init__(self, robot, table, timestep, left_motor="left wheel motor",
+                 right_motor="right wheel motor", trace_size=256, write_after=False):
+        self.fsm = fsm = table if isinstance(table, CompiledFSM) else compile_table(table)
+        self.timestep = timestep
+        self.dt = timestep / 1000.0
+        self.left = robot.getDevice(left_motor)
+        self.right = robot.getDevice(right_motor)
+        self.left.setPosition(float("inf"))
+        self.right.setPosition(float("inf"))
+        self.sensors = [robot.getDevice(name) for name in fsm.sensor_names]
+        for sensor in self.sensors:
+            sensor.enable(timestep)
+
+        # Sensors each state needs: those of its own guards, plus the global
+        # guards of every state it may move to within the step
+        n_states = len(fsm.state_names)
+        needed = []
+        for s in range(n_states):
+            rows = fsm.by_state[s][0] + fsm.by_state[s][1]
+            rows += [g for k in fsm.by_state[s][0] for g in fsm.by_state[int(fsm.tr_to[k])][1]]
+            used = fsm.tr_sensor_mask[rows].any(axis=0) if rows else np.zeros(len(self.sensors), bool)
+            needed.append(np.flatnonzero(used).tolist())
+        # _global_for[start][state]: global guards of `state`, specialized to the
+        # sensors read for the state the step began in
+        self._reads = []
+        self._local = []
+        self._global_for = []
+        for s in range(n_states):
+            slots = {i: pos for pos, i in enumerate(needed[s])}
+            self._reads.append([self.sensors[i].getValue for i in needed[s]])
+            self._local.append([self._row(k, slots) for k in fsm.by_state[s][0]])
+            reachable = [None] * n_states
+            for target in [s] + [int(fsm.tr_to[k]) for k in fsm.by_state[s][0]]:
+                if reachable[target] is None:
+                    reachable[target] = [self._row(g, slots) for g in fsm.by_state[target][1]]
+            self._global_for.append(reachable)
+
+        self._speeds = fsm.speeds.tolist()
+        self.state = fsm.initial
+        self.time_in_state = 0.0
+        self.counters = [0] * len(fsm.counter_names)
+        self.steps = 0
+        self._dirty = True
+        self.write_after = write_after
+        self.trace = np.zeros((trace_size, 3), dtype=np.int64)  # step, from, to
+        self.trace_count = 0
+
+    def _row(self, k, slots):
+        fsm = self.fsm
+        return (_make_guard(fsm, k, slots), int(fsm.tr_to[k]),
+                int(fsm.tr_inc[k]), int(fsm.tr_reset[k]))
+
+    @property
+    def state_name(self):
+        return self.fsm.state_names[self.state]
+
+    def _fire(self, row):
+        _, to, inc, reset = row
+        if inc >= 0:
+            self.counters[inc] += 1
+        if reset >= 0:
+            self.counters[reset] = 0
+        slot = self.trace_count % len(self.trace)
+        self.trace[slot] = (self.steps, self.state, to)
+        self.trace_count += 1
+        if to != self.state:
+            self._dirty = True
+        self.state = to
+        self.time_in_state = 0.0
+
+    def step(self):
+        """One control step (call after robot.step)."""
+        start = self.state
+        reads = self._reads[start]
+        values = [read() for read in reads] if reads else reads
+        self.steps += 1
+        self.time_in_state = t = self.time_in_state + self.dt
+        if self._dirty and not self.write_after:
+            self._write()
+        counters = self.counters
+        for row in self._local[start]:
+            if row[0](values, t, counters):
+                self._fire(row)
+                t = 0.0
+                break
+        global_rows = self._global_for[start][self.state]
+        if global_rows:
+            for row in global_rows:
+                if row[0](values, t, counters):
+                    self._fire(row)
+                    break
+        if self._dirty and self.write_after:
+            self._write()
+
+    def _write(self):
+        left, right = self._speeds[self.state]
+        self.left.setVelocity(left)
+        self.right.setVelocity(right)
+        self._dirty = False
+
+    def transitions(self):
+        """Recorded (step, from_name, to_name) transitions, oldest first."""
+        n = min(self.trace_count, len(self.trace))
+        start = self.trace_count - n
+        names = self.fsm.state_names
+        rows = [self.trace[(start + i) % len(self.trace)] for i in range(n)]
+        return [(int(step), names[a], names[b]) for step, a, b in rows]
+
+
+class BatchWheelFSM:
+    """Steps n copies of one table layout at once, e.g. one per parameter set.
+
+    compiled: list of CompiledFSM built from the same table with different
+    numbers (durations, thresholds, speeds). Sensor values are passed as an
+    (n, n_sensors) array in fsm.sensor_names order.
+    """
+
+    def __init__(self, compiled, timestep, write_after=False):
+        first = compiled[0]
+        for fsm in compiled[1:]:
+            if not (np.array_equal(fsm.tr_from, first.tr_from) and np.array_equal(fsm.tr_to, first.tr_to)
+                    and fsm.sensor_names == first.sensor_names):
+                raise ValueError("BatchWheelFSM needs tables with the same states and transitions")
+        self.fsm = first
+        self.n = len(compiled)
+        self.dt = timestep / 1000.0
+        self.write_after = write_after
+        self.speeds = np.stack([fsm.speeds for fsm in compiled])              # (n, S, 2)
+        self.min_time = np.stack([fsm.tr_min_time for fsm in compiled])       # (n, T)
+        self.threshold = np.stack([fsm.tr_threshold for fsm in compiled])     # (n, T)
+        self.counter_min = np.stack([fsm.tr_counter_min for fsm in compiled])  # (n, T)
+        self._counter_col = np.maximum(first.tr_counter, 0)
+        self._rows = np.arange(self.n)
+        self.reset()
+
+    def reset(self):
+        self.state = np.full(self.n, self.fsm.initial, dtype=np.int32)
+        self.time_in_state = np.zeros(self.n)
+        self.counters = np.zeros((self.n, max(len(self.fsm.counter_names), 1)), dtype=np.int64)
+        self.transition_counts = np.zeros(self.n, dtype=np.int64)
+
+    def _guards(self, values, pass_no):
+        fsm = self.fsm
+        ok = (fsm.tr_from[None, :] == self.state[:, None]) & (fsm.tr_pass == pass_no)[None, :]
+        ok &= self.time_in_state[:, None] >= self.min_time
+        if fsm.tr_sensor_mask.any():
+            above = values[:, None, :] > self.threshold[:, :, None]          # (n, T, K)
+            below = values[:, None, :] < self.threshold[:, :, None]
+            hit = np.where((fsm.tr_sign > 0)[None, :, None], above, below)
+            mask = fsm.tr_sensor_mask[None]
+            sensor_ok = np.where(fsm.tr_all[None, :], (hit | ~mask).all(-1), (hit & mask).any(-1))
+            ok &= np.where((fsm.tr_sign != 0)[None, :], sensor_ok, True)
+        if (fsm.tr_counter >= 0).any():
+            c = self.counters[:, self._counter_col]
+            counter_ok = (c >= self.counter_min) & ~(fsm.tr_counter_even[None, :] & (c % 2 == 1))
+            ok &= np.where((fsm.tr_counter >= 0)[None, :], counter_ok, True)
+        return ok
+
+    def _pass(self, values, pass_no):
+        ok = self._guards(values, pass_no)
+        fired = np.flatnonzero(ok.any(axis=1))
+        if len(fired) == 0:
+            return
+        k = ok[fired].argmax(axis=1)  # first satisfied transition, in table order
+        inc = self.fsm.tr_inc[k]
+        sel = inc >= 0
+        self.counters[fired[sel], inc[sel]] += 1
+        reset = self.fsm.tr_reset[k]
+        sel = reset >= 0
+        self.counters[fired[sel], reset[sel]] = 0
+        self.state[fired] = self.fsm.tr_to[k]
+        self.time_in_state[fired] = 0.0
+        self.transition_counts[fired] += 1
+
+    def step(self, values=None):
+        """Advance one step; returns (left, right) wheel speeds, each shape (n,)."""
+        if values is None:
+            values = np.zeros((self.n, len(self.fsm.sensor_names)))
+        self.time_in_state += self.dt
+        if not self.write_after:
+            out = self.speeds[self._rows, self.state]
+        self._pass(values, 0)
+        self._pass(values, 1)
+        if self.write_after:
+            out = self.speeds[self._rows, self.state]
+        return out[:, 0], out[:, 1]
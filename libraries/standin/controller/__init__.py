@@ -0,0 +1,24 @@
+"""
+Headless stand-in for the Webots `controller` package.
+
+Put libraries/standin first on sys.path (tools/run_headless.py does this)
+and `from controller import Robot, Supervisor, Motion, Keyboard` works
+without Webots, on a deterministic simulated clock (see world.py). It is a
+test and profiling double, not a simulator: actuators track their commands
+and sensors return scripted or synthetic readings.
+
+Do not add this directory to the path of a real Webots run; it would
+shadow the real package.
+"""
+
+from .devices import (Accelerometer, Camera, Device, DistanceSensor, Display, Emitter, Gyro,
+                      InertialUnit, Keyboard, Motor, PositionSensor, Receiver, TouchSensor)
+from .motion import Motion
+from .robot import Field, Node, Robot, Supervisor
+from .world import world
+
+__all__ = [
+    "Accelerometer", "Camera", "Device", "DistanceSensor", "Display", "Emitter", "Field", "Gyro",
+    "InertialUnit", "Keyboard", "Motion", "Motor", "Node", "PositionSensor", "Receiver", "Robot",
+    "Supervisor", "TouchSensor", "world",
+]
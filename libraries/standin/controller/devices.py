@@ -0,0 +1,434 @@
+"""
+Stand-in devices with the Webots method names the controllers use.
+
+Actuators keep their commanded state and move on each Robot.step(); sensors
+return scripted values from world.sensor_values or a plausible default.
+"""
+
+import math
+
+import numpy as np
+
+from .world import world
+
+# Resolution of the robots in this repository's worlds
+CAMERA_SIZES = {"camera": (52, 39), "CameraTop": (160, 120), "CameraBottom": (160, 120)}
+CAMERA_FOV = {"camera": 0.84, "CameraTop": 1.0, "CameraBottom": 1.0}
+DEFAULT_MAX_VELOCITY = 8.0     # rad/s for joints without a known limit
+WHEEL_MAX_VELOCITY = 6.28
+BLOB_FRAMES = 64               # synthetic camera frames per blob orbit
+BACKGROUND_RGB = (90, 110, 90)
+
+
+class Device:
+    def __init__(self, name):
+        self.name = name
+        self.sampling_period = 0
+
+    def getName(self):
+        return self.name
+
+    def getModel(self):
+        return "stand-in"
+
+    def enable(self, sampling_period):
+        self.sampling_period = int(sampling_period)
+
+    def disable(self):
+        self.sampling_period = 0
+
+    def getSamplingPeriod(self):
+        return self.sampling_period
+
+
+class Motor(Device):
+    """Position or velocity controlled joint; moves at up to its velocity each step."""
+
+    def __init__(self, name, robot, max_velocity=DEFAULT_MAX_VELOCITY):
+        super().__init__(name)
+        self.robot = robot
+        self.position = 0.0
+        self.target = 0.0
+        self.max_velocity = max_velocity
+        self.velocity = max_velocity
+        self.torque = None
+        self.sensor = None
+
+    def setPosition(self, position):
+        self.target = float(position)
+        self.robot._moving.add(self)
+
+    def getTargetPosition(self):
+        return self.target
+
+    def setVelocity(self, velocity):
+        self.velocity = float(velocity)
+        self.robot._moving.add(self)
+
+    def getVelocity(self):
+        return self.velocity
+
+    def getMaxVelocity(self):
+        return self.max_velocity
+
+    def setAvailableTorque(self, torque):
+        self.torque = torque
+
+    def setControlPID(self, p, i, d):
+        pass
+
+    def setAcceleration(self, acceleration):
+        pass
+
+    def getMinPosition(self):
+        return 0.0
+
+    def getMaxPosition(self):
+        return 0.0
+
+    def getPositionSensor(self):
+        return self.sensor
+
+    def _advance(self, dt):
+        """Returns False once the motor has settled."""
+        if math.isinf(self.target):
+            self.position += self.velocity * dt
+            return self.velocity != 0.0
+        error = self.target - self.position
+        limit = abs(self.velocity) * dt
+        if abs(error) <= limit:
+            self.position = self.target
+            return False
+        self.position += math.copysign(limit, error)
+        return True
+
+
+class PositionSensor(Device):
+    def __init__(self, name, motor=None):
+        super().__init__(name)
+        self.motor = motor
+
+    def getValue(self):
+        if self.name in world.sensor_values or self.motor is None:
+            return world.value(self.name, 0.0)
+        return self.motor.position
+
+
+class DistanceSensor(Device):
+    def getValue(self):
+        return world.value(self.name, 60.0)   # e-puck ambient reading
+
+    def getMaxValue(self):
+        return 4095.0
+
+    def getMinValue(self):
+        return 0.0
+
+
+class InertialUnit(Device):
+    def getRollPitchYaw(self):
+        return list(world.value(self.name, (0.0, 0.0, 0.0)))
+
+    def getQuaternion(self):
+        roll, pitch, yaw = self.getRollPitchYaw()
+        cr, sr = math.cos(roll / 2), math.sin(roll / 2)
+        cp, sp = math.cos(pitch / 2), math.sin(pitch / 2)
+        cy, sy = math.cos(yaw / 2), math.sin(yaw / 2)
+        return [sr * cp * cy - cr * sp * sy, cr * sp * cy + sr * cp * sy,
+                cr * cp * sy - sr * sp * cy, cr * cp * cy + sr * sp * sy]
+
+
+class Accelerometer(Device):
+    def getValues(self):
+        return list(world.value(self.name, (0.0, 0.0, 9.81)))
+
+
+class Gyro(Device):
+    def getValues(self):
+        return list(world.value(self.name, (0.0, 0.0, 0.0)))
+
+
+class TouchSensor(Device):
+    """Bumpers read 0/1; force-3d sensors (NAO foot FSRs) report half the body weight."""
+
+    BUMPER = 0
+    FORCE = 1
+    FORCE3D = 2
+
+    def getType(self):
+        return self.FORCE3D if "Fsr" in self.name else self.BUMPER
+
+    def getValue(self):
+        values = self.getValues()
+        return values[2] if self.getType() == self.FORCE3D else values[0]
+
+    def getValues(self):
+        default = (0.0, 0.0, 26.5) if self.getType() == self.FORCE3D else (0.0, 0.0, 0.0)
+        value = world.value(self.name, default)
+        return list(value) if isinstance(value, (list, tuple)) else [value, 0.0, 0.0]
+
+
+class Camera(Device):
+    """Renders a synthetic target blob orbiting the view (world.blob_color), or world.camera_source."""
+
+    _cache = {}
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.width, self.height = world.camera_size.get(name, CAMERA_SIZES.get(name, (160, 120)))
+        self.fov = CAMERA_FOV.get(name, 1.0)
+
+    def getWidth(self):
+        return self.width
+
+    def getHeight(self):
+        return self.height
+
+    def getFov(self):
+        return self.fov
+
+    def getImage(self):
+        if not self.sampling_period:
+            return None
+        if world.camera_source is not None:
+            return world.camera_source(self, world.time_ms)
+        index = (world.time_ms * BLOB_FRAMES // 4000) % BLOB_FRAMES
+        key = (self.width, self.height, tuple(world.blob_color) if world.blob_color else None, index)
+        frame = self._cache.get(key)
+        if frame is None:
+            frame = self._render(index)
+            self._cache[key] = frame
+        return frame
+
+    def getImageArray(self):
+        image = self.getImage()
+        if image is None:
+            return None
+        bgra = np.frombuffer(image, np.uint8).reshape(self.height, self.width, 4)
+        return bgra[:, :, 2::-1].transpose(1, 0, 2).tolist()
+
+    def _render(self, index):
+        frame = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        frame[:] = (BACKGROUND_RGB[2], BACKGROUND_RGB[1], BACKGROUND_RGB[0], 255)
+        if world.blob_color:
+            phase = index / BLOB_FRAMES * 2.0 * math.pi
+            cx = self.width / 2.0 + 0.35 * self.width * math.sin(phase)
+            cy = self.height / 2.0 + 0.2 * self.height * math.sin(2.0 * phase)
+            radius = max(2.0, 0.1 * self.width)
+            ys, xs = np.ogrid[:self.height, :self.width]
+            inside = (xs - cx) ** 2 + (ys - cy) ** 2 <= radius ** 2
+            r, g, b = world.blob_color
+            frame[inside] = (b, g, r, 255)
+        return frame.tobytes()
+
+    def saveImage(self, filename, quality):
+        return 0
+
+    @staticmethod
+    def imageGetRed(image, width, x, y):
+        return image[(y * width + x) * 4 + 2]
+
+    @staticmethod
+    def imageGetGreen(image, width, x, y):
+        return image[(y * width + x) * 4 + 1]
+
+    @staticmethod
+    def imageGetBlue(image, width, x, y):
+        return image[(y * width + x) * 4]
+
+    @staticmethod
+    def imageGetGray(image, width, x, y):
+        i = (y * width + x) * 4
+        return (image[i] + image[i + 1] + image[i + 2]) // 3
+
+
+class Keyboard(Device):
+    """Delivers world.keys = [(time_ms, key), ...] once each, in time order."""
+
+    END = 312
+    HOME = 313
+    LEFT = 314
+    UP = 315
+    RIGHT = 316
+    DOWN = 317
+    PAGEUP = 366
+    PAGEDOWN = 367
+    NUMPAD_HOME = 375
+    NUMPAD_LEFT = 376
+    NUMPAD_UP = 377
+    NUMPAD_RIGHT = 378
+    NUMPAD_DOWN = 379
+    NUMPAD_END = 382
+    KEY = 0xFFFF
+    SHIFT = 0x2000000
+    CONTROL = 0x4000000
+    ALT = 0x8000000
+
+    def __init__(self, name="keyboard"):
+        super().__init__(name)
+        self._next = 0
+
+    def getKey(self):
+        if not self.sampling_period:
+            return -1
+        keys = sorted(world.keys)
+        if self._next < len(keys) and keys[self._next][0] <= world.time_ms:
+            self._next += 1
+            return keys[self._next - 1][1]
+        return -1
+
+
+class Display(Device):
+    """Accepts drawing calls and counts them (nothing is rasterized)."""
+
+    RGB = 3
+    RGBA = 4
+    ARGB = 5
+    BGRA = 6
+    ABGR = 7
+
+    def __init__(self, name, width=320, height=240):
+        super().__init__(name)
+        self.width = width
+        self.height = height
+        self.calls = 0
+        self.color = 0xFFFFFF
+
+    def getWidth(self):
+        return self.width
+
+    def getHeight(self):
+        return self.height
+
+    def setColor(self, color):
+        self.color = color
+        self.calls += 1
+
+    def _draw(self, *args):
+        self.calls += 1
+
+    setAlpha = setOpacity = setFont = attachCamera = detachCamera = _draw
+    drawPixel = drawLine = drawRectangle = fillRectangle = drawOval = fillOval = _draw
+    drawPolygon = fillPolygon = drawText = imagePaste = imageDelete = imageSave = _draw
+
+    def imageNew(self, data, format, width=None, height=None):
+        self.calls += 1
+        return object()
+
+    def imageCopy(self, x, y, width, height):
+        self.calls += 1
+        return object()
+
+
+class Emitter(Device):
+    """Queues packets on world.bus for delivery on the next step."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.channel = 0
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        world.bus.append((world.time_ms + world.basic_time_step, self.channel, bytes(data)))
+        return 1
+
+    def setChannel(self, channel):
+        self.channel = channel
+
+    def getChannel(self):
+        return self.channel
+
+    def setRange(self, range):
+        pass
+
+    def getBufferSize(self):
+        return -1
+
+
+class Receiver(Device):
+    CHANNEL_BROADCAST = -1
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.channel = 0
+        self.queue = []
+
+    def _deliver(self, channel, data):
+        if self.sampling_period and (self.channel == self.CHANNEL_BROADCAST or self.channel == channel):
+            self.queue.append(data)
+
+    def getQueueLength(self):
+        return len(self.queue)
+
+    def getData(self):
+        return self.queue[0] if self.queue else None
+
+    def getBytes(self):
+        return self.getData()
+
+    def getString(self):
+        return self.queue[0].decode("utf-8") if self.queue else None
+
+    def getDataSize(self):
+        return len(self.queue[0]) if self.queue else -1
+
+    def nextPacket(self):
+        if self.queue:
+            self.queue.pop(0)
+
+    def getSignalStrength(self):
+        return 1.0
+
+    def getEmitterDirection(self):
+        return [1.0, 0.0, 0.0]
+
+    def setChannel(self, channel):
+        self.channel = channel
+
+    def getChannel(self):
+        return self.channel
+
+
+# Device type by name, first match wins; anything else is reported missing (None)
+DEVICE_PATTERNS = [
+    (lambda n: n == "camera" or n.startswith("Camera"), Camera),
+    (lambda n: n.startswith("ps") and n[2:].isdigit(), DistanceSensor),
+    (lambda n: n == "inertial unit", InertialUnit),
+    (lambda n: n == "accelerometer", Accelerometer),
+    (lambda n: n == "gyro", Gyro),
+    (lambda n: "Fsr" in n or "Bumper" in n, TouchSensor),
+    (lambda n: n == "keyboard", Keyboard),
+    (lambda n: n.lower() == "display", Display),
+    (lambda n: n.lower() == "emitter", Emitter),
+    (lambda n: n.lower() == "receiver", Receiver),
+    (lambda n: n.endswith(" sensor"), PositionSensor),
+    (lambda n: n.endswith(" motor"), Motor),
+]
+
+NAO_JOINTS = {
+    "HeadYaw", "HeadPitch",
+    "LShoulderPitch", "LShoulderRoll", "LElbowYaw", "LElbowRoll", "LWristYaw",
+    "RShoulderPitch", "RShoulderRoll", "RElbowYaw", "RElbowRoll", "RWristYaw",
+    "LHipYawPitch", "LHipRoll", "LHipPitch", "LKneePitch", "LAnklePitch", "LAnkleRoll",
+    "RHipYawPitch", "RHipRoll", "RHipPitch", "RKneePitch", "RAnklePitch", "RAnkleRoll",
+    "LPhalanx1", "RPhalanx1",
+}
+
+
+def create_device(robot, name):
+    """Build the stand-in device for `name`, or None if this robot would not have it."""
+    if name in world.missing_devices:
+        return None
+    if name in NAO_JOINTS:
+        return Motor(name, robot)
+    if name.endswith("S") and name[:-1] in NAO_JOINTS:
+        return PositionSensor(name, robot.getDevice(name[:-1]))
+    for matches, kind in DEVICE_PATTERNS:
+        if matches(name):
+            if kind is Motor:
+                return Motor(name, robot, WHEEL_MAX_VELOCITY)
+            if kind is PositionSensor:
+                return PositionSensor(name, robot.getDevice(name[:-len(" sensor")] + " motor"))
+            return kind(name)
+    return None
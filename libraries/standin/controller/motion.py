@@ -0,0 +1,91 @@
+"""Stand-in for Webots' Motion: plays a .motion file onto the robot's joints."""
+
+from .world import world
+
+
+def _parse_time(text):
+    minutes, seconds, millis = (int(part) for part in text.split(":"))
+    return (minutes * 60 + seconds) * 1000 + millis
+
+
+class Motion:
+    def __init__(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            header = f.readline().strip().split(",")
+            if not header or not header[0].startswith("#WEBOTS_MOTION"):
+                raise ValueError(f"Not a Webots motion file: {path}")
+            self.joint_names = header[2:]
+            self.times = []
+            self.poses = []
+            previous = [None] * len(self.joint_names)
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                fields = line.split(",")
+                self.times.append(_parse_time(fields[0]))
+                row = [previous[j] if v.strip() == "*" else float(v) for j, v in enumerate(fields[2:])]
+                self.poses.append(row)
+                previous = row
+        self.duration = self.times[-1] if self.times else 0
+        self.time = 0
+        self.playing = False
+        self.loop = False
+        self.reverse = False
+        self.motors = None
+
+    def play(self):
+        robot = world.robot
+        if self.motors is None:
+            self.motors = [robot.getDevice(name) for name in self.joint_names]
+        if self.isOver():
+            self.time = 0
+        self.playing = True
+        if self not in robot._motions:
+            robot._motions.append(self)
+
+    def stop(self):
+        self.playing = False
+        if world.robot and self in world.robot._motions:
+            world.robot._motions.remove(self)
+
+    def isOver(self):
+        return not self.loop and self.time >= self.duration
+
+    def getDuration(self):
+        return self.duration
+
+    def getTime(self):
+        return self.time
+
+    def setTime(self, time_ms):
+        self.time = max(0, min(int(time_ms), self.duration))
+
+    def setLoop(self, loop):
+        self.loop = bool(loop)
+
+    def setReverse(self, reverse):
+        self.reverse = bool(reverse)
+
+    def _advance(self, duration):
+        self.time += duration
+        if self.time >= self.duration:
+            if self.loop and self.duration:
+                self.time %= self.duration
+            else:
+                self.time = self.duration
+                self.playing = False
+                world.robot._motions.remove(self)
+        t = self.duration - self.time if self.reverse else self.time
+        k = 0
+        while k + 1 < len(self.times) and self.times[k + 1] <= t:
+            k += 1
+        pose = self.poses[k]
+        if k + 1 < len(self.times):
+            span = self.times[k + 1] - self.times[k]
+            w = (t - self.times[k]) / span if span else 0.0
+            pose = [a if b is None or a is None else a + (b - a) * w
+                    for a, b in zip(pose, self.poses[k + 1])]
+        for motor, value in zip(self.motors, pose):
+            if motor is not None and value is not None:
+                motor.setPosition(value)
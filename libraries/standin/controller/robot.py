@@ -0,0 +1,208 @@
+"""Stand-in Robot and Supervisor with scene nodes and fields."""
+
+import math
+
+from .devices import Keyboard, Receiver, create_device
+from .world import world
+
+
+class Robot:
+    """Owns the devices and advances world time in step()."""
+
+    def __init__(self):
+        self._devices = {}
+        self._moving = set()
+        self._motions = []
+        self._receivers = []
+        self._custom_data = ""
+        self.keyboard = Keyboard()
+        world.robot = self
+
+    def getDevice(self, name):
+        if name not in self._devices:
+            device = create_device(self, name)
+            if isinstance(device, Receiver):
+                self._receivers.append(device)
+            if name == "keyboard" and device is not None:
+                device = self.keyboard
+            self._devices[name] = device
+        return self._devices[name]
+
+    def getNumberOfDevices(self):
+        return sum(1 for device in self._devices.values() if device is not None)
+
+    def getBasicTimeStep(self):
+        return float(world.basic_time_step)
+
+    def getTime(self):
+        return world.time_ms / 1000.0
+
+    def getName(self):
+        return world.robot_name
+
+    def getCustomData(self):
+        return self._custom_data
+
+    def setCustomData(self, data):
+        self._custom_data = data
+
+    def getSupervisor(self):
+        return isinstance(self, Supervisor)
+
+    def step(self, duration=None):
+        """Advance the clock; -1 once world.max_steps is reached or the run quit."""
+        if world.quit_status is not None:
+            return -1
+        if world.max_steps is not None and world.steps >= world.max_steps:
+            return -1
+        duration = int(duration or world.basic_time_step)
+        dt = duration / 1000.0
+        world.time_ms += duration
+        world.steps += 1
+
+        for motion in list(self._motions):
+            motion._advance(duration)
+        if self._moving:
+            self._moving = {motor for motor in self._moving if motor._advance(dt)}
+        if world.bus:
+            due = [packet for packet in world.bus if packet[0] <= world.time_ms]
+            world.bus = [packet for packet in world.bus if packet[0] > world.time_ms]
+            for _, channel, data in due:
+                for receiver in self._receivers:
+                    receiver._deliver(channel, data)
+        return 0
+
+    def stepBegin(self, duration=None):
+        return self.step(duration)
+
+    def stepEnd(self):
+        return 0
+
+
+class Field:
+    def __init__(self, node, name):
+        self.node = node
+        self.name = name
+
+    def _get(self):
+        return self.node.fields[self.name]
+
+    def _set(self, value):
+        self.node.fields[self.name] = value
+
+    def getSFVec3f(self):
+        return list(self._get())
+
+    def setSFVec3f(self, value):
+        self._set([float(v) for v in value])
+
+    def getSFRotation(self):
+        return list(self._get())
+
+    def setSFRotation(self, value):
+        self._set([float(v) for v in value])
+
+    def getSFFloat(self):
+        return float(self._get())
+
+    def setSFFloat(self, value):
+        self._set(float(value))
+
+    def getSFInt32(self):
+        return int(self._get())
+
+    def setSFInt32(self, value):
+        self._set(int(value))
+
+    def getSFBool(self):
+        return bool(self._get())
+
+    def setSFBool(self, value):
+        self._set(bool(value))
+
+    def getSFString(self):
+        return str(self._get())
+
+    def setSFString(self, value):
+        self._set(str(value))
+
+
+class Node:
+    def __init__(self, def_name, fields):
+        self.def_name = def_name
+        self.fields = fields
+        self.resets = 0
+        self.restarts = 0
+
+    def getDef(self):
+        return self.def_name
+
+    def getTypeName(self):
+        return "StandInNode"
+
+    def getField(self, name):
+        return Field(self, name) if name in self.fields else None
+
+    def getPosition(self):
+        return list(self.fields.get("translation", [0.0, 0.0, 0.0]))
+
+    def getOrientation(self):
+        x, y, z, angle = self.fields.get("rotation", [0.0, 0.0, 1.0, 0.0])
+        c, s, t = math.cos(angle), math.sin(angle), 1.0 - math.cos(angle)
+        return [t * x * x + c, t * x * y - s * z, t * x * z + s * y,
+                t * x * y + s * z, t * y * y + c, t * y * z - s * x,
+                t * x * z - s * y, t * y * z + s * x, t * z * z + c]
+
+    def getVelocity(self):
+        return list(self.fields.get("velocity", [0.0] * 6))
+
+    def setVelocity(self, velocity):
+        self.fields["velocity"] = list(velocity)
+
+    def resetPhysics(self):
+        self.resets += 1
+
+    def restartController(self):
+        self.restarts += 1
+
+    def remove(self):
+        world.defs.pop(self.def_name, None)
+
+
+class Supervisor(Robot):
+    SIMULATION_MODE_PAUSE = 0
+    SIMULATION_MODE_REAL_TIME = 1
+    SIMULATION_MODE_FAST = 2
+
+    def __init__(self):
+        super().__init__()
+        self._nodes = {}
+        self.mode = self.SIMULATION_MODE_REAL_TIME
+
+    def getFromDef(self, name):
+        if name not in world.defs:
+            return None
+        if name not in self._nodes:
+            self._nodes[name] = Node(name, world.defs[name])
+        return self._nodes[name]
+
+    def getSelf(self):
+        return self.getFromDef(world.self_def) if world.self_def else None
+
+    def simulationSetMode(self, mode):
+        self.mode = mode
+
+    def simulationGetMode(self):
+        return self.mode
+
+    def simulationResetPhysics(self):
+        pass
+
+    def simulationReset(self):
+        world.time_ms = 0
+
+    def simulationQuit(self, status):
+        world.quit_status = status
+
+    def worldReload(self):
+        world.quit_status = 0
@@ -0,0 +1,66 @@
+"""
+Configuration and simulated clock shared by every stand-in object.
+
+Everything a headless run can script lives on the module-level `world`:
+
+    from controller import world
+    world.configure(max_steps=5000, blob_color=(255, 0, 0))
+    world.keys = [(1000, ord("G"))]            # (time ms, key code)
+    world.sensor_values["ps0"] = lambda t: 200.0 if t > 3000 else 60.0
+
+Time only advances in Robot.step(), by whole milliseconds, so runs are
+deterministic.
+"""
+
+
+def _default_defs():
+    """Scene nodes for the repository worlds (Supervisor.getFromDef)."""
+    return {
+        "NAO": {"translation": [0.0, 0.0, 0.334], "rotation": [0.0, 0.0, 1.0, 0.0]},
+        "DUCK": {"translation": [0.6, 0.0, 0.03], "rotation": [0.0, 0.0, 1.0, 0.0]},
+        "EPUCK": {"translation": [-0.3, 0.0, 0.0], "rotation": [0.0, 0.0, 1.0, 0.0]},
+        "RED_BALL": {"translation": [0.35, 0.27, 0.0325], "rotation": [0.0, 0.0, 1.0, 0.0],
+                     "radius": 0.0325},
+        "BLUE_BALL": {"translation": [0.41, -0.35, 0.0325], "rotation": [0.0, 0.0, 1.0, 0.0],
+                      "radius": 0.0325},
+    }
+
+
+class StandInWorld:
+    """Deterministic clock plus the scripted inputs of a headless run."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.basic_time_step = 32
+        self.max_steps = None          # Robot.step() returns -1 after this many steps
+        self.robot_name = "robot"
+        self.self_def = "NAO"          # node returned by Supervisor.getSelf()
+        self.missing_devices = set()   # names getDevice() should report as absent
+        self.camera_size = {}          # camera name -> (width, height); see devices.CAMERA_SIZES
+        self.camera_source = None      # callable(camera, time_ms) -> BGRA bytes, or None
+        self.blob_color = (255, 220, 0)  # RGB of the synthetic target blob (yellow duck)
+        self.sensor_values = {}        # device name -> constant or callable(time_ms)
+        self.keys = []                 # (time_ms, key) pairs, delivered once each
+        self.defs = _default_defs()
+        self.time_ms = 0
+        self.steps = 0
+        self.robot = None
+        self.bus = []                  # (deliver_at_ms, channel, bytes) emitter packets
+        self.quit_status = None
+
+    def configure(self, **options):
+        for name, value in options.items():
+            if not hasattr(self, name):
+                raise AttributeError(f"Unknown stand-in world option: {name}")
+            setattr(self, name, value)
+        return self
+
+    def value(self, name, default):
+        """Scripted reading for a device, or `default`."""
+        source = self.sensor_values.get(name, default)
+        return source(self.time_ms) if callable(source) else source
+
+
+world = StandInWorld()
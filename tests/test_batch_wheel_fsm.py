@@ -0,0 +1,83 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "libraries", "standin"))
+sys.path.insert(0, os.path.join(ROOT, "libraries", "python"))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+from controller import Robot, world
+from epuck_param_search import SEARCHES, sample_parameters
+from wheel_fsm import BatchWheelFSM, WheelFSM, compile_table
+
+ROBOTS = 6
+STEPS = 1500
+TIMESTEP = 32
+
+
+def random_readings(rng, n_sensors):
+    """(ROBOTS, STEPS, n_sensors) readings: ambient noise broken by obstacle spells of 1..80 steps."""
+    readings = rng.uniform(40.0, 90.0, (ROBOTS, STEPS, n_sensors))
+    for robot in range(ROBOTS):
+        for sensor in range(n_sensors):
+            step = int(rng.integers(0, 80))
+            while step < STEPS:
+                length = int(rng.integers(1, 81))
+                readings[robot, step:step + length, sensor] = rng.uniform(0.0, 1200.0)
+                step += length + int(rng.integers(1, 160))
+    return readings
+
+
+def single_run(compiled, readings, write_after):
+    """State and wheel speeds of one WheelFSM on the stand-in robot, per step."""
+    world.reset()
+    world.configure(basic_time_step=TIMESTEP)
+    for k, name in enumerate(compiled.sensor_names):
+        # The FSM reads its sensors after robot.step, at time (step + 1) * TIMESTEP
+        world.sensor_values[name] = lambda t, r=readings[:, k]: float(r[t // TIMESTEP - 1])
+    robot = Robot()
+    fsm = WheelFSM(robot, compiled, TIMESTEP, write_after=write_after)
+    states, speeds = [], []
+    for _ in range(STEPS):
+        robot.step(TIMESTEP)
+        fsm.step()
+        states.append(fsm.state)
+        speeds.append((fsm.left.getVelocity(), fsm.right.getVelocity()))
+    return states, speeds, fsm.trace_count
+
+
+class BatchWheelFSMTest(unittest.TestCase):
+    """BatchWheelFSM matches WheelFSM state for state on random sensor sequences."""
+
+    def test_batch_matches_single(self):
+        for behavior, (builder, ranges, write_after) in SEARCHES.items():
+            for seed in range(2):
+                with self.subTest(behavior=behavior, seed=seed):
+                    rng = np.random.default_rng(seed)
+                    compiled = [compile_table(builder(**params))
+                                for params in sample_parameters(builder, ranges, ROBOTS, rng)]
+                    readings = random_readings(rng, len(compiled[0].sensor_names))
+
+                    batch = BatchWheelFSM(compiled, TIMESTEP, write_after=write_after)
+                    states, speeds = [], []
+                    for step in range(STEPS):
+                        left, right = batch.step(readings[:, step])
+                        states.append(batch.state.copy())
+                        speeds.append(np.stack([left, right], axis=1))
+                    states = np.array(states)
+                    speeds = np.array(speeds)
+
+                    for i in range(ROBOTS):
+                        single_states, single_speeds, transitions = single_run(
+                            compiled[i], readings[i], write_after)
+                        np.testing.assert_array_equal(states[:, i], single_states)
+                        np.testing.assert_array_equal(speeds[:, i], single_speeds)
+                        self.assertEqual(batch.transition_counts[i], transitions)
+                    # The sequences must move every robot through its table
+                    self.assertTrue((batch.transition_counts > 2).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "controllers", "NAO_Wave"))
+from head_tracker import AlphaBetaTracker, centroid_to_bearing, vertical_fov
+
+# NAO CameraBottom
+HFOV = 1.0472
+VFOV = vertical_fov(HFOV, 160, 120)
+
+
+class CenteredBottomCameraTest(unittest.TestCase):
+    def test_centered_centroid_keeps_head_pitch(self):
+        # Bottom camera is in use from a head pitch of about 0.6 down
+        head_yaw, head_pitch = 0.1, 0.8
+        tracker = AlphaBetaTracker()
+        for step in range(20):
+            now_ms = 16.0 * step
+            tracker.advance(now_ms)
+            if step % 4 == 0:
+                tracker.correct(now_ms, *centroid_to_bearing(0.0, 0.0, head_yaw, head_pitch, HFOV, VFOV))
+            self.assertFalse(tracker.lost)
+            self.assertTrue(math.isclose(tracker.pitch, head_pitch, abs_tol=1e-9))
+            self.assertTrue(math.isclose(tracker.yaw, head_yaw, abs_tol=1e-9))
+
+    def test_offset_centroid_moves_head_within_fov(self):
+        yaw, pitch = centroid_to_bearing(0.0, 1.0, 0.0, 0.8, HFOV, VFOV)
+        self.assertEqual(yaw, 0.0)
+        self.assertTrue(math.isclose(pitch, 0.8 + VFOV / 2.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import runpy
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "libraries", "standin"))
+from controller import Robot, world
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wheel_fsm_baseline")
+CONTROLLERS = ["Change_Direction", "Change_Direction_Added_State", "Change_State_Obs_Fix", "Detect_Stop"]
+STEPS = 3000
+TIMESTEP = 32
+
+
+def scripted_sensors(seed):
+    """ps0..ps7 readings: noise around the ambient level with obstacle spells of varying length."""
+    rng = np.random.default_rng(seed)
+    values = {}
+    for i in range(8):
+        # A new reading every step, an obstacle flag held for 4..64 steps at a time
+        noise = rng.uniform(40.0, 120.0, STEPS + 1)
+        spells = np.repeat(rng.random(STEPS // 4 + 1) < 0.3, rng.integers(4, 65, STEPS // 4 + 1))[:STEPS + 1]
+        spells = np.pad(spells, (0, max(0, STEPS + 1 - len(spells))))
+        readings = np.where(spells, noise + 100.0, noise - 40.0)
+        values[f"ps{i}"] = lambda t, r=readings: float(r[min(t // TIMESTEP, STEPS)])
+    return values
+
+
+def wheel_commands(script, sensors):
+    """(left, right) wheel velocity in force during each step of a run of `script`."""
+    world.reset()
+    world.configure(max_steps=STEPS, basic_time_step=TIMESTEP, sensor_values=sensors)
+    commands = []
+    step = Robot.step
+
+    def recording_step(self, duration=None):
+        if world.steps:
+            left = self.getDevice("left wheel motor")
+            right = self.getDevice("right wheel motor")
+            commands.append((left.getVelocity(), right.getVelocity()))
+        return step(self, duration)
+
+    Robot.step = recording_step
+    try:
+        runpy.run_path(script, run_name="__main__")
+    finally:
+        Robot.step = step
+    return commands
+
+
+class PortedControllersTest(unittest.TestCase):
+    """The wheel_fsm tables command the same wheel speeds as the loops they replaced."""
+
+    def test_tables_replay_the_old_loops(self):
+        for name in CONTROLLERS:
+            for seed in range(3):
+                with self.subTest(controller=name, seed=seed):
+                    sensors = scripted_sensors(seed)
+                    old = wheel_commands(os.path.join(BASELINE_DIR, f"{name}.py"), sensors)
+                    new = wheel_commands(os.path.join(ROOT, "controllers", name, f"{name}.py"), sensors)
+                    self.assertEqual(len(old), STEPS)
+                    self.assertEqual(old, new)
+
+    def test_obstacle_controllers_change_state(self):
+        # The scripted readings must actually exercise the sensor guards
+        for name in ("Change_State_Obs_Fix", "Detect_Stop"):
+            commands = wheel_commands(os.path.join(BASELINE_DIR, f"{name}.py"), scripted_sensors(0))
+            self.assertGreater(len(set(commands)), 1, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Score a running NAO_RL_Kick from another terminal.
+
+    python tools/coach.py            # interactive: type +3, -2, 5 ... and Enter
+    python tools/coach.py -- -4      # send one score and exit
+
+Scores go as UDP datagrams to the controller's feedback socket
+(FEEDBACK_PORT in NAO_RL_Kick.py) and are attributed to the action the
+robot was performing shortly before they arrive.
+"""
+
+import argparse
+import os
+import socket
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "libraries", "python"))
+from feedback_channel import DEFAULT_PORT, parse_scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scores", nargs="*", help="scores to send; interactive when omitted")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    target = (args.host, args.port)
+    if args.scores:
+        sock.sendto(" ".join(args.scores).encode("utf-8"), target)
+        return
+    print(f"Sending scores to {target[0]}:{target[1]}; Ctrl-D to quit")
+    for line in sys.stdin:
+        if parse_scores(line):
+            sock.sendto(line.encode("utf-8"), target)
+        elif line.strip():
+            print("  scores are numbers, e.g. +3 or -2")
+
+
+if __name__ == "__main__":
+    main()
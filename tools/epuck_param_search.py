@@ -0,0 +1,145 @@
+"""
+Offline parameter search for the e-puck wheel FSM controllers.
+
+Samples thousands of parameter sets for one behavior, runs each from several
+random start poses in the 2D surrogate (diff_drive_sim) with all robots
+stepped together, and ranks them by coverage, collisions and stuck time.
+The controller's current defaults are always evaluated first for reference.
+
+    python tools/epuck_param_search.py --behavior obs_fix --samples 4000 --seconds 120
+    python tools/epuck_param_search.py --behavior change_direction --box=0.2,0,0.1,0.3
+
+The surrogate ignores wheel slip, motor dynamics and sensor noise, so use
+the ranking to pick candidates, then confirm them in Webots.
+"""
+
+import argparse
+import inspect
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "libraries", "python"))
+from diff_drive_sim import Arena, DiffDriveSim
+from epuck_behaviors import (change_direction_added_state_table, change_direction_table,
+                             detect_stop_table, obstacle_turn_table)
+from wheel_fsm import BatchWheelFSM, compile_table
+
+# behavior -> (table builder, {parameter: (low, high)}, write_after)
+SEARCHES = {
+    "change_direction": (change_direction_table, {
+        "forward_time": (0.5, 6.0),
+        "turn_left_time": (0.1, 2.0),
+        "reverse_time": (0.0, 6.0),
+        "spin_time": (0.0, 8.0),
+    }, False),
+    "change_direction_added_state": (change_direction_added_state_table, {
+        "forward_time": (0.5, 6.0),
+        "turn_left_time": (0.1, 4.0),
+        "turn_right_time": (0.1, 4.0),
+    }, False),
+    "obs_fix": (obstacle_turn_table, {
+        "obstacle_threshold": (70.0, 600.0),
+        "min_turn_time": (0.1, 4.0),
+    }, False),
+    "detect_stop": (detect_stop_table, {
+        "obstacle_threshold": (70.0, 1000.0),
+    }, True),
+}
+
+COLLISION_WEIGHT = 0.05  # score lost per collision per simulated minute
+STUCK_WEIGHT = 0.5       # score lost per fraction of time stuck
+DEFAULT_WORLD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "worlds", "OBS_World.wbt")
+
+
+def sample_parameters(builder, ranges, samples, rng):
+    """Defaults first, then uniform samples inside the search ranges."""
+    defaults = {name: p.default for name, p in inspect.signature(builder).parameters.items()}
+    sets = [dict(defaults)]
+    for _ in range(samples - 1):
+        params = dict(defaults)
+        for name, (low, high) in ranges.items():
+            params[name] = float(rng.uniform(low, high))
+        sets.append(params)
+    return sets
+
+
+def evaluate(builder, parameter_sets, write_after, arena, seconds, starts, timestep, rng):
+    """Run every parameter set from `starts` random poses; returns per-set metrics."""
+    compiled = [compile_table(builder(**params)) for params in parameter_sets]
+    compiled = [fsm for fsm in compiled for _ in range(starts)]
+    fsm = BatchWheelFSM(compiled, timestep, write_after=write_after)
+    sim = DiffDriveSim(arena, len(compiled), timestep)
+    sim.reset(rng)
+    columns = [int(name[2:]) for name in fsm.fsm.sensor_names]
+
+    steps = int(seconds * 1000 / timestep)
+    for _ in range(steps):
+        values = sim.proximity(columns) if columns else None
+        left, right = fsm.step(values)
+        sim.step(left, right)
+
+    per_set = lambda a: np.asarray(a, dtype=np.float64).reshape(len(parameter_sets), starts).mean(axis=1)
+    minutes = seconds / 60.0
+    metrics = {
+        "coverage": per_set(sim.coverage()),
+        "collisions_per_min": per_set(sim.collisions) / minutes,
+        "stuck_fraction": per_set(sim.stuck_ms) / (seconds * 1000.0),
+        "distance": per_set(sim.distance),
+    }
+    metrics["score"] = (metrics["coverage"] - COLLISION_WEIGHT * metrics["collisions_per_min"]
+                        - STUCK_WEIGHT * metrics["stuck_fraction"])
+    return metrics
+
+
+def format_row(rank, params, metrics, i, names):
+    values = " ".join(f"{name}={params[name]:.2f}" for name in names)
+    return (f"{rank:>4} score={metrics['score'][i]:+.3f} coverage={metrics['coverage'][i]:.2f} "
+            f"collisions/min={metrics['collisions_per_min'][i]:.2f} "
+            f"stuck={metrics['stuck_fraction'][i]:.0%}  {values}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--behavior", choices=sorted(SEARCHES), default="obs_fix")
+    parser.add_argument("--samples", type=int, default=2000, help="parameter sets to evaluate")
+    parser.add_argument("--starts", type=int, default=4, help="random start poses per parameter set")
+    parser.add_argument("--seconds", type=float, default=120.0, help="simulated seconds per run")
+    parser.add_argument("--timestep", type=int, default=32)
+    parser.add_argument("--world", default=DEFAULT_WORLD, help="world file for the arena and boxes")
+    parser.add_argument("--box", action="append", default=[],
+                        help="extra obstacle --box=cx,cy,sx,sy in meters (repeatable)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    builder, ranges, write_after = SEARCHES[args.behavior]
+    boxes = [tuple(float(v) for v in spec.split(",")) for spec in args.box]
+    arena = Arena.from_wbt(args.world, extra_boxes=boxes)
+    rng = np.random.default_rng(args.seed)
+    parameter_sets = sample_parameters(builder, ranges, args.samples, rng)
+
+    robots = len(parameter_sets) * args.starts
+    print(f"{args.behavior}: {len(parameter_sets)} parameter sets x {args.starts} starts = {robots} robots, "
+          f"{args.seconds:.0f} s each, arena {arena.x_max - arena.x_min:.2f} x {arena.y_max - arena.y_min:.2f} m, "
+          f"{len(arena.boxes)} boxes")
+    start = time.perf_counter()
+    metrics = evaluate(builder, parameter_sets, write_after, arena, args.seconds, args.starts,
+                       args.timestep, rng)
+    wall = time.perf_counter() - start
+    print(f"Simulated {robots * args.seconds / 3600.0:.1f} robot-hours in {wall:.1f} s "
+          f"({robots * args.seconds / wall:.0f}x real time)")
+
+    names = list(ranges)
+    order = np.argsort(-metrics["score"])
+    print("Current defaults:")
+    print(format_row("-", parameter_sets[0], metrics, 0, names))
+    print(f"Top {args.top}:")
+    for rank, i in enumerate(order[:args.top], start=1):
+        print(format_row(rank, parameter_sets[i], metrics, i, names))
+
+
+if __name__ == "__main__":
+    main()
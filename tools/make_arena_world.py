@@ -0,0 +1,191 @@
+"""
+Tile N copies of a single-arena NAO world into one multi-arena world.
+
+    python tools/make_arena_world.py --arenas 4                      # worlds/bobby_x4.wbt
+    python tools/make_arena_world.py --arenas 9 --template worlds/bobby.wbt --gap 1.0
+
+Scene-wide nodes of the template (WorldInfo, Viewpoint, backgrounds and
+lights) are kept once. Every other top-level node is copied per arena on a
+grid, `gap` metres apart, with "_<i>" appended to its DEF name; the
+RectangleArena becomes DEF ARENA_<i>, so each copy keeps its own walls.
+Robots become agents: controller AGENT_CONTROLLER, no supervisor rights,
+robot name NAO_<i> and emitter/receiver channel i + 1.
+
+One bodiless supervisor, DEF TRAINER, is added with an emitter and a
+broadcast receiver. It runs the template's controller with
+["--arenas", "N"], which makes NAO_RL_Kick train all arenas in lockstep
+(see its ARENAS setting). To measure episodes per wall-clock hour against
+N, generate worlds for several N and compare the "episodes/h" the trainer
+prints.
+"""
+
+import argparse
+import math
+import os
+import re
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_TEMPLATE = os.path.join(ROOT, "worlds", "bobby.wbt")
+AGENT_CONTROLLER = "NAO_RL_Kick_Agent"
+SCENE_NODES = ("WorldInfo", "Viewpoint", "TexturedBackground", "TexturedBackgroundLight",
+               "Background", "DirectionalLight", "PointLight", "SpotLight", "Fog")
+NODE_START = re.compile(r"^(?:DEF\s+(\w+)\s+)?(\w+)\s*\{")
+
+
+def split_world(text):
+    """(header lines, [(def name or None, node type, node text)]) of a .wbt file's top level."""
+    header, nodes = [], []
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        match = NODE_START.match(lines[i])
+        if not match:
+            if not nodes:
+                header.append(lines[i])
+            i += 1
+            continue
+        depth, body = 0, []
+        while i < len(lines):
+            body.append(lines[i])
+            depth += lines[i].count("{") - lines[i].count("}")
+            i += 1
+            if depth <= 0:
+                break
+        nodes.append((match.group(1), match.group(2), "\n".join(body)))
+    return header, nodes
+
+
+def top_level_fields(node_text):
+    """Indices of the node's own field lines (not those of nested nodes)."""
+    depth, indices = 0, []
+    for k, line in enumerate(node_text.splitlines()):
+        if depth == 1 and line.strip() and not line.strip().startswith("}"):
+            indices.append(k)
+        depth += line.count("{") - line.count("}")
+    return indices
+
+
+def set_field(node_text, name, value):
+    """Replace (or add, before the closing brace) a top-level field."""
+    lines = node_text.splitlines()
+    for k in top_level_fields(node_text):
+        if re.match(rf"\s*{name}\s", lines[k]):
+            if value is None:
+                del lines[k]
+            else:
+                lines[k] = f"  {name} {value}"
+            return "\n".join(lines)
+    if value is not None:
+        lines.insert(len(lines) - 1, f"  {name} {value}")
+    return "\n".join(lines)
+
+
+def get_field(node_text, name):
+    lines = node_text.splitlines()
+    for k in top_level_fields(node_text):
+        match = re.match(rf"\s*{name}\s+(.*)$", lines[k])
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def floor_size(nodes):
+    for _, node_type, text in nodes:
+        if node_type == "RectangleArena":
+            size = get_field(text, "floorSize")
+            if size:
+                return tuple(float(v) for v in size.split()[:2])
+    return (1.0, 1.0)   # RectangleArena default
+
+
+def grid_offsets(n, spacing):
+    """Arena centres on a near-square grid around the origin (x right, y up)."""
+    columns = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / columns)
+    return [((i % columns - (columns - 1) / 2.0) * spacing[0],
+             ((rows - 1) / 2.0 - i // columns) * spacing[1]) for i in range(n)], max(columns, rows)
+
+
+def copy_node(def_name, node_type, text, index, offset):
+    """The template node `text` for arena `index`, shifted by `offset`."""
+    if node_type == "RectangleArena":
+        new_def = f"ARENA_{index}"
+    else:
+        new_def = f"{def_name}_{index}" if def_name else None
+    opening = f"DEF {new_def} {node_type} {{" if new_def else f"{node_type} {{"
+    text = NODE_START.sub(opening, text, count=1)
+
+    translation = get_field(text, "translation")
+    x, y, z = (float(v) for v in translation.split()) if translation else (0.0, 0.0, 0.0)
+    text = set_field(text, "translation", f"{x + offset[0]:g} {y + offset[1]:g} {z:g}")
+
+    if get_field(text, "controller") is not None:
+        text = set_field(text, "controller", f'"{AGENT_CONTROLLER}"')
+        text = set_field(text, "supervisor", None)
+        text = set_field(text, "channel", str(index + 1))
+        text = set_field(text, "name", f'"{def_name or node_type}_{index}"')
+    return text
+
+
+def trainer_node(controller, arenas):
+    return "\n".join([
+        "DEF TRAINER Robot {",
+        '  name "trainer"',
+        "  children [",
+        "    Emitter {",
+        "    }",
+        "    Receiver {",
+        "      channel -1",
+        "    }",
+        "  ]",
+        f'  controller "{controller}"',
+        "  controllerArgs [",
+        '    "--arenas"',
+        f'    "{arenas}"',
+        "  ]",
+        "  supervisor TRUE",
+        "}",
+    ])
+
+
+def make_world(template_text, arenas, gap=0.5):
+    header, nodes = split_world(template_text)
+    size = floor_size(nodes)
+    offsets, scale = grid_offsets(arenas, (size[0] + gap, size[1] + gap))
+    controller = next((get_field(text, "controller").strip('"') for _, _, text in nodes
+                       if get_field(text, "controller")), "NAO_RL_Kick")
+
+    out = list(header)
+    for def_name, node_type, text in nodes:
+        if node_type in SCENE_NODES:
+            if node_type == "Viewpoint" and get_field(text, "position"):
+                # Back off so the whole grid is in view
+                position = [float(v) * scale for v in get_field(text, "position").split()]
+                text = set_field(text, "position", " ".join(f"{v:g}" for v in position))
+            out.append(text)
+    for i, offset in enumerate(offsets):
+        for def_name, node_type, text in nodes:
+            if node_type not in SCENE_NODES:
+                out.append(copy_node(def_name, node_type, text, i, offset))
+    out.append(trainer_node(controller, arenas))
+    return "\n".join(out) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arenas", type=int, required=True, help="number of arenas")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="single-arena world")
+    parser.add_argument("--gap", type=float, default=0.5, help="m between neighbouring arenas")
+    parser.add_argument("--out", default=None, help="default: <template>_x<N>.wbt next to the template")
+    args = parser.parse_args()
+
+    with open(args.template, "r", encoding="utf-8") as f:
+        text = make_world(f.read(), args.arenas, args.gap)
+    out = args.out or f"{os.path.splitext(args.template)[0]}_x{args.arenas}.wbt"
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"Wrote {out}: {args.arenas} arenas")
+
+
+if __name__ == "__main__":
+    main()
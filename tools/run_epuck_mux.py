@@ -0,0 +1,151 @@
+"""
+Run the e-puck multiplexer, or benchmark it against one process per robot.
+
+Webots (e.g. worlds/balls_mux.wbt: e-pucks with controller "EPuck_Mux_Relay"):
+    python tools/run_epuck_mux.py --relays "e-puck" "e-puck(1)" "e-puck(2)" "e-puck(3)"
+
+Stand-in robots, no Webots needed:
+    python tools/run_epuck_mux.py --stand-in 32 --steps 3000
+    python tools/run_epuck_mux.py --bench 16 --steps 1000
+
+--bench runs N stand-in processes with one robot each (the way Webots runs
+EPuck_Red_Ball), then the multiplexer the way Webots runs it: N
+EPuck_Mux_Relay processes (on the stand-in controller package, see
+run_headless.py) plus one multiplexer process driving them. Peak memory and
+CPU are summed over every process of each setup, relays included, and
+reported per robot.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "libraries", "python"))
+from diff_drive_sim import Arena
+from epuck_mux import EpuckMultiplexer, SharedMemoryFleet, StandInFleet, process_usage
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORLD = os.path.join(TOOLS, "..", "worlds", "balls.wbt")
+RELAY = os.path.join(TOOLS, "..", "controllers", "EPuck_Mux_Relay", "EPuck_Mux_Relay.py")
+REPORT_PERIOD = 5.0  # seconds between console reports when driving Webots
+
+
+def run_relays(names, timestep, as_json=False):
+    fleet = SharedMemoryFleet(names, timestep)
+    mux = EpuckMultiplexer(fleet, timestep)
+    print(f"Driving {fleet.n} relays ({fleet.width}x{fleet.height} camera)")
+    last = time.monotonic()
+    try:
+        while mux.step():
+            if not as_json and time.monotonic() - last > REPORT_PERIOD:
+                print(mux.report())
+                last = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fleet.close()
+    if as_json:
+        print(json.dumps({"n": fleet.n, "steps": mux.steps, "control_s": mux.control_s}))
+    else:
+        print(mux.report())
+
+
+def run_stand_in(n, steps, timestep, seed, world):
+    """Run n stand-in robots in this process; prints one JSON line of usage."""
+    fleet = StandInFleet(n, Arena.from_wbt(world), timestep, seed=seed)
+    mux = EpuckMultiplexer(fleet, timestep)
+    mux.run(steps)
+    rss_mb, cpu_s = process_usage()
+    print(json.dumps({"n": n, "steps": steps, "rss_mb": rss_mb, "cpu_s": cpu_s,
+                      "control_s": mux.control_s, "reached": int(fleet.reached.sum())}))
+
+
+def launch(n, steps, timestep, seed, world):
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--stand-in", str(n),
+                             "--steps", str(steps), "--timestep", str(timestep), "--seed", str(seed),
+                             "--world", world], stdout=subprocess.PIPE, text=True)
+
+
+def collect(processes):
+    results = []
+    for process in processes:
+        out, _ = process.communicate()
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return results
+
+
+def wait_usage(process):
+    """(stdout, peak RSS in MB, CPU seconds) of a child process, once it exits."""
+    out = process.stdout.read() if process.stdout else ""
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return out, usage.ru_maxrss / 1024.0, usage.ru_utime + usage.ru_stime
+
+
+def run_mux_with_relays(n, steps, timestep):
+    """Stand-in relays plus one multiplexer process; (summed RSS MB, summed CPU s, mux result)."""
+    names = [f"bench_{os.getpid()}_{i}" for i in range(n)]
+    relays = [subprocess.Popen([sys.executable, os.path.join(TOOLS, "run_headless.py"), RELAY,
+                                "--steps", str(steps), "--timestep", str(timestep), "--name", name],
+                               stdout=subprocess.DEVNULL) for name in names]
+    mux = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--relays", *names,
+                            "--timestep", str(timestep), "--json"], stdout=subprocess.PIPE, text=True)
+    out, rss_mb, cpu_s = wait_usage(mux)
+    for relay in relays:
+        _, relay_rss, relay_cpu = wait_usage(relay)
+        rss_mb += relay_rss
+        cpu_s += relay_cpu
+    return rss_mb, cpu_s, json.loads(out.strip().splitlines()[-1])
+
+
+def bench(n, steps, timestep, world):
+    sim_seconds = steps * timestep / 1000.0
+    print(f"{n} robots, {steps} steps ({sim_seconds:.0f} s simulated each)")
+
+    start = time.perf_counter()
+    # One at a time, so the per-process timings are not inflated by CPU contention
+    singles = [collect([launch(1, steps, timestep, seed, world)])[0] for seed in range(n)]
+    single_wall = time.perf_counter() - start
+    start = time.perf_counter()
+    mux_rss, mux_cpu, batched = run_mux_with_relays(n, steps, timestep)
+    batched_wall = time.perf_counter() - start
+
+    rows = [
+        ("one process per robot", sum(r["rss_mb"] for r in singles), sum(r["cpu_s"] for r in singles),
+         sum(r["control_s"] for r in singles), single_wall),
+        ("multiplexer + relays", mux_rss, mux_cpu, batched["control_s"], batched_wall),
+    ]
+    for label, rss_mb, cpu_s, control_s, wall in rows:
+        print(f"  {label:<22} memory {rss_mb / n:6.1f} MB/robot  "
+              f"CPU {cpu_s * 1000.0 / (n * sim_seconds):6.2f} ms/robot/sim-s  "
+              f"(vision+control {control_s * 1e6 / (n * steps):6.1f} us/robot-step)  wall {wall:.1f} s")
+    print("  CPU includes interpreter start-up, imports and the stand-in world itself (in the relays")
+    print("  for the multiplexer); relays run concurrently, so their wall time includes contention.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--relays", nargs="+", metavar="ROBOT", help="Webots robot names running EPuck_Mux_Relay")
+    mode.add_argument("--stand-in", type=int, metavar="N", help="run N stand-in robots in this process")
+    mode.add_argument("--bench", type=int, metavar="N", help="compare N processes vs one multiplexer")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--timestep", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--world", default=DEFAULT_WORLD, help="world file for the stand-in arena")
+    parser.add_argument("--json", action="store_true", help="with --relays: print one JSON line at the end")
+    args = parser.parse_args()
+
+    if args.relays:
+        run_relays(args.relays, args.timestep, args.json)
+    elif args.stand_in:
+        run_stand_in(args.stand_in, args.steps, args.timestep, args.seed, args.world)
+    else:
+        bench(args.bench, args.steps, args.timestep, args.world)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Run a controller against the stand-in `controller` package (no Webots).
+
+    python tools/run_headless.py controllers/EPuck_Red_Ball/EPuck_Red_Ball.py --steps 5000
+    python tools/run_headless.py controllers/NAO_Wave/NAO_Wave.py --steps 3000 --profile
+
+The controller runs unmodified, as __main__, from a scratch copy of its
+directory so that logs, Q-tables and other files it writes next to itself do
+not touch the repository. NAO motions come from $WEBOTS_HOME when present;
+otherwise short synthetic .motion files stand in for them. Reports steps
+per wall-clock second at the end.
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "libraries", "standin"))
+from controller import world
+
+MOTION_SUBDIR = os.path.join("projects", "robots", "softbank", "nao", "motions")
+# name -> (joint, amplitude in rad) pairs swung over one second
+SYNTHETIC_MOTIONS = {
+    "Forwards50.motion": [("LHipPitch", -0.3), ("RHipPitch", 0.3), ("LKneePitch", 0.4), ("RKneePitch", 0.4)],
+    "Backwards.motion": [("LHipPitch", 0.3), ("RHipPitch", -0.3)],
+    "TurnLeft60.motion": [("LHipYawPitch", -0.3), ("RHipYawPitch", -0.3)],
+    "TurnRight60.motion": [("LHipYawPitch", 0.3), ("RHipYawPitch", 0.3)],
+    "SideStepLeft.motion": [("LHipRoll", 0.2), ("RHipRoll", 0.2)],
+    "SideStepRight.motion": [("LHipRoll", -0.2), ("RHipRoll", -0.2)],
+    "KickRight.motion": [("RHipPitch", -0.6), ("RKneePitch", 0.8)],
+    "HandWave.motion": [("RShoulderPitch", -1.2), ("RElbowRoll", 1.0)],
+    "StandUpFromFront.motion": [("LKneePitch", 1.0), ("RKneePitch", 1.0)],
+}
+# Controllers that look for a red ball rather than the yellow duck
+RED_TARGET = ("EPuck",)
+
+
+def write_synthetic_motions(webots_home):
+    directory = os.path.join(webots_home, MOTION_SUBDIR)
+    os.makedirs(directory, exist_ok=True)
+    for name, joints in SYNTHETIC_MOTIONS.items():
+        header = "#WEBOTS_MOTION,V1.0," + ",".join(joint for joint, _ in joints)
+        rows = []
+        for i, fraction in enumerate((0.0, 1.0, 0.0)):
+            rows.append(f"00:0{i // 2}:{(i % 2) * 500:03d},Pose{i + 1}," +
+                        ",".join(f"{amplitude * fraction:.3f}" for _, amplitude in joints))
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write("\n".join([header] + rows) + "\n")
+
+
+def sandbox(script, scratch):
+    """Copy the controller directory into scratch/controllers/ next to a libraries/ link."""
+    source_dir = os.path.dirname(os.path.abspath(script))
+    target_dir = os.path.join(scratch, "controllers", os.path.basename(source_dir))
+    shutil.copytree(source_dir, target_dir, ignore=shutil.ignore_patterns("__pycache__"))
+    os.symlink(os.path.abspath(os.path.join(ROOT, "libraries")), os.path.join(scratch, "libraries"))
+    return os.path.join(target_dir, os.path.basename(script))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("script", help="controller .py file")
+    parser.add_argument("--steps", type=int, default=2000, help="stop after this many robot steps")
+    parser.add_argument("--timestep", type=int, default=32, help="basic time step in ms")
+    parser.add_argument("--name", default=None, help="robot name (default: the controller name)")
+    parser.add_argument("--no-blob", action="store_true", help="cameras see an empty scene")
+    parser.add_argument("--in-place", action="store_true", help="run from the repository directory")
+    parser.add_argument("--profile", action="store_true", help="print the top cProfile entries")
+    args = parser.parse_args()
+
+    controller_name = os.path.splitext(os.path.basename(args.script))[0]
+    world.configure(max_steps=args.steps, basic_time_step=args.timestep,
+                    robot_name=args.name or controller_name)
+    if args.no_blob:
+        world.blob_color = None
+    elif controller_name.startswith(RED_TARGET):
+        world.blob_color = (230, 30, 30)
+
+    scratch = tempfile.mkdtemp(prefix="headless_")
+    try:
+        script = os.path.abspath(args.script) if args.in_place else sandbox(args.script, scratch)
+        motions = os.path.join(os.environ.get("WEBOTS_HOME", ""), MOTION_SUBDIR)
+        if not os.path.isdir(motions):
+            os.environ["WEBOTS_HOME"] = os.path.join(scratch, "webots")
+            write_synthetic_motions(os.environ["WEBOTS_HOME"])
+
+        os.chdir(os.path.dirname(script))
+        sys.argv = [script]
+        sys.path.insert(0, os.path.dirname(script))   # as when Webots launches the script
+        profiler = cProfile.Profile() if args.profile else None
+        start = time.perf_counter()
+        try:
+            if profiler:
+                profiler.runcall(runpy.run_path, script, run_name="__main__")
+            else:
+                runpy.run_path(script, run_name="__main__")
+        except SystemExit:
+            pass
+        wall = time.perf_counter() - start
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"\n[headless] {controller_name}: {world.steps} steps, {world.time_ms / 1000.0:.1f} s simulated "
+          f"in {wall:.2f} s wall = {world.steps / wall:.0f} steps/s "
+          f"({world.time_ms / 1000.0 / wall:.0f}x real time)")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+
+if __name__ == "__main__":
+    main()
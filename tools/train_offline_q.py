@@ -0,0 +1,77 @@
+"""
+Offline batch Q-iteration over recorded NAO_RL_Kick transition logs.
+
+    python tools/train_offline_q.py                       # every log of the controller
+    python tools/train_offline_q.py runs/*.trl --gamma 0.95 --init controllers/NAO_RL_Kick/q_table.json
+    python tools/train_offline_q.py --out controllers/NAO_RL_Kick/q_table.json   # replace the live table
+    python tools/train_offline_q.py controllers/NAO_RL_Kick/transitions/privileged \
+        --out controllers/NAO_RL_Kick/q_table_privileged.json                 # privileged-observation runs
+
+Logs are written by the controller when RECORD_TRANSITIONS is on (one .trl
+file per run). The result is a q_table JSON in the controller's format;
+by default it goes next to the logs as q_table_offline.json, so the live
+table is only replaced on request.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "libraries", "python"))
+from transition_log import batch_q_iteration, expand_paths, load_transitions
+
+CONTROLLER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "controllers", "NAO_RL_Kick")
+DEFAULT_LOGS = os.path.join(CONTROLLER_DIR, "transitions")
+DEFAULT_OUT = os.path.join(DEFAULT_LOGS, "q_table_offline.json")
+
+
+def read_q_table(path):
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return {tuple(map(int, k.split(","))): v for k, v in raw.items()}
+
+
+def write_q_table(path, q_table):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    serial = {",".join(str(v) for v in k): q for k, q in sorted(q_table.items())}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(serial, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="*", default=[DEFAULT_LOGS], help=".trl files, globs or directories")
+    parser.add_argument("--gamma", type=float, default=0.95)
+    parser.add_argument("--iterations", type=int, default=500, help="maximum sweeps")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="stop when no Q-value moves more")
+    parser.add_argument("--init", default=None, help="q_table JSON to start from")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    paths = expand_paths(args.logs)
+    start = time.perf_counter()
+    try:
+        states, actions, rewards, next_states, dones, n_actions = load_transitions(paths)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Cannot load transitions: {e}")
+    if len(states) == 0:
+        # The controller writes a header-only log at every start
+        sys.exit(f"No transitions in {len(paths)} logs under {', '.join(args.logs)}; "
+                 "record some with RECORD_TRANSITIONS first")
+    loaded = time.perf_counter()
+    initial = read_q_table(args.init) if args.init else None
+    q_table, sweeps, change = batch_q_iteration(states, actions, rewards, next_states, dones, n_actions,
+                                                args.gamma, args.iterations, args.tolerance, initial)
+    done = time.perf_counter()
+
+    print(f"{len(actions)} transitions from {len(paths)} logs ({int(dones.sum())} terminal) "
+          f"loaded in {loaded - start:.2f} s")
+    print(f"{sweeps} sweeps in {done - loaded:.2f} s, last change {change:.2e}, {len(q_table)} states")
+    write_q_table(args.out, q_table)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()